@@ -22,7 +22,7 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=['torch', 'matplotlib', 'pandas', 'numpy', 'PIL', 'tkinter'],
+    excludes=['torch', 'matplotlib', 'pandas', 'PIL', 'tkinter'],
     noarchive=False,
     optimize=0,
 )
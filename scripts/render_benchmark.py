@@ -0,0 +1,439 @@
+"""
+Benchmark headless do RenderEngine (Qt offscreen).
+
+Reproduz traces roteirizados de rolagem, zoom, troca de abas e toggle de camadas
+sobre corpora gerados (plantas A0 vetoriais, texto com milhares de páginas, PDF com
+camadas no estilo de tests/generate_layered_pdf.py) e grava um JSON comparável entre
+versões: tempo até os pixels (p50/p95), throughput e pico de RSS por cenário.
+
+Uso:
+    python scripts/render_benchmark.py [--quick] [--scenarios scroll,zoom] [--output arquivo.json]
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.append(str(Path(__file__).parents[1]))
+
+import fitz  # PyMuPDF
+import psutil
+
+FRAME_S = 1 / 60
+DRAIN_TIMEOUT_S = 60.0
+A4 = (595, 842)
+A0 = (841 * 2.83465, 1189 * 2.83465)
+VIEWPORT_PX = (1600, 1000)
+
+
+# --- Corpora -------------------------------------------------------------------
+
+def generate_plan_pdf(path: Path, pages: int, lines: int):
+    """Plantas A0 vetoriais: malha estrutural, milhares de segmentos e cotas."""
+    rng = random.Random(42)
+    doc = fitz.open()
+    for number in range(pages):
+        page = doc.new_page(width=A0[0], height=A0[1])
+        shape = page.new_shape()
+        for x in range(100, int(A0[0]), 300):
+            shape.draw_line((x, 80), (x, A0[1] - 80))
+        for y in range(100, int(A0[1]), 300):
+            shape.draw_line((80, y), (A0[0] - 80, y))
+        shape.finish(color=(0.6, 0.6, 0.6), width=0.5, dashes="[6 3] 0")
+        for _ in range(lines):
+            x, y = rng.uniform(80, A0[0] - 80), rng.uniform(80, A0[1] - 80)
+            shape.draw_line((x, y), (x + rng.uniform(-150, 150), y + rng.uniform(-150, 150)))
+        shape.finish(color=(0, 0, 0), width=0.8)
+        for _ in range(lines // 20):
+            x, y = rng.uniform(80, A0[0] - 80), rng.uniform(80, A0[1] - 80)
+            shape.insert_text((x, y), f"{rng.uniform(1, 30):.2f}", fontsize=6)
+        shape.commit()
+        page.insert_text((A0[0] - 600, A0[1] - 120), f"PRANCHA {number + 1:02d}", fontsize=48)
+    doc.save(str(path), garbage=3, deflate=True)
+    doc.close()
+
+
+def generate_text_pdf(path: Path, pages: int):
+    """Documento de texto corrido (A4) com 'pages' páginas."""
+    words = ("lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+             "incididunt ut labore et dolore magna aliqua").split()
+    rng = random.Random(7)
+    doc = fitz.open()
+    for number in range(pages):
+        page = doc.new_page(width=A4[0], height=A4[1])
+        lines = [f"Página {number + 1}"] + [" ".join(rng.choices(words, k=12)) for _ in range(55)]
+        page.insert_text((50, 60), "\n".join(lines), fontsize=10)
+    doc.save(str(path), garbage=3, deflate=True)
+    doc.close()
+
+
+def generate_layered_pdf(path: Path, pages: int, layers: int):
+    """Jogo de pranchas com 'layers' OCGs (disciplinas); cada página usa um subconjunto."""
+    rng = random.Random(3)
+    doc = fitz.open()
+    for _ in range(pages):
+        doc.new_page(width=A4[1] * 2, height=A4[0] * 2) # A2 paisagem
+    ocgs = [doc.add_ocg(f"Disciplina {i:02d}", on=True) for i in range(layers)]
+    for number in range(pages):
+        page = doc[number]
+        width, height = page.rect.width, page.rect.height
+        for ocg in rng.sample(ocgs, k=max(1, layers // 4)):
+            color = (rng.random(), rng.random(), rng.random())
+            shape = page.new_shape()
+            for _ in range(150):
+                x, y = rng.uniform(40, width - 40), rng.uniform(40, height - 40)
+                shape.draw_rect(fitz.Rect(x, y, x + rng.uniform(5, 60), y + rng.uniform(5, 60)))
+            shape.finish(color=color, fill=color, width=0.5, oc=ocg)
+            shape.commit()
+        page.insert_text((40, 40), f"Prancha {number + 1}", fontsize=20)
+    doc.save(str(path), garbage=3, deflate=True)
+    doc.close()
+
+
+def build_corpus(directory: Path, quick: bool) -> dict:
+    """Gera (ou reaproveita) os arquivos do corpus; o tamanho entra no nome do arquivo."""
+    directory.mkdir(parents=True, exist_ok=True)
+    specs = {
+        "plans": (f"plans_a0_{2 if quick else 6}p.pdf", lambda p: generate_plan_pdf(p, 2 if quick else 6, 3000 if quick else 12000)),
+        "text": (f"text_{200 if quick else 2000}p.pdf", lambda p: generate_text_pdf(p, 200 if quick else 2000)),
+        "layers": (f"layers_40ocg_{6 if quick else 24}p.pdf", lambda p: generate_layered_pdf(p, 6 if quick else 24, 40)),
+    }
+    corpus = {}
+    for name, (filename, generate) in specs.items():
+        path = directory / filename
+        if not path.exists():
+            started = time.perf_counter()
+            generate(path)
+            log(f"  corpus: {filename} gerado em {time.perf_counter() - started:.1f}s")
+        corpus[name] = path
+    return corpus
+
+
+# --- Medição -------------------------------------------------------------------
+
+def log(message: str):
+    print(message, file=sys.stderr, flush=True)
+
+
+def percentile(values: list, p: float) -> float:
+    """Percentil por posto mais próximo (exato, sem buckets)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, math.ceil(p / 100.0 * len(ordered)) - 1)
+    return round(ordered[index], 2)
+
+
+class Recorder:
+    """Tempo até os pixels de cada requisição e pico de RSS durante um cenário."""
+
+    def __init__(self):
+        self._process = psutil.Process(os.getpid())
+        self.started = time.perf_counter()
+        self.requests = 0
+        self.ttp_ms = []
+        self.preview_ms = []
+        self.pixels = 0
+        self.peak_rss = self._process.memory_info().rss
+
+    def callback(self, preview=False):
+        """Callback de render que registra a latência desde a chamada desta função."""
+        requested = time.perf_counter()
+        if not preview:
+            self.requests += 1
+
+        def on_pixels(page, pixmap, *args):
+            elapsed = (time.perf_counter() - requested) * 1000
+            (self.preview_ms if preview else self.ttp_ms).append(elapsed)
+            if not preview:
+                self.pixels += pixmap.width() * pixmap.height()
+        return on_pixels
+
+    def sample_rss(self):
+        self.peak_rss = max(self.peak_rss, self._process.memory_info().rss)
+
+    def report(self, engine) -> dict:
+        duration = time.perf_counter() - self.started
+        stats = engine.stats()
+        return {
+            "requests": self.requests,
+            "completed": len(self.ttp_ms),
+            "cancelled": stats["queue"]["cancelled"],
+            "duration_s": round(duration, 3),
+            "ttp_ms": {
+                "p50": percentile(self.ttp_ms, 50),
+                "p95": percentile(self.ttp_ms, 95),
+                "max": round(max(self.ttp_ms, default=0.0), 2),
+                "mean": round(sum(self.ttp_ms) / len(self.ttp_ms), 2) if self.ttp_ms else 0.0,
+            },
+            "preview_ms": {"p50": percentile(self.preview_ms, 50), "p95": percentile(self.preview_ms, 95)},
+            "throughput_pages_s": round(len(self.ttp_ms) / duration, 2) if duration else 0.0,
+            "throughput_mpx_s": round(self.pixels / 1e6 / duration, 2) if duration else 0.0,
+            "peak_rss_mb": round(self.peak_rss / 1024 / 1024, 1),
+            "engine": {
+                "memory_hit_rate": stats["memory_hit_rate"],
+                "disk_hits": stats["disk_hits"],
+                "derived": stats["derived"],
+                "peak_queue": stats["peak_queue"],
+                "coalesced": stats["queue"]["coalesced"],
+                "cache_mb": round(stats["cache"].get("bytes", 0) / 1024 / 1024, 1),
+                "workers": stats["workers"].get("max_threads"),
+            },
+        }
+
+
+class Harness:
+    """Dirige um RenderEngine novo por cenário pelo event loop do Qt, quadro a quadro."""
+
+    def __init__(self, app, disk_cache: bool):
+        self.app = app
+        self.disk_cache = disk_cache
+
+    def new_engine(self, complexity="STANDARD"):
+        from src.interfaces.gui.state.render_engine import RenderEngine
+        RenderEngine.reset_instance()
+        engine = RenderEngine.instance()
+        if not self.disk_cache:
+            engine._disk_cache = None
+        engine.set_complexity_hint(complexity)
+        engine.reset_stats()
+        return engine
+
+    def pump(self, seconds: float, recorder: Recorder):
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            self.app.processEvents()
+            recorder.sample_rss()
+            time.sleep(0.001)
+
+    def drain(self, recorder: Recorder, engine):
+        """Espera as requisições ainda válidas (as canceladas nunca respondem)."""
+        deadline = time.perf_counter() + DRAIN_TIMEOUT_S
+        while time.perf_counter() < deadline:
+            self.pump(0.01, recorder)
+            if not engine._inflight and not len(engine._scheduler):
+                break
+        self.pump(0.05, recorder)
+
+
+# --- Traces --------------------------------------------------------------------
+
+def page_counts(docs: list) -> dict:
+    counts = {}
+    for doc in docs:
+        with fitz.open(str(doc)) as handle:
+            counts[doc] = handle.page_count
+    return counts
+
+
+def trace_scroll(h: Harness, corpus: dict, quick: bool) -> dict:
+    """Rolagem contínua do documento de texto (leitura, depois arremesso) com cancelamento e reprioritização."""
+    doc = corpus["text"]
+    page_count = page_counts([doc])[doc]
+    engine = h.new_engine("LIGHT")
+    engine.set_document(doc)
+    recorder = Recorder()
+
+    zoom = 1.0
+    page_h = A4[1] * zoom + 10
+    visible_pages = VIEWPORT_PX[1] / page_h
+    requested = set()
+    position = 0.0
+    # (velocidade em páginas/s, duração em s): leitura, aceleração, arremesso, parada
+    segments = [(1.5, 2.0), (6.0, 1.5), (30.0, 1.0), (0.0, 1.0)] if quick else [(1.5, 5.0), (6.0, 4.0), (30.0, 3.0), (0.0, 2.0)]
+    for speed, duration in segments:
+        frames = int(duration / FRAME_S)
+        for _ in range(frames):
+            position = min(position + speed * FRAME_S, page_count - visible_pages)
+            first, last = int(position), min(page_count - 1, int(position + visible_pages))
+            keep = set(range(max(0, first - 1), min(page_count, last + 2)))
+            for page in range(first, last + 1):
+                if page not in requested:
+                    requested.add(page)
+                    engine.request_render(doc, page, zoom, 0, recorder.callback())
+            engine.cancel_stale({(doc, page) for page in keep}, zooms={zoom})
+            requested &= keep
+            center = position + visible_pages / 2
+            engine.reprioritize({(doc, page): abs(page + 0.5 - center) for page in keep})
+            h.pump(FRAME_S, recorder)
+    h.drain(recorder, engine)
+    report = recorder.report(engine)
+    report["pages"] = page_count
+    return report
+
+
+def trace_plan_zoom(h: Harness, corpus: dict, quick: bool) -> dict:
+    """Zoom em planta A0 em tiles (nível grosseiro + fino), ida e volta, como o PageWidget faz."""
+    from src.interfaces.gui.state.tile_grid import TileGrid
+    doc = corpus["plans"]
+    engine = h.new_engine("HEAVY")
+    engine.set_document(doc)
+    grid = TileGrid()
+    page_count = page_counts([doc])[doc]
+    recorder = Recorder()
+
+    zooms = [0.15, 0.25, 0.5, 1.0, 2.0, 1.0, 0.5, 0.25] if quick else [0.15, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 2.0, 1.0, 0.5, 0.25, 0.15]
+    page = 0
+    for step, zoom in enumerate(zooms):
+        if step and step % 4 == 0:
+            page = (page + 1) % page_count
+        fine = grid.level_for_zoom(zoom)
+        coarse = grid.coarse_level(fine)
+        # Viewport centrado na página, em pontos
+        cx, cy = A0[0] / 2, A0[1] / 2
+        half_w, half_h = VIEWPORT_PX[0] / zoom / 2, VIEWPORT_PX[1] / zoom / 2
+        rect = (max(0, cx - half_w), max(0, cy - half_h), min(A0[0], cx + half_w), min(A0[1], cy + half_h))
+        levels = [(coarse, 1)] if coarse == fine else [(coarse, 1), (fine, 0)]
+        for level, priority in levels:
+            for col, row in grid.tiles_for_rect(level, A0[0], A0[1], rect):
+                engine.request_render(
+                    doc, page, grid.level_zoom(level), 0, recorder.callback(),
+                    clip=grid.tile_clip(level, col, row, A0[0], A0[1]), priority=priority,
+                )
+        h.pump(0.4, recorder) # Gesto discreto: o usuário para em cada nível
+    h.drain(recorder, engine)
+    return recorder.report(engine)
+
+
+def trace_tab_switch(h: Harness, corpus: dict, quick: bool) -> dict:
+    """Alterna entre os documentos do corpus (viewer + faixa de miniaturas), com cache quente."""
+    docs = [corpus["text"], corpus["plans"], corpus["layers"]]
+    engine = h.new_engine("STANDARD")
+    counts = page_counts(docs)
+    recorder = Recorder()
+    rounds = 3 if quick else 8
+    for round_index in range(rounds):
+        for doc in docs:
+            engine.set_document(doc)
+            page_count = counts[doc]
+            first = (round_index * 2) % max(1, page_count - 1)
+            for page in range(first, min(page_count, first + 2)):
+                engine.request_render(doc, page, 0.5, 0, recorder.callback(), preview_callback=recorder.callback(preview=True))
+            for page in range(min(page_count, 12)):
+                engine.request_render(doc, page, 0.15, 0, recorder.callback(), source="thumbnail")
+            h.pump(0.3, recorder)
+    h.drain(recorder, engine)
+    return recorder.report(engine)
+
+
+def trace_layer_toggle(h: Harness, corpus: dict, quick: bool) -> dict:
+    """Alterna camadas (40 OCGs) re-renderizando só as páginas afetadas, como o viewer."""
+    doc = corpus["layers"]
+    engine = h.new_engine("STANDARD")
+    engine.set_document(doc)
+    engine.build_layer_index(doc)
+    recorder = Recorder()
+
+    handle = fitz.open(str(doc))
+    page_count, layers = handle.page_count, list(handle.get_ocgs())
+    handle.close()
+    config = {xref: True for xref in layers}
+    zoom = 0.5
+
+    def render(pages):
+        for page in pages:
+            engine.request_render(doc, page, zoom, 0, recorder.callback(), layer_config=dict(config))
+
+    render(range(page_count))
+    h.drain(recorder, engine)
+    rng = random.Random(11)
+    toggles = 6 if quick else 20
+    for _ in range(toggles):
+        xref = rng.choice(layers)
+        config[xref] = not config[xref]
+        affected = engine.pages_using_layers(doc, [xref])
+        render(range(page_count) if affected is None else sorted(affected))
+        h.pump(0.2, recorder)
+    h.drain(recorder, engine)
+    report = recorder.report(engine)
+    report["toggles"] = toggles
+    return report
+
+
+SCENARIOS = {
+    "scroll": trace_scroll,
+    "plan_zoom": trace_plan_zoom,
+    "tab_switch": trace_tab_switch,
+    "layer_toggle": trace_layer_toggle,
+}
+
+
+# --- Execução ------------------------------------------------------------------
+
+def environment() -> dict:
+    from PyQt6.QtCore import QT_VERSION_STR
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=Path(__file__).parents[1], timeout=5).stdout.strip() or None
+    except Exception:
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "pymupdf": fitz.VersionBind,
+        "qt": QT_VERSION_STR,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "ram_mb": round(psutil.virtual_memory().total / 1024 / 1024),
+    }
+
+
+def run(scenarios: list, quick: bool, corpus_dir: Path, disk_cache: bool) -> dict:
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    log("🧪 Gerando/validando corpus...")
+    corpus = build_corpus(corpus_dir, quick)
+    harness = Harness(app, disk_cache)
+    results = {}
+    for name in scenarios:
+        log(f"▶ Cenário {name}...")
+        results[name] = SCENARIOS[name](harness, corpus, quick)
+        ttp = results[name]["ttp_ms"]
+        log(f"  ttp p50={ttp['p50']}ms p95={ttp['p95']}ms, {results[name]['throughput_pages_s']} págs/s, RSS pico {results[name]['peak_rss_mb']}MB")
+
+    from src.interfaces.gui.state.render_engine import RenderEngine
+    RenderEngine.reset_instance()
+    return {
+        "benchmark": "render_engine",
+        "version": 1,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "quick": quick,
+        "disk_cache": disk_cache,
+        "environment": environment(),
+        "corpus": {name: {"file": path.name, "bytes": path.stat().st_size} for name, path in corpus.items()},
+        "scenarios": results,
+        "peak_rss_mb": max((r["peak_rss_mb"] for r in results.values()), default=0.0),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark headless do RenderEngine (saída JSON).")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"Lista separada por vírgula ({', '.join(SCENARIOS)})")
+    parser.add_argument("--quick", action="store_true", help="Corpora e traces reduzidos (smoke/CI)")
+    parser.add_argument("--corpus-dir", type=Path, default=Path("logs/benchmark_corpus"))
+    parser.add_argument("--output", type=Path, default=Path("logs/render_benchmark.json"))
+    parser.add_argument("--disk-cache", action="store_true", help="Mantém o cache em disco (por padrão desativado: medições a frio)")
+    args = parser.parse_args(argv)
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"Cenários desconhecidos: {', '.join(unknown)}")
+
+    report = run(scenarios, args.quick, args.corpus_dir, args.disk_cache)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    log(f"✅ Relatório salvo em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -51,6 +51,10 @@ class DocumentAnalyzer:
                 if len(paths) > 1000:
                     stats["is_vector_heavy"] = True
                     stats["complexity"] = "HEAVY"
+                elif len(paths) < 50 and file_size < 5 * 1024 * 1024:
+                    # Texto simples: render barato, o pool pode usar mais workers
+                    stats["complexity"] = "LIGHT"
+                    stats["estimated_load"] = "low"
 
             doc.close()
             log_debug(f"Analyzer: Concluído para {pdf_path.name} -> Mode: {stats['complexity']}")
@@ -1,4 +1,7 @@
 import fitz  # PyMuPDF
+import re
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import Tuple
 from src.domain.entities.pdf import PDFDocument
@@ -10,6 +13,23 @@ from src.infrastructure.services.logger import log_debug, log_error, log_excepti
 class PyMuPDFAdapter(PDFOperationsPort, OCRPort):
     """Implementação concreta (Adapter) usando a biblioteca PyMuPDF."""
 
+    # Orçamento do cache de DisplayLists, medido pelo tamanho dos streams que cada
+    # lista interpreta ou referencia (ver _display_list_cost)
+    DISPLAY_LIST_BUDGET = 128 * 1024 * 1024
+    # Teto de entradas: páginas de custo estimado baixo não acumulam sem limite
+    DISPLAY_LIST_MAX_ENTRIES = 256
+
+    # Índice de uso de camadas: nomes citados no conteúdo e referências indiretas
+    _PDF_NAME = re.compile(rb"/([^\s/\[\]<>(){}%]+)")
+    _PDF_OC_TAG = re.compile(rb"/OC\s*/([^\s/\[\]<>(){}%]+)")
+    _PDF_REF = re.compile(r"(\d+)\s+0\s+R")
+    _MAX_FORM_DEPTH = 8
+
+    def __init__(self):
+        self._display_lists = OrderedDict()  # (handle, página) -> (DisplayList, custo, versão das camadas)
+        self._display_list_bytes = 0
+        self._display_list_lock = threading.Lock()
+
     def rotate(self, pdf: PDFDocument, degrees: int) -> Path:
         """Rotaciona o PDF usando PyMuPDF."""
         doc = fitz.open(str(pdf.path))
@@ -263,6 +283,141 @@ class PyMuPDFAdapter(PDFOperationsPort, OCRPort):
             if not doc_handle:
                 doc.close()
 
+    def get_page_words(self, pdf_path: Path, page_indices, doc_handle=None) -> dict:
+        """
+        Palavras das páginas pedidas numa única abertura do documento:
+        {página: [(x0, y0, x1, y1, texto, bloco, linha, palavra)]}, em pontos.
+        Índices fora do documento são ignorados.
+        """
+        doc = doc_handle if doc_handle else fitz.open(str(pdf_path))
+        try:
+            return {
+                page_index: doc.load_page(page_index).get_text("words")
+                for page_index in page_indices if 0 <= page_index < doc.page_count
+            }
+        finally:
+            if not doc_handle:
+                doc.close()
+
+    def get_page_layer_usage(self, pdf_path: Path, doc_handle=None) -> dict:
+        """
+        Índice {página: frozenset(xrefs de OCG)} das camadas que cada página usa:
+        marcações /OC do content stream (via /Properties, inclusive OCMDs), XObjects
+        com /OC (recursivo em formulários) e anotações. Só nomes de recurso citados
+        no conteúdo contam, então dicionários de recursos compartilhados não marcam
+        todas as páginas. Documento sem camadas -> {}.
+        """
+        doc = doc_handle if doc_handle else fitz.open(str(pdf_path))
+        try:
+            ocgs = set(doc.get_ocgs())
+            if not ocgs:
+                return {}
+            memo = {} # xref de XObject -> OCGs (compartilhado entre páginas)
+            usage = {}
+            for page_index in range(doc.page_count):
+                page = doc.load_page(page_index)
+                used = self._ocgs_in_content(doc, page.xref, page.read_contents(), ocgs, memo, 0)
+                for annot_xref, *_ in page.annot_xrefs():
+                    used |= self._ocgs_in_ref(doc, doc.xref_get_key(annot_xref, "OC"), ocgs)
+                usage[page_index] = frozenset(used)
+            return usage
+        finally:
+            if not doc_handle:
+                doc.close()
+
+    def _ocgs_in_content(self, doc, owner_xref: int, content: bytes, ocgs: set, memo: dict, depth: int) -> set:
+        """
+        OCGs alcançados pelos recursos (/Properties, /XObject) citados em 'content'.
+        Entradas diretas (<< /Type /OCMD ... >>) e indiretas são lidas pelo caminho
+        do recurso; uma marcação /OC sem propriedade resolvível conta como todas as camadas.
+        """
+        names = {name.decode("latin-1") for name in self._PDF_NAME.findall(content or b"")}
+        tags = {name.decode("latin-1") for name in self._PDF_OC_TAG.findall(content or b"")}
+        resources = self._resources_owner(doc, owner_xref)
+        if resources is None:
+            return set(ocgs) if tags else set()
+
+        properties = self._resource_dict(doc, resources, "Properties")
+        xobjects = self._resource_dict(doc, resources, "XObject")
+        found = set()
+        for name in names:
+            kind = "null"
+            if f"/{name}" in properties: # Filtro barato antes da busca pelo caminho
+                kind, value = doc.xref_get_key(resources, f"Resources/Properties/{name}")
+            if kind != "null":
+                found |= self._ocgs_in_ref(doc, (kind, value), ocgs)
+            elif name in tags:
+                return set(ocgs) # Propriedade citada mas ausente: não dá para restringir
+            if f"/{name}" in xobjects and depth < self._MAX_FORM_DEPTH:
+                kind, value = doc.xref_get_key(resources, f"Resources/XObject/{name}")
+                if kind == "xref":
+                    found |= self._ocgs_in_xobject(doc, int(value.split()[0]), ocgs, memo, depth + 1)
+        return found
+
+    @staticmethod
+    def _resource_dict(doc, resources: int, category: str) -> str:
+        """Texto do dicionário /Resources/<category> ("" se ausente)."""
+        kind, value = doc.xref_get_key(resources, f"Resources/{category}")
+        if kind == "xref":
+            return doc.xref_object(int(value.split()[0]), compressed=True)
+        return value if kind == "dict" else ""
+
+    def _ocgs_in_xobject(self, doc, xref: int, ocgs: set, memo: dict, depth: int) -> set:
+        if xref in memo:
+            return memo[xref]
+        memo[xref] = set() # Ciclos entre formulários terminam aqui
+        found = self._ocgs_in_ref(doc, doc.xref_get_key(xref, "OC"), ocgs)
+        if doc.xref_get_key(xref, "Subtype")[1] == "/Form":
+            found |= self._ocgs_in_content(doc, xref, doc.xref_stream(xref), ocgs, memo, depth)
+        memo[xref] = found
+        return found
+
+    def _ocgs_in_ref(self, doc, key: tuple, ocgs: set) -> set:
+        """
+        OCGs de uma entrada /OC (indireta ou dicionário direto): o próprio OCG ou os
+        membros de um OCMD (/OCGs, /VE, inclusive arrays indiretos). Sem /OC -> vazio;
+        referência que não resolve -> todas as camadas (a página não é restringível).
+        """
+        kind, value = key
+        if kind == "null":
+            return set()
+        if kind == "dict":
+            return self._ocgs_in_object(doc, value, ocgs, 0)
+        if kind != "xref":
+            return set(ocgs)
+        xref = int(value.split()[0])
+        if xref in ocgs:
+            return {xref}
+        return self._ocgs_in_object(doc, f"{xref} 0 R", ocgs, 0)
+
+    def _ocgs_in_object(self, doc, text: str, ocgs: set, depth: int) -> set:
+        """OCGs referenciados em 'text', seguindo referências a objetos que não são OCGs."""
+        found = set()
+        for ref in map(int, self._PDF_REF.findall(text)):
+            if ref in ocgs:
+                found.add(ref)
+                continue
+            try:
+                obj = doc.xref_object(ref, compressed=True)
+            except RuntimeError:
+                return set(ocgs) # xref inválido
+            if obj == "null" or depth >= self._MAX_FORM_DEPTH:
+                return set(ocgs)
+            found |= self._ocgs_in_object(doc, obj, ocgs, depth + 1)
+        return found
+
+    @staticmethod
+    def _resources_owner(doc, xref: int):
+        """Objeto que carrega /Resources (páginas podem herdar do nó pai)."""
+        for _ in range(32):
+            if doc.xref_get_key(xref, "Resources")[0] != "null":
+                return xref
+            kind, parent = doc.xref_get_key(xref, "Parent")
+            if kind != "xref":
+                return None
+            xref = int(parent.split()[0])
+        return None
+
     def set_layer_visibility(self, pdf_path: Path, layer_id: int, visible: bool) -> None:
         """Altera a visibilidade de uma camada diretamente no documento (Persistente)."""
         with fitz.open(str(pdf_path)) as doc:
@@ -289,6 +444,8 @@ class PyMuPDFAdapter(PDFOperationsPort, OCRPort):
         Aplica configuração de camadas para visualização (In-Memory).
         Usa o mecanismo set_layer_ui_config do PyMuPDF para atualizar o estado do rendering.
         layers: dict {layer_id (xref): visible (bool)}
+        O mapa Xref -> índice UI e o último estado aplicado ficam no handle: cada
+        chamada só envia as camadas que mudaram (renders seguidos não pagam nada).
         """
         if not doc_handle or not layers: return
         
@@ -297,45 +454,73 @@ class PyMuPDFAdapter(PDFOperationsPort, OCRPort):
                 log_error("PyMuPDFAdapter: set_layer_ui_config não encontrado.")
                 return
 
-            # O PyMuPDF 1.24+ exige set_layer_ui_config para afetar o get_pixmap em memória.
-            # O parâmetro 'number' é o índice na lista de layer_ui_configs().
-            
-            # 1. Mapear Xref -> Nome (via get_ocgs)
-            ocgs = doc_handle.get_ocgs()
-            xref_to_name = {xref: cfg["name"] for xref, cfg in ocgs.items()}
-            
-            # 2. Mapear Nome -> Índice UI (via layer_ui_configs)
-            ui_configs = doc_handle.layer_ui_configs()
-            name_to_ui_index = {cfg["text"]: i for i, cfg in enumerate(ui_configs)}
+            ui_index, applied = self._layer_state(doc_handle)
+            changed = False
 
-            # 3. Aplicar cada override
             for xref, visible in layers.items():
-                name = xref_to_name.get(int(xref))
-                if name is None:
-                    log_error(f"PyMuPDFAdapter: OCG Xref {xref} não encontrado no documento.")
+                xref = int(xref)
+                visible = bool(visible)
+                if applied.get(xref) == visible:
                     continue
-                
-                ui_index = name_to_ui_index.get(name)
-                if ui_index is None:
-                    log_error(f"PyMuPDFAdapter: OCG '{name}' não encontrado na lista UI.")
+
+                index = ui_index.get(xref)
+                if index is None:
+                    log_error(f"PyMuPDFAdapter: OCG Xref {xref} não encontrado na lista UI.")
+                    applied[xref] = visible # Não insistir a cada render
                     continue
-                
-                # Action: 0=ON, 1=OFF (segundo padrão MuPDF)
-                action = 0 if visible else 1
-                doc_handle.set_layer_ui_config(ui_index, action)
-                log_debug(f"PyMuPDFAdapter: set_layer_ui_config(index={ui_index}, action={action}) - Layer '{name}'")
+
+                # Action: 0=ON, 2=OFF (1 alterna, o que não é idempotente)
+                action = 0 if visible else 2
+                doc_handle.set_layer_ui_config(index, action)
+                applied[xref] = visible
+                changed = True
+                log_debug(f"PyMuPDFAdapter: set_layer_ui_config(index={index}, action={action}) - OCG {xref}")
+
+            # Conteúdo opcional muda o que a DisplayList grava: invalida as listas deste handle
+            if changed:
+                doc_handle._layer_version = getattr(doc_handle, "_layer_version", 0) + 1
             
             # Nota: O PyMuPDF Document mantém esse estado até ser fechado ou resetado.
                  
         except Exception as e:
             log_error(f"PyMuPDFAdapter: Erro ao aplicar camadas (UI): {e}")
 
+    @staticmethod
+    def _layer_state(doc_handle) -> tuple:
+        """
+        (mapa Xref -> índice UI, estado aplicado {xref: visível}) do handle, calculado
+        uma vez por handle. O PyMuPDF 1.24+ exige set_layer_ui_config para afetar o
+        get_pixmap em memória; o parâmetro 'number' é o da lista layer_ui_configs().
+        """
+        state = getattr(doc_handle, "_layer_state", None)
+        if state is None:
+            # 1. Mapear Nome -> Índice UI (via layer_ui_configs)
+            name_to_ui_index = {}
+            for i, cfg in enumerate(doc_handle.layer_ui_configs()):
+                name_to_ui_index.setdefault(cfg["text"], cfg.get("number", i))
+            # 2. Mapear Xref -> Índice UI (via get_ocgs); o estado inicial é o padrão do documento
+            ui_index, applied = {}, {}
+            for xref, cfg in doc_handle.get_ocgs().items():
+                if cfg["name"] in name_to_ui_index:
+                    ui_index[xref] = name_to_ui_index[cfg["name"]]
+                    applied[xref] = bool(cfg["on"])
+            state = doc_handle._layer_state = (ui_index, applied)
+        return state
+
     def render_page(self, pdf_path: Path, page_index: int, zoom: float, rotation: int, clip: tuple | None = None, doc_handle=None) -> tuple:
         """
         Renderiza uma página e retorna (bytes, width, height, stride).
         Suporta 'clip' (x0, y0, x1, y1) para renderização parcial (Tiling).
         Otimizado: Suporta reutilização de handle (Single-Open).
         """
+        pix = self.render_pixmap(pdf_path, page_index, zoom, rotation, clip=clip, doc_handle=doc_handle)
+        return (pix.samples, pix.width, pix.height, pix.stride)
+
+    def render_pixmap(self, pdf_path: Path, page_index: int, zoom: float, rotation: int, clip: tuple | None = None, doc_handle=None) -> fitz.Pixmap:
+        """
+        Como render_page, mas devolve o fitz.Pixmap (RGB888) sem copiar as amostras:
+        o chamador pode ler 'samples_mv' diretamente enquanto mantém o pixmap vivo.
+        """
         try:
             # Se handle fornecido (Single-Open Architecture), usar ele
             if doc_handle:
@@ -345,7 +530,6 @@ class PyMuPDFAdapter(PDFOperationsPort, OCRPort):
                 doc = fitz.open(str(pdf_path))
                 should_close = True
             
-            page = doc.load_page(page_index)
             mat = fitz.Matrix(zoom, zoom)
             if rotation != 0:
                 mat.prerotate(rotation)
@@ -354,22 +538,92 @@ class PyMuPDFAdapter(PDFOperationsPort, OCRPort):
             
             # alpha=False é o padrão para performance e compatibilidade com RGB888
             # As camadas (OCG) são respeitadas pelo motor de renderização interno.
-            pix = page.get_pixmap(matrix=mat, alpha=False, clip=fitz_clip)
-            
-            samples = pix.samples
-            width = pix.width
-            height = pix.height
-            stride = pix.stride
+            if doc_handle:
+                # Handle persistente: rasteriza da DisplayList já interpretada (zoom/clip/rotação livres)
+                pix = self._display_list(doc, page_index).get_pixmap(matrix=mat, alpha=False, clip=fitz_clip)
+            else:
+                pix = doc.load_page(page_index).get_pixmap(matrix=mat, alpha=False, clip=fitz_clip)
             
             if should_close:
                 doc.close()
                 
-            return (samples, width, height, stride)
+            return pix
 
         except Exception as e:
             log_error(f"PyMuPDFAdapter: Erro ao renderizar página {page_index}: {e}")
             raise
 
+    def _display_list(self, doc_handle, page_index: int):
+        """
+        DisplayList da página no handle (interpreta o content stream uma única vez).
+        Reconstruída se a configuração de camadas do handle mudou; LRU limitado por
+        DISPLAY_LIST_BUDGET e DISPLAY_LIST_MAX_ENTRIES. Entradas de um handle saem
+        em discard_display_lists (fechamento pelo pool).
+        """
+        key = (doc_handle, page_index)
+        version = getattr(doc_handle, "_layer_version", 0)
+        with self._display_list_lock:
+            entry = self._display_lists.get(key)
+            if entry and entry[2] == version:
+                self._display_lists.move_to_end(key)
+                return entry[0]
+
+        page = doc_handle.load_page(page_index)
+        display_list = page.get_displaylist()
+        cost = self._display_list_cost(doc_handle, page)
+
+        with self._display_list_lock:
+            old = self._display_lists.pop(key, None)
+            if old:
+                self._display_list_bytes -= old[1]
+            # Handles fechados (sessões antigas) não serão mais consultados
+            for stale in [k for k in self._display_lists if k[0].is_closed]:
+                self._display_list_bytes -= self._display_lists.pop(stale)[1]
+            if cost <= self.DISPLAY_LIST_BUDGET:
+                self._display_lists[key] = (display_list, cost, version)
+                self._display_list_bytes += cost
+                while (self._display_list_bytes > self.DISPLAY_LIST_BUDGET
+                       or len(self._display_lists) > self.DISPLAY_LIST_MAX_ENTRIES):
+                    _, (_, old_cost, _) = self._display_lists.popitem(last=False)
+                    self._display_list_bytes -= old_cost
+        return display_list
+
+    def _display_list_cost(self, doc, page) -> int:
+        """
+        Custo estimado da DisplayList: o content stream da página mais os streams dos
+        XObjects que ela usa, inclusive aninhados (formulários decodificados, imagens
+        pelo tamanho comprimido que a lista mantém). Uma prancha CAD que só executa
+        '/Fm0 Do' custa o formulário inteiro, não os poucos bytes da página.
+        """
+        cost = len(page.read_contents())
+        seen = set()
+        for xref, *_ in page.get_xobjects():
+            if xref not in seen:
+                seen.add(xref)
+                cost += len(doc.xref_stream(xref) or b"")
+        for xref, *_ in page.get_images(full=True):
+            if xref not in seen:
+                seen.add(xref)
+                cost += self._raw_stream_length(doc, xref)
+        return cost
+
+    @staticmethod
+    def _raw_stream_length(doc, xref: int) -> int:
+        """/Length do stream (sem decodificar); lê o stream bruto se o valor não for legível."""
+        try:
+            kind, value = doc.xref_get_key(xref, "Length")
+            if kind == "xref":
+                value = doc.xref_object(int(value.split()[0]))
+            return int(value)
+        except (ValueError, IndexError):
+            return len(doc.xref_stream_raw(xref) or b"")
+
+    def discard_display_lists(self, doc_handle):
+        """Descarta as DisplayLists do handle (fechado ou aposentado); libera a referência a ele."""
+        with self._display_list_lock:
+            for key in [k for k in self._display_lists if k[0] is doc_handle]:
+                self._display_list_bytes -= self._display_lists.pop(key)[1]
+
     def has_text_layer(self, pdf_path: Path, doc_handle=None) -> bool:
         """
         Verifica se o PDF tem camada de texto (Pesquisabilidade).
@@ -0,0 +1,168 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context, shared_memory
+from src.infrastructure.services.logger import log_debug, log_error
+
+# ---------------------------------------------------------------- lado do worker
+# Estado por processo: cada worker mantém seus próprios handles fitz abertos.
+_worker_adapter = None
+_worker_docs = OrderedDict()  # path -> (mtime_ns, fitz.Document)
+_MAX_DOCS_PER_WORKER = 4
+
+# Cabeçalho do segmento: o byte 0 é a confirmação de attach escrita pelo processo da GUI
+_HEADER_BYTES = 64
+_ACK_OFFSET = 0
+# Segmentos que a GUI nunca abriu (render abandonado) são removidos após este prazo
+_UNCLAIMED_TTL_S = 60.0
+_SWEEP_INTERVAL_S = 1.0
+_worker_segments = {}  # nome -> (SharedMemory, instante da criação)
+_worker_segments_lock = threading.Lock()
+
+
+def _worker_init():
+    global _worker_adapter
+    from src.infrastructure.adapters.pymupdf_adapter import PyMuPDFAdapter
+    _worker_adapter = PyMuPDFAdapter()
+    threading.Thread(target=_worker_sweep_loop, name="shm-sweep", daemon=True).start()
+
+
+def _worker_sweep_loop():
+    while True:
+        time.sleep(_SWEEP_INTERVAL_S)
+        _worker_sweep()
+
+
+def _worker_sweep():
+    """
+    Fecha o handle do worker nos segmentos que a GUI já confirmou. No Windows um
+    mapeamento nomeado some com o último handle, então o worker só solta o seu
+    depois do attach; sem confirmação no prazo, o segmento é removido.
+    """
+    now = time.monotonic()
+    with _worker_segments_lock:
+        for name, (shm, created) in list(_worker_segments.items()):
+            claimed = shm.buf[_ACK_OFFSET] != 0
+            if not claimed and now - created < _UNCLAIMED_TTL_S:
+                continue
+            del _worker_segments[name]
+            try:
+                shm.close()
+                if not claimed:
+                    shm.unlink()
+            except Exception as e:
+                log_error(f"ProcessPool: Falha ao liberar segmento {name}: {e}")
+
+
+def _worker_handle(path: str):
+    """Reutiliza o handle do documento no processo (reabre se o arquivo mudou)."""
+    import fitz
+
+    mtime = os.stat(path).st_mtime_ns
+    entry = _worker_docs.get(path)
+    if entry and entry[0] == mtime and not entry[1].is_closed:
+        _worker_docs.move_to_end(path)
+        return entry[1]
+    if entry:
+        _close_worker_doc(_worker_docs.pop(path)[1])
+
+    doc = fitz.open(path)
+    _worker_docs[path] = (mtime, doc)
+    while len(_worker_docs) > _MAX_DOCS_PER_WORKER:
+        _, (_, old) = _worker_docs.popitem(last=False)
+        _close_worker_doc(old)
+    return doc
+
+
+def _close_worker_doc(doc):
+    _worker_adapter.discard_display_lists(doc)
+    doc.close()
+
+
+def _worker_render(path, page_num, zoom, rotation, clip, layer_config, max_res):
+    """Renderiza no processo worker e publica as amostras em um segmento de memória compartilhada."""
+    doc = _worker_handle(path)
+    if layer_config:
+        _worker_adapter.apply_layer_config_to_handle(doc, layer_config)
+
+    pix = _worker_adapter.render_pixmap(None, page_num, zoom, rotation, clip=clip, doc_handle=doc)
+    if (pix.width > max_res or pix.height > max_res) and clip is None:
+        zoom *= max_res / max(pix.width, pix.height)
+        pix = _worker_adapter.render_pixmap(None, page_num, zoom, rotation, doc_handle=doc)
+    width, height, stride = pix.width, pix.height, pix.stride
+
+    # Única cópia no worker: amostras do MuPDF direto para o segmento compartilhado
+    samples = pix.samples_mv
+    nbytes = len(samples)
+    _worker_sweep()
+    shm = shared_memory.SharedMemory(create=True, size=_HEADER_BYTES + nbytes)
+    shm.buf[_ACK_OFFSET] = 0
+    shm.buf[_HEADER_BYTES:_HEADER_BYTES + nbytes] = samples
+    # O handle do worker fica aberto até a GUI confirmar o attach (ver _worker_sweep);
+    # depois disso o processo da GUI é o dono do segmento (unlink em release)
+    with _worker_segments_lock:
+        _worker_segments[shm.name] = (shm, time.monotonic())
+    return shm.name, nbytes, width, height, stride, zoom
+
+
+# ----------------------------------------------------------------- lado da GUI
+class SharedRaster:
+    """Raster publicado por um worker; 'buffer' aponta direto para a memória compartilhada."""
+
+    def __init__(self, name, nbytes, width, height, stride, zoom):
+        self._shm = shared_memory.SharedMemory(name=name)
+        self._shm.buf[_ACK_OFFSET] = 1  # Worker pode fechar o handle dele
+        self.buffer = self._shm.buf[_HEADER_BYTES:_HEADER_BYTES + nbytes]
+        self.width = width
+        self.height = height
+        self.stride = stride
+        self.zoom = zoom
+
+    def release(self):
+        """Libera a visão e remove o segmento (obrigatório após o consumo)."""
+        try:
+            self.buffer.release()
+            self._shm.close()
+            self._shm.unlink()
+        except Exception as e:
+            log_error(f"ProcessPool: Falha ao liberar memória compartilhada: {e}")
+
+
+class PyMuPDFProcessPool:
+    """
+    Pool de processos de renderização (backend opcional do RenderEngine).
+    Cada processo tem seu próprio interpretador e handles fitz, escalando com os núcleos
+    em vez de disputar o GIL. Os processos usam 'spawn' (seguro com Qt) e sobem sob demanda.
+    """
+
+    def __init__(self, workers: int | None = None):
+        self.workers = workers or max(2, (os.cpu_count() or 2) - 1)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._executor is None:
+                log_debug(f"ProcessPool: Iniciando {self.workers} processos de renderização.")
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=get_context("spawn"),
+                    initializer=_worker_init
+                )
+            return self._executor
+
+    def render(self, doc_path, page_num, zoom, rotation, clip=None, layer_config=None, max_res=5120) -> SharedRaster:
+        """Bloqueia a thread chamadora (não a GUI) até o worker publicar o raster."""
+        executor = self._ensure_started()
+        layers = dict(layer_config) if layer_config else None
+        future = executor.submit(_worker_render, str(doc_path), page_num, zoom, rotation, clip, layers, max_res)
+        return SharedRaster(*future.result())
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+            log_debug("ProcessPool: Processos de renderização encerrados.")
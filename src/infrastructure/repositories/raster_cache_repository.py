@@ -0,0 +1,207 @@
+import hashlib
+import os
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from src.infrastructure.services.logger import log_debug, log_error
+
+
+class RasterCacheRepository:
+    """
+    Cache persistente (em disco) de rasters já renderizados.
+    Cada entrada é um blob comprimido (zlib) identificado pelo hash da chave de render,
+    que inclui a impressão digital do conteúdo do PDF (tamanho + mtime + hash parcial).
+    O tamanho total é limitado e as entradas menos usadas são removidas (LRU).
+    Thread-safe: é consultado diretamente pelas threads de renderização.
+    """
+
+    MAGIC = b"FRC1"
+    HEADER = struct.Struct("<4sIIII")  # magic, width, height, bytes_per_line, format
+    FINGERPRINT_CHUNK = 64 * 1024
+    DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+    # Sobrescreve o diretório padrão (testes, instalações portáteis)
+    STORAGE_DIR_ENV = "FOTON_RASTER_CACHE_DIR"
+
+    def __init__(self, storage_dir: Path = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        if storage_dir:
+            self.storage_dir = storage_dir
+        elif os.environ.get(self.STORAGE_DIR_ENV):
+            self.storage_dir = Path(os.environ[self.STORAGE_DIR_ENV])
+        else:
+            # Default: salva na pasta .fotonPDF do usuário
+            self.storage_dir = Path.home() / ".fotonPDF" / "raster_cache"
+
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = None  # OrderedDict[nome -> bytes], carregado sob demanda
+        self._total_bytes = 0
+        self._fingerprints = {}  # (path, size, mtime_ns) -> fingerprint
+        self.hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------------ chaves
+    def fingerprint(self, doc_path) -> str | None:
+        """Impressão digital do conteúdo: tamanho + mtime + hash do início e do fim do arquivo."""
+        try:
+            path_str = str(doc_path)
+            st = os.stat(path_str)
+            memo_key = (path_str, st.st_size, st.st_mtime_ns)
+            fp = self._fingerprints.get(memo_key)
+            if fp:
+                return fp
+
+            h = hashlib.blake2b(digest_size=16)
+            h.update(f"{st.st_size}:{st.st_mtime_ns}".encode())
+            with open(path_str, "rb") as f:
+                h.update(f.read(self.FINGERPRINT_CHUNK))
+                if st.st_size > self.FINGERPRINT_CHUNK * 2:
+                    f.seek(-self.FINGERPRINT_CHUNK, os.SEEK_END)
+                    h.update(f.read(self.FINGERPRINT_CHUNK))
+            fp = h.hexdigest()
+            self._fingerprints[memo_key] = fp
+            return fp
+        except OSError:
+            return None
+
+    def make_key(self, doc_path, page_num, zoom, rotation, mode="default", clip=None, layer_config=None) -> str | None:
+        """Gera o nome da entrada a partir dos parâmetros do render (None se o arquivo não existe)."""
+        fp = self.fingerprint(doc_path)
+        if fp is None:
+            return None
+        layers = tuple(sorted((int(k), bool(v)) for k, v in dict(layer_config).items())) if layer_config else None
+        clip_key = tuple(round(float(c), 3) for c in clip) if clip else None
+        raw = repr((fp, int(page_num), round(float(zoom), 3), int(rotation), mode, clip_key, layers))
+        return hashlib.blake2b(raw.encode(), digest_size=20).hexdigest()
+
+    # --------------------------------------------------------------- leitura
+    def get(self, key: str):
+        """Retorna (data, width, height, bytes_per_line, fmt) ou None."""
+        if not key:
+            return None
+        self._ensure_loaded()
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+
+        path = self._path_for(key)
+        try:
+            blob = path.read_bytes()
+            magic, width, height, bpl, fmt = self.HEADER.unpack_from(blob)
+            if magic != self.MAGIC:
+                raise ValueError("cabeçalho inválido")
+            data = zlib.decompress(blob[self.HEADER.size:])
+            if len(data) < bpl * height:
+                raise ValueError("blob truncado")
+            try:
+                os.utime(path)  # Mantém a ordem LRU entre sessões
+            except OSError:
+                pass
+            with self._lock:
+                self.hits += 1
+            return data, width, height, bpl, fmt
+        except Exception as e:
+            log_debug(f"RasterCache: Entrada corrompida/ausente {key[:8]}: {e}")
+            self._remove(key)
+            with self._lock:
+                self.misses += 1
+            return None
+
+    # -------------------------------------------------------------- escrita
+    def put(self, key: str, data: bytes, width: int, height: int, bytes_per_line: int, fmt: int) -> None:
+        """Grava um raster comprimido (escrita atômica) e poda o excedente."""
+        if not key or not data:
+            return
+        self._ensure_loaded()
+        try:
+            blob = self.HEADER.pack(self.MAGIC, width, height, bytes_per_line, int(fmt)) + zlib.compress(bytes(data), 1)
+            if len(blob) > self.max_bytes:
+                return
+
+            path = self._path_for(key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+            tmp.write_bytes(blob)
+            os.replace(tmp, path)
+
+            with self._lock:
+                old = self._entries.pop(key, 0)
+                self._entries[key] = len(blob)
+                self._total_bytes += len(blob) - old
+            self._prune()
+        except Exception as e:
+            log_error(f"RasterCache: Falha ao gravar entrada: {e}")
+
+    def clear(self) -> None:
+        """Remove todas as entradas do disco."""
+        self._ensure_loaded()
+        with self._lock:
+            keys = list(self._entries.keys())
+        for key in keys:
+            self._remove(key)
+
+    def stats(self) -> dict:
+        self._ensure_loaded()
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    # ------------------------------------------------------------- internos
+    def _path_for(self, key: str) -> Path:
+        # Subpastas por prefixo para não saturar um único diretório
+        return self.storage_dir / key[:2] / f"{key}.frc"
+
+    def _ensure_loaded(self):
+        """Indexa o diretório uma única vez, ordenando por mtime (mais antigo = LRU)."""
+        if self._entries is not None:
+            return
+        with self._lock:
+            if self._entries is not None:
+                return
+            found = []
+            try:
+                self.storage_dir.mkdir(parents=True, exist_ok=True)
+                for f in self.storage_dir.glob("*/*.frc"):
+                    try:
+                        st = f.stat()
+                        found.append((st.st_mtime_ns, f.stem, st.st_size))
+                    except OSError:
+                        pass
+            except Exception as e:
+                log_error(f"RasterCache: Falha ao indexar {self.storage_dir}: {e}")
+            found.sort()
+            self._entries = OrderedDict((name, size) for _, name, size in found)
+            self._total_bytes = sum(size for _, _, size in found)
+            log_debug(f"RasterCache: {len(found)} entradas ({self._total_bytes / 1024 / 1024:.1f}MB) indexadas.")
+        self._prune()
+
+    def _prune(self):
+        victims = []
+        with self._lock:
+            while self._entries and self._total_bytes > self.max_bytes:
+                name, size = self._entries.popitem(last=False)
+                self._total_bytes -= size
+                victims.append(name)
+        for name in victims:
+            try:
+                self._path_for(name).unlink()
+            except OSError:
+                pass
+
+    def _remove(self, key: str):
+        with self._lock:
+            size = self._entries.pop(key, None) if self._entries is not None else None
+            if size is not None:
+                self._total_bytes -= size
+        try:
+            self._path_for(key).unlink()
+        except OSError:
+            pass
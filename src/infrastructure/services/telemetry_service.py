@@ -2,6 +2,7 @@ import os
 import time
 import psutil
 import csv
+import json
 import sys
 from pathlib import Path
 from datetime import datetime
@@ -87,3 +88,22 @@ class TelemetryService:
             
         except Exception:
             pass # Silencioso para não travar o app
+
+    @classmethod
+    def log_render_stats(cls, stats: dict):
+        """
+        Registra um snapshot do RenderEngine.stats(): a linha resumida vai para o CSV
+        (duração = p95 até os pixels no viewer) e o snapshot completo para
+        render_stats.jsonl, ao lado do histórico.
+        """
+        try:
+            viewer = stats.get("sources", {}).get("viewer", {})
+            p95_s = viewer.get("total", {}).get("p95_ms", 0.0) / 1000.0
+            cls.log_operation("RENDER_STATS", duration=p95_s)
+
+            record = {"timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), **stats}
+            with open(cls.get_log_path().with_name("render_stats.jsonl"), 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, default=str) + "\n")
+        except Exception:
+            pass # Silencioso para não travar o app
+
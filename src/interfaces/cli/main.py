@@ -244,6 +244,10 @@ def update():
 if __name__ == '__main__':
     import sys
     import os
+    import multiprocessing
+    
+    # Processos de renderização (spawn) reexecutam o executável congelado
+    multiprocessing.freeze_support()
     
     # Verifica se há console/stdin válido (importante para build windowed)
     has_console = sys.stdin is not None and sys.stdin.isatty()
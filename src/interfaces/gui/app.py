@@ -7,6 +7,7 @@ All failures are logged to a file for debugging.
 import sys
 import os
 import traceback
+import multiprocessing
 from datetime import datetime
 
 # --- STARTUP LOG SYSTEM ---
@@ -238,5 +239,7 @@ def main(file_path: str = None):
         sys.exit(1)
 
 if __name__ == "__main__":
+    # Necessário para os processos de renderização (spawn) no executável congelado
+    multiprocessing.freeze_support()
     arg_file = sys.argv[1] if len(sys.argv) > 1 else None
     main(arg_file)
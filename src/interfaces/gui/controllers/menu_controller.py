@@ -182,6 +182,7 @@ class MenuController:
         reading_menu.addAction("Padrão").triggered.connect(lambda: self._action_reading_mode("default"))
         reading_menu.addAction("Sépia").triggered.connect(lambda: self._action_reading_mode("sepia"))
         reading_menu.addAction("Noturno").triggered.connect(lambda: self._action_reading_mode("dark"))
+        reading_menu.addAction("Alto Contraste").triggered.connect(lambda: self._action_reading_mode("high_contrast"))
         
         return menu
 
@@ -62,7 +62,10 @@ class WorkspaceController:
             # 5. Sincronizar RenderEngine (Single-Open Architecture)
             log_debug("WController [STEP 3]: Iniciando RenderEngine.set_document")
             try:
-                RenderEngine.instance().set_document(file_path, pre_opened_handle=opened_doc)
+                RenderEngine.instance().set_document(
+                    file_path, pre_opened_handle=opened_doc,
+                    complexity=(hints or {}).get("complexity")
+                )
             except Exception as e:
                 log_exception(f"WController: Erro crítico no RenderEngine: {e}")
                 try:
@@ -846,6 +846,7 @@ class MainWindow(QMainWindow):
         theme_menu.addAction("Padrão (Dark Grey)").triggered.connect(lambda: self.viewer.set_reading_mode("default") if self.viewer else None)
         theme_menu.addAction("Sépia (Conforto)").triggered.connect(lambda: self.viewer.set_reading_mode("sepia") if self.viewer else None)
         theme_menu.addAction("Noturno (OLED)").triggered.connect(lambda: self.viewer.set_reading_mode("dark") if self.viewer else None)
+        theme_menu.addAction("Alto Contraste").triggered.connect(lambda: self.viewer.set_reading_mode("high_contrast") if self.viewer else None)
 
         view_menu.addSeparator()
 
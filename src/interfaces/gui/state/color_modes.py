@@ -0,0 +1,87 @@
+from PyQt6.QtGui import QImage
+from src.infrastructure.services.logger import log_debug
+
+try:
+    import numpy as np
+except ImportError:  # Sem NumPy: apenas o modo escuro (QImage.invertPixels) é suportado
+    np = None
+
+
+class ColorModeFilter:
+    """
+    Modos de leitura aplicados sobre o raster padrão (RGB32) como tabelas de consulta (LUT)
+    vetorizadas em NumPy, direto no buffer da QImage (sem cópia adicional).
+    Executado nas threads de render; derivar um modo de um raster já em cache custa
+    milissegundos, em vez de uma nova rasterização do PDF.
+    """
+
+    MODES = ("default", "dark", "sepia", "high_contrast")
+
+    # Sépia: luminância mapeada entre tinta (marrom escuro) e papel (#F4ECD8, fundo do viewer)
+    SEPIA_INK = (58, 42, 26)
+    SEPIA_PAPER = (244, 236, 216)
+    # Alto contraste: estica a faixa [64, 192] para [0, 255]
+    CONTRAST_LOW = 64
+    CONTRAST_HIGH = 192
+
+    _luts = None
+
+    @classmethod
+    def paper_color(cls, mode: str) -> tuple:
+        """Cor (RGB) que o branco do papel assume no modo: fundo das áreas ainda sem tiles."""
+        return {"dark": (0, 0, 0), "sepia": cls.SEPIA_PAPER}.get(mode, (255, 255, 255))
+
+    @classmethod
+    def _tables(cls) -> dict:
+        if cls._luts is None:
+            levels = np.arange(256, dtype=np.float32) / 255.0
+            ink = np.array(cls.SEPIA_INK, dtype=np.float32)[:, None]
+            paper = np.array(cls.SEPIA_PAPER, dtype=np.float32)[:, None]
+            r, g, b = np.round(ink + (paper - ink) * levels).astype(np.uint32)
+            # luminância -> pixel 0xFFRRGGBB completo (um único gather por pixel)
+            sepia = 0xFF000000 | (r << 16) | (g << 8) | b
+
+            # Contraste por canal, aplicado a pares de bytes (metade dos acessos à tabela).
+            # 255 -> 255 preserva o byte X/alpha do RGB32.
+            span = cls.CONTRAST_HIGH - cls.CONTRAST_LOW
+            channel = np.clip(np.round((np.arange(256) - cls.CONTRAST_LOW) * 255.0 / span), 0, 255).astype(np.uint16)
+            contrast = ((channel[:, None] << 8) | channel[None, :]).ravel()
+            cls._luts = {"sepia": sepia, "high_contrast": contrast}
+        return cls._luts
+
+    @classmethod
+    def apply(cls, img: QImage, mode: str) -> QImage:
+        """Aplica o modo in-place (a QImage deve ser própria e RGB32). Retorna a mesma imagem."""
+        if mode == "default" or img.isNull():
+            return img
+
+        if np is None:
+            if mode == "dark":
+                img.invertPixels()
+            else:
+                log_debug(f"ColorModeFilter: NumPy indisponível, modo '{mode}' ignorado.")
+            return img
+
+        if img.format() != QImage.Format.Format_RGB32:
+            img.convertTo(QImage.Format.Format_RGB32)
+
+        # RGB32 tem linhas alinhadas a 32 bits: o buffer inteiro é uma sequência de 0xFFRRGGBB
+        ptr = img.bits()
+        ptr.setsize(img.sizeInBytes())
+        pixels = np.frombuffer(ptr, dtype=np.uint32)
+
+        if mode == "dark":
+            np.bitwise_xor(pixels, 0x00FFFFFF, out=pixels)
+        elif mode == "sepia":
+            channels = pixels.view(np.uint8).reshape(-1, 4)  # Little-endian: B, G, R, X
+            # Cada canal vira uint16 antes do produto: com as regras de promoção do
+            # NumPy 1.x, uint8 * escalar continuaria uint8 e daria a volta
+            luma = channels[:, 2].astype(np.uint16) * np.uint16(77)
+            luma += channels[:, 1].astype(np.uint16) * np.uint16(150)
+            luma += channels[:, 0].astype(np.uint16) * np.uint16(29)
+            luma >>= 8
+            np.take(cls._tables()["sepia"], luma, out=pixels)
+        elif mode == "high_contrast":
+            pairs = pixels.view(np.uint16)
+            np.take(cls._tables()["high_contrast"], pairs, out=pairs)
+        return img
@@ -0,0 +1,204 @@
+import os
+import time
+from pathlib import Path
+from PyQt6.QtCore import QMutex, QMutexLocker, QWaitCondition
+from src.infrastructure.services.logger import log_debug, log_error
+from src.interfaces.gui.state.word_store import WordStore
+
+
+class DocumentHandlePool:
+    """
+    Handles fitz abertos de um único documento (chave: caminho resolvido).
+    Quem pede um handle com o pool cheio dorme em uma QWaitCondition e é acordado
+    na devolução (sem polling). Cada pool tem sua própria sessão: ao ser aposentado
+    (arquivo alterado em disco ou motor encerrado), as esperas retornam None e os
+    handles em uso são fechados na devolução.
+    """
+
+    def __init__(self, path: Path, session_id: int, on_close=None):
+        self.path = path
+        self.session_id = session_id
+        self._on_close = on_close # Chamado com cada handle que sai do pool (caches ligados a ele)
+        self.mtime = self._stat_mtime(path)
+        self.last_used = time.monotonic()
+        self.retired = False
+        # {página: frozenset(xrefs de OCG)} calculado em segundo plano (None até ficar pronto)
+        self.layer_usage = None
+        self.layer_index_requested = False
+        # Palavras por página para a seleção de texto (ver RenderEngine.build_word_index)
+        self.words = WordStore()
+        self.word_index_requested = False
+        self._free = [] # Handles livres (LIFO: o mais recente tem DisplayLists quentes)
+        self._handles = []
+        self._opening = 0 # Vagas reservadas durante o fitz.open (fora do mutex)
+        self._in_use = 0
+        self._limit = 1 # Último max_handles informado pelo motor
+        self._mutex = QMutex()
+        self._available = QWaitCondition()
+
+    @staticmethod
+    def _stat_mtime(path: Path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def is_stale(self) -> bool:
+        """True se o arquivo mudou em disco desde a abertura do pool."""
+        return self._stat_mtime(self.path) != self.mtime
+
+    @property
+    def open_handles(self) -> int:
+        return len(self._handles)
+
+    @property
+    def is_idle(self) -> bool:
+        """Nenhum handle emprestado a uma tarefa (pode ser fechado com segurança)."""
+        return self._in_use == 0
+
+    def inject(self, handle):
+        """Adota um handle já aberto (ex.: o documento aberto pelo WorkspaceController)."""
+        handle._session_id = self.session_id
+        with QMutexLocker(self._mutex):
+            self._handles.append(handle)
+            self._free.append(handle)
+            self._available.wakeOne()
+
+    def acquire(self, max_handles: int, blocking: bool = True):
+        """
+        Empresta um handle livre, abre um novo se houver vaga ou espera por uma
+        devolução. Retorna None se o pool foi aposentado (ou o arquivo não abriu)
+        ou, com 'blocking' falso (chamadas da GUI), se o pool está cheio.
+        """
+        with QMutexLocker(self._mutex):
+            self._limit = max_handles
+            while True:
+                if self.retired:
+                    return None
+                # 1. Handle livre
+                while self._free:
+                    handle = self._free.pop()
+                    if handle.is_closed:
+                        self._handles.remove(handle)
+                        self._notify_close(handle)
+                        continue
+                    self._in_use += 1
+                    self.last_used = time.monotonic()
+                    return handle
+                # 2. Vaga para abrir um novo (o fitz.open roda fora do mutex)
+                if len(self._handles) + self._opening < self._limit:
+                    self._opening += 1
+                    self._in_use += 1
+                    break
+                # 3. Pool cheio: dormir até release/inject/retire
+                if not blocking:
+                    return None
+                self._available.wait(self._mutex)
+
+        handle = self._open()
+        with QMutexLocker(self._mutex):
+            self._opening -= 1
+            if handle is None:
+                self._in_use -= 1
+                self._available.wakeOne() # A vaga reservada volta a quem espera
+            else:
+                self._handles.append(handle)
+        return handle
+
+    def prewarm(self, count: int, max_handles: int) -> int:
+        """
+        Abre handles até 'count' (limitado a max_handles) e os deixa livres; roda em
+        segundo plano logo após set_document para o primeiro render não pagar o fitz.open.
+        """
+        opened = 0
+        while True:
+            with QMutexLocker(self._mutex):
+                total = len(self._handles) + self._opening
+                if self.retired or total >= min(count, max_handles):
+                    return opened
+                self._opening += 1
+
+            handle = self._open()
+            with QMutexLocker(self._mutex):
+                self._opening -= 1
+                if handle is None:
+                    self._available.wakeOne()
+                    return opened
+                self._handles.append(handle)
+                if not self.retired:
+                    self._free.append(handle)
+                    self._available.wakeOne()
+                    handle = None
+            if handle is not None: # Aposentado durante a abertura
+                self._close(handle)
+                return opened
+            opened += 1
+
+    def _open(self):
+        import fitz
+        try:
+            log_debug(f"DocumentPool [S{self.session_id}]: Abrindo handle {len(self._handles) + 1} de {self.path.name}...")
+            handle = fitz.open(str(self.path))
+            handle._session_id = self.session_id
+            return handle
+        except Exception as e:
+            log_error(f"DocumentPool: Falha ao criar handle: {e}")
+            return None
+
+    def release(self, handle, max_handles: int):
+        """Devolve o handle e acorda um pedido em espera; fecha-o se o pool foi aposentado ou está acima do limite."""
+        with QMutexLocker(self._mutex):
+            self._in_use = max(0, self._in_use - 1)
+            self._limit = max_handles
+            self.last_used = time.monotonic()
+            keep = not handle.is_closed and not self.retired and len(self._handles) <= max_handles
+            if keep:
+                self._free.append(handle)
+            self._available.wakeOne()
+
+        if handle.is_closed:
+            self._forget(handle)
+        elif not keep:
+            log_debug(f"DocumentPool [S{self.session_id}]: Fechando handle aposentado ou excedente.")
+            self._close(handle)
+
+    def set_limit(self, max_handles: int):
+        """Atualiza o limite de handles; esperas reavaliam (podem abrir as vagas novas)."""
+        with QMutexLocker(self._mutex):
+            self._limit = max_handles
+            self._available.wakeAll()
+
+    def close_idle(self) -> int:
+        """Fecha os handles livres (o documento volta a abrir sob demanda)."""
+        with QMutexLocker(self._mutex):
+            idle, self._free = self._free, []
+        for handle in idle:
+            self._close(handle)
+        return len(idle)
+
+    def retire(self):
+        """Invalida a sessão: esperas retornam None, os handles livres fecham e os emprestados fecham na devolução."""
+        with QMutexLocker(self._mutex):
+            self.retired = True
+            self._available.wakeAll()
+        self.close_idle()
+
+    def _close(self, handle):
+        try: handle.close()
+        except Exception: pass
+        self._forget(handle)
+
+    def _forget(self, handle):
+        with QMutexLocker(self._mutex):
+            if handle in self._handles:
+                self._handles.remove(handle)
+            self._available.wakeOne() # Uma vaga foi liberada
+        self._notify_close(handle)
+
+    def _notify_close(self, handle):
+        if self._on_close is None:
+            return
+        try:
+            self._on_close(handle)
+        except Exception as e:
+            log_error(f"DocumentPool: Falha ao liberar caches do handle: {e}")
@@ -0,0 +1,204 @@
+import bisect
+from array import array
+
+
+class PageSlot:
+    """
+    Página do documento virtual exibido pelo viewer: origem, tamanho em pontos e
+    rotação. Não é um widget; só as páginas da janela visível recebem um PageWidget.
+    """
+
+    __slots__ = ("source_path", "source_index", "width_pt", "height_pt", "rotation")
+
+    def __init__(self, source_path: str, source_index: int, width_pt: float, height_pt: float, rotation: int = 0):
+        self.source_path = source_path
+        self.source_index = source_index
+        self.width_pt = width_pt
+        self.height_pt = height_pt
+        self.rotation = rotation
+
+    def size_pt(self) -> tuple[float, float]:
+        """Tamanho exibido em pontos (largura/altura trocadas em 90°/270°)."""
+        if self.rotation % 180 != 0:
+            return self.height_pt, self.width_pt
+        return self.width_pt, self.height_pt
+
+    def size_px(self, zoom: float) -> tuple[int, int]:
+        """Tamanho do widget no zoom informado (mesmo arredondamento do PageWidget)."""
+        w, h = self.size_pt()
+        return int(w * zoom), int(h * zoom)
+
+
+class _PrefixSums:
+    """Árvore de Fenwick sobre um array de floats: soma de prefixo e atualização em O(log n)."""
+
+    def __init__(self, values):
+        self._tree = array("d", [0.0]) + array("d", values)
+        size = len(self._tree)
+        for i in range(1, size):
+            parent = i + (i & -i)
+            if parent < size:
+                self._tree[parent] += self._tree[i]
+
+    def add(self, index: int, delta: float):
+        i = index + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def prefix(self, count: int) -> float:
+        """Soma dos 'count' primeiros valores."""
+        total = 0.0
+        while count > 0:
+            total += self._tree[count]
+            count -= count & -count
+        return total
+
+
+class PageLayout:
+    """
+    Índice de geometria das páginas no container do viewer, calculado só com os metadados
+    (sem widgets): coluna única ou lado a lado, com as mesmas margens/espaçamento do
+    antigo QVBoxLayout/QGridLayout.
+
+    Tamanhos ficam em pontos (arrays) e as alturas das linhas numa árvore de somas de
+    prefixo, de modo que o zoom é O(1), girar uma página é O(log n) e as consultas de
+    faixa visível e página atual são buscas binárias. O topo da linha r
+    em px é MARGIN + round(zoom * soma das alturas anteriores) + SPACING * r.
+    """
+
+    MARGIN = 40
+    SPACING = 30
+
+    def __init__(self):
+        self._zoom = 1.0
+        self._columns = 1
+        self._widths = array("d")   # por página, em pt (rotação aplicada)
+        self._heights = array("d")
+        self._row_heights = array("d")
+        self._offsets = _PrefixSums([])
+        self._col_widths = [0.0]
+        self._container_width = 0
+
+    def __len__(self) -> int:
+        return len(self._widths)
+
+    @property
+    def rows(self) -> int:
+        return len(self._row_heights)
+
+    # --- Atualizações ---
+
+    def rebuild(self, slots, zoom: float, columns: int = 1):
+        """Recria o índice a partir dos slots (abertura de documento)."""
+        self._zoom = zoom
+        self._widths = array("d")
+        self._heights = array("d")
+        self.extend(slots, columns)
+
+    def extend(self, slots, columns: int = None):
+        """Acrescenta páginas ao fim (documentos anexados)."""
+        for slot in slots:
+            w, h = slot.size_pt()
+            self._widths.append(w)
+            self._heights.append(h)
+        self._reindex(columns or self._columns)
+
+    def set_zoom(self, zoom: float):
+        """O(1): as posições em px são derivadas das somas em pontos na consulta."""
+        self._zoom = zoom
+
+    def set_columns(self, columns: int):
+        if columns != self._columns:
+            self._reindex(columns)
+
+    def update_page(self, index: int, slot):
+        """Tamanho da página mudou (rotação): atualiza só a linha dela e as somas em O(log n)."""
+        w, h = slot.size_pt()
+        old_w = self._widths[index]
+        self._widths[index], self._heights[index] = w, h
+
+        row, col = divmod(index, self._columns)
+        start = row * self._columns
+        row_height = max(self._heights[start:start + self._columns])
+        self._offsets.add(row, row_height - self._row_heights[row])
+        self._row_heights[row] = row_height
+
+        if w >= self._col_widths[col]:
+            self._col_widths[col] = w
+        elif old_w == self._col_widths[col]:
+            self._col_widths[col] = max(self._widths[col::self._columns])
+
+    def reorder(self, new_order: list[int]):
+        """Nova ordem (índices da ordem atual): só os arrays são permutados."""
+        self._widths = array("d", (self._widths[i] for i in new_order))
+        self._heights = array("d", (self._heights[i] for i in new_order))
+        self._reindex(self._columns)
+
+    def _reindex(self, columns: int):
+        self._columns = max(1, columns)
+        heights = self._heights
+        self._row_heights = array("d", (
+            max(heights[start:start + self._columns]) for start in range(0, len(heights), self._columns)
+        ))
+        self._offsets = _PrefixSums(self._row_heights)
+        self._col_widths = [max(self._widths[col::self._columns], default=0.0) for col in range(self._columns)]
+
+    # --- Consultas ---
+
+    def _row_top(self, row: int) -> int:
+        return self.MARGIN + round(self._zoom * self._offsets.prefix(row)) + self.SPACING * row
+
+    def _row_bottom(self, row: int) -> int:
+        return self._row_top(row) + int(self._row_heights[row] * self._zoom)
+
+    def _col_widths_px(self) -> list[int]:
+        return [int(w * self._zoom) for w in self._col_widths]
+
+    def content_size(self) -> tuple[int, int]:
+        """Tamanho mínimo do container para exibir todas as páginas."""
+        used = [w for w in self._col_widths_px() if w > 0] or [0]
+        width = sum(used) + self.SPACING * (len(used) - 1) + 2 * self.MARGIN
+        height = (self._row_bottom(self.rows - 1) if self.rows else 0) + self.MARGIN
+        return width, height
+
+    def set_width(self, width: int):
+        """Largura atual do container: as páginas ficam centralizadas nela."""
+        self._container_width = width
+
+    def _column_lefts(self) -> list[int]:
+        widths = self._col_widths_px()
+        used = [w for w in widths if w > 0]
+        x = (max(self._container_width, self.content_size()[0]) - (sum(used) + self.SPACING * (len(used) - 1))) // 2
+        lefts = []
+        for w in widths:
+            lefts.append(x)
+            x += w + self.SPACING
+        return lefts
+
+    def rect(self, index: int) -> tuple[int, int, int, int]:
+        """(x, y, largura, altura) da página em px do container."""
+        w = int(self._widths[index] * self._zoom)
+        h = int(self._heights[index] * self._zoom)
+        row, col = divmod(index, self._columns)
+        x = self._column_lefts()[col] + (int(self._col_widths[col] * self._zoom) - w) // 2
+        y = self._row_top(row)
+        if self._columns > 1:
+            y += (int(self._row_heights[row] * self._zoom) - h) // 2
+        return x, y, w, h
+
+    def pages_between(self, top: int, bottom: int) -> range:
+        """Índices das páginas cujas linhas cruzam a faixa vertical [top, bottom)."""
+        rows = range(self.rows)
+        first_row = bisect.bisect_right(rows, top, key=self._row_bottom)
+        last_row = bisect.bisect_left(rows, bottom, key=self._row_top)
+        if first_row >= last_row:
+            return range(0)
+        return range(first_row * self._columns, min(last_row * self._columns, len(self)))
+
+    def index_at(self, y: int) -> int:
+        """Primeira página cuja linha termina abaixo de 'y' (a última se 'y' passa do fim)."""
+        if not self.rows:
+            return 0
+        row = min(bisect.bisect_right(range(self.rows), y, key=self._row_bottom), self.rows - 1)
+        return row * self._columns
@@ -0,0 +1,144 @@
+from collections import OrderedDict
+
+
+class PixmapCache:
+    """
+    Cache LRU de pixmaps com orçamento em bytes.
+    Cada categoria ('page', 'thumbnail') possui sua própria cota, evitando que
+    uma tempestade de miniaturas expulse os renders de página (e vice-versa).
+    Todas as operações são O(1) via OrderedDict (move_to_end/popitem).
+    """
+
+    DEFAULT_QUOTAS = {
+        "page": 384 * 1024 * 1024,      # ~4 pranchas A0 no limite de 5120px
+        "thumbnail": 32 * 1024 * 1024,
+    }
+
+    def __init__(self, quotas: dict | None = None):
+        self._quotas = dict(quotas or self.DEFAULT_QUOTAS)
+        self._pools = {name: OrderedDict() for name in self._quotas}
+        self._used = {name: 0 for name in self._quotas}
+        self._index = {}  # key -> categoria (lookup O(1) sem varrer os pools)
+        self._attached = {}  # key -> objeto auxiliar que sai do cache junto com o item
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def pixmap_nbytes(pixmap) -> int:
+        """Estima o custo em memória de um pixmap (width * height * depth)."""
+        try:
+            return max(0, int(pixmap.width()) * int(pixmap.height()) * int(pixmap.depth()) // 8)
+        except Exception:
+            return 0
+
+    def __contains__(self, key) -> bool:
+        return key in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def keys(self) -> list:
+        """Snapshot das chaves armazenadas (todas as categorias)."""
+        return list(self._index)
+
+    def get(self, key):
+        """Retorna o valor (promovendo-o a MRU) ou None em caso de miss."""
+        category = self._index.get(key)
+        if category is None:
+            self.misses += 1
+            return None
+
+        pool = self._pools[category]
+        pool.move_to_end(key)
+        self.hits += 1
+        return pool[key][0]
+
+    def put(self, key, value, category: str = "page", nbytes: int | None = None) -> bool:
+        """
+        Insere um item na categoria informada, expulsando os menos usados até caber na cota.
+        Retorna False se o item sozinho excede a cota (não é armazenado).
+        """
+        if category not in self._pools:
+            category = "page"
+        if nbytes is None:
+            nbytes = self.pixmap_nbytes(value)
+
+        quota = self._quotas[category]
+        if nbytes > quota:
+            return False
+
+        if key in self._index:
+            self.discard(key)
+
+        self._evict_until(category, quota - nbytes)
+        self._pools[category][key] = (value, nbytes)
+        self._index[key] = category
+        self._used[category] += nbytes
+        return True
+
+    def attach(self, key, obj) -> None:
+        """
+        Associa um objeto ao item já armazenado (ex.: a QImage que compartilha o buffer
+        do pixmap). Não conta na cota e é descartado junto com o item.
+        """
+        if key in self._index:
+            self._attached[key] = obj
+
+    def attached(self, key):
+        """Objeto associado ao item (None se não houver ou se o item saiu do cache)."""
+        return self._attached.get(key)
+
+    def discard(self, key) -> None:
+        """Remove um item se existir (sem contar como expulsão)."""
+        self._attached.pop(key, None)
+        category = self._index.pop(key, None)
+        if category is None:
+            return
+        _, size = self._pools[category].pop(key)
+        self._used[category] -= size
+
+    def clear(self) -> None:
+        for name in self._pools:
+            self._pools[name].clear()
+            self._used[name] = 0
+        self._index.clear()
+        self._attached.clear()
+
+    def set_quota(self, category: str, nbytes: int) -> None:
+        """Ajusta a cota de uma categoria, expulsando itens excedentes imediatamente."""
+        if category not in self._pools:
+            self._pools[category] = OrderedDict()
+            self._used[category] = 0
+        self._quotas[category] = max(0, int(nbytes))
+        self._evict_until(category, self._quotas[category])
+
+    def _evict_until(self, category: str, limit: int) -> None:
+        """Expulsa os itens LRU da categoria até que a ocupação seja <= limit."""
+        pool = self._pools[category]
+        while pool and self._used[category] > limit:
+            old_key, (_, old_size) = pool.popitem(last=False)
+            del self._index[old_key]
+            self._attached.pop(old_key, None)
+            self._used[category] -= old_size
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        """Snapshot dos contadores e da ocupação por categoria."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "entries": len(self._index),
+            "bytes": sum(self._used.values()),
+            "categories": {
+                name: {
+                    "entries": len(self._pools[name]),
+                    "bytes": self._used[name],
+                    "quota": self._quotas[name],
+                }
+                for name in self._pools
+            },
+        }
@@ -2,8 +2,17 @@ from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot,
 from PyQt6.QtGui import QImage, QPixmap
 from src.infrastructure.services.logger import log_debug, log_error, log_exception
 from src.domain.ports.pdf_operations import PDFOperationsPort
+from src.interfaces.gui.state.render_cache import PixmapCache
+from src.interfaces.gui.state.color_modes import ColorModeFilter
+from src.interfaces.gui.state.worker_policy import WorkerPolicy
+from src.interfaces.gui.state.document_pool import DocumentHandlePool
+from src.interfaces.gui.state.render_scheduler import RenderScheduler
+from src.interfaces.gui.state.render_stats import RenderStats
+from src.interfaces.gui.state.word_store import PageWords
+from collections import OrderedDict
 from pathlib import Path
-import queue
+import math
+import time
 
 class RenderTask(QRunnable):
     """Tarefa individual de renderização para o ThreadPool."""
@@ -11,8 +20,15 @@ class RenderTask(QRunnable):
     class Signals(QObject):
         # Usamos QImage pois é thread-safe para transporte; QPixmap é apenas UI.
         finished = pyqtSignal(int, QImage, float, int, str, object) # index, image, zoom, rotation, mode, clip
+        done = pyqtSignal() # Emitido sempre ao término (sucesso, erro ou sessão expirada)
+        base_ready = pyqtSignal(QImage) # Raster no modo padrão, antes do filtro de cor (reuso entre modos)
 
-    def __init__(self, adapter: PDFOperationsPort, acquire_handle_cb, release_handle_cb, page_num, zoom, rotation, session_id, mode="default", clip=None, layer_config=None):
+    # Limite de segurança para evitar QImage gigantesca (> 5k)
+    MAX_RES = 5120
+    # Layout nativo do QPixmap (raster): QPixmap.fromImage compartilha o buffer sem copiar
+    NATIVE_FORMAT = QImage.Format.Format_RGB32
+
+    def __init__(self, adapter: PDFOperationsPort, acquire_handle_cb, release_handle_cb, page_num, zoom, rotation, session_id, mode="default", clip=None, layer_config=None, disk_cache=None, doc_path=None, process_pool=None):
         super().__init__()
         self._adapter = adapter
         self.acquire_handle = acquire_handle_cb
@@ -24,21 +40,91 @@ class RenderTask(QRunnable):
         self.mode = mode
         self.clip = clip # (x0, y0, x1, y1)
         self.layer_config = layer_config
+        self.disk_cache = disk_cache
+        self.doc_path = doc_path
+        self.process_pool = process_pool # Backend multiprocesso opcional
         self.signals = self.Signals()
+        self._cancelled = False # Token de cancelamento (setado pela thread da GUI)
+        self.timings = {} # Medições do worker (handle_wait_ms, render_ms, disk_hit) lidas pelo motor
+
+    def cancel(self):
+        """Marca a tarefa como obsoleta; ela aborta no próximo ponto de verificação."""
+        self._cancelled = True
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._cancelled
 
     @pyqtSlot()
     def run(self):
-        doc_handle = None
         try:
-            current_zoom = self.zoom
+            if self._cancelled:
+                return
+
+            # TIER 2: Cache em disco (reabertura a quente sem tocar no MuPDF).
+            # Guarda sempre o raster padrão: os modos de cor são derivados dele.
+            base, disk_key = None, None
+            if self.disk_cache is not None and self.doc_path is not None:
+                disk_key = self.disk_cache.make_key(
+                    self.doc_path, self.page_num, self.zoom, self.rotation,
+                    "default", self.clip, self.layer_config
+                )
+                cached = self.disk_cache.get(disk_key)
+                if cached:
+                    data, width, height, bpl, fmt = cached
+                    base = self._detach_native(QImage(data, width, height, bpl, QImage.Format(fmt)))
+                    if base.isNull():
+                        base = None
+                    else:
+                        disk_key = None # Já está no disco
+                        self.timings["disk_hit"] = True
             
-            # Limite de segurança para evitar QImage gigantesca (> 5k)
-            MAX_RES = 5120
+            if base is None:
+                # Página saiu da janela visível enquanto consultávamos o disco
+                if self._cancelled:
+                    log_debug(f"RenderTask [P{self.page_num}]: Cancelada antes de adquirir handle.")
+                    return
+
+                if self.process_pool is not None and self.doc_path is not None:
+                    started = time.perf_counter()
+                    base = self._render_in_process()
+                    self.timings["render_ms"] = (time.perf_counter() - started) * 1000
+                else:
+                    base = self._render_in_thread()
+                if base is None or base.isNull():
+                    return
+            
+            # Modo de cor: passe vetorizado sobre uma cópia; o raster padrão volta
+            # ao motor para que trocas de modo posteriores não re-rasterizem o PDF
+            img = base
+            if self.mode != "default":
+                self.signals.base_ready.emit(base)
+                img = ColorModeFilter.apply(base.copy(), self.mode)
             
+            self.signals.finished.emit(self.page_num, img, self.zoom, self.rotation, self.mode, self.clip)
+            if disk_key:
+                bits = base.constBits()
+                bits.setsize(base.sizeInBytes())
+                self.disk_cache.put(disk_key, bytes(bits), base.width(), base.height(), base.bytesPerLine(), base.format().value)
+                
+        except Exception as e:
+            log_error(f"RenderTask Error [P{self.page_num}]: {e}")
+        finally:
+            self.signals.done.emit()
+
+    def _render_in_thread(self):
+        """Renderiza nesta thread reutilizando um handle do pool Single-Open."""
+        doc_handle = None
+        try:
+            current_zoom = self.zoom
+
             # OBTER HANDLE DO POOL (Single-Open Thread-Safe)
+            started = time.perf_counter()
             doc_handle = self.acquire_handle(self.session_id)
+            acquired = time.perf_counter()
+            self.timings["handle_wait_ms"] = (acquired - started) * 1000
             if not doc_handle:
-                return
+                return None
                 
             if doc_handle.is_closed:
                 raise ValueError("document closed")
@@ -48,54 +134,242 @@ class RenderTask(QRunnable):
                 self._adapter.apply_layer_config_to_handle(doc_handle, self.layer_config)
 
             # Renderização via Adaptador REUSANDO O HANDLE
-            samples, width, height, stride = self._adapter.render_page(
-                None,  # Path é None pois passamos o handle
-                self.page_num, 
-                current_zoom, 
-                self.rotation,
-                clip=self.clip,
-                doc_handle=doc_handle
-            )
+            samples, width, height, stride, owner = self._rasterize(doc_handle, current_zoom, self.clip)
             
             # Se a imagem for muito grande, reduzir zoom e tentar novamente (Safety Pass)
-            if (width > MAX_RES or height > MAX_RES) and self.clip is None:
-                scale = MAX_RES / max(width, height)
+            if (width > self.MAX_RES or height > self.MAX_RES) and self.clip is None:
+                scale = self.MAX_RES / max(width, height)
                 current_zoom *= scale
                 log_debug(f"Render: Reduzindo zoom de segurança para {current_zoom:.2f} (Original: {self.zoom})")
-                samples, width, height, stride = self._adapter.render_page(
-                    None, self.page_num, current_zoom, self.rotation, doc_handle=doc_handle
-                )
+                samples, width, height, stride, owner = self._rasterize(doc_handle, current_zoom, None)
 
             if not samples:
-                return
+                return None
+
+            # Evita a cópia/conversão para QImage de um raster que ninguém vai exibir
+            if self._cancelled:
+                log_debug(f"RenderTask [P{self.page_num}]: Cancelada antes da conversão do pixmap.")
+                return None
                 
-            fmt = QImage.Format.Format_RGB888
-            # Criamos uma QImage que será enviada para a thread principal
-            img = QImage(samples, width, height, stride, fmt).copy()
-            
-            # Filtros básicos agressivos
-            if self.mode == "dark":
-                img.invertPixels()
-            elif self.mode == "sepia":
-                self._apply_sepia(img)
-            
+            # QImage envolve as amostras do MuPDF ('owner' as mantém vivas) e é
+            # convertida uma única vez para o layout nativo, em memória própria
+            img = self._detach_native(QImage(samples, width, height, stride, QImage.Format.Format_RGB888))
+            self.timings["render_ms"] = (time.perf_counter() - acquired) * 1000
+            return img
+        finally:
+            if doc_handle:
+                self.release_handle(doc_handle, self.session_id)
+
+    def _render_in_process(self):
+        """
+        Delega a rasterização a um processo worker (sem GIL compartilhado). A QImage
+        envolve o segmento de memória compartilhada e é copiada uma única vez.
+        """
+        raster = self.process_pool.render(
+            self.doc_path, self.page_num, self.zoom, self.rotation,
+            clip=self.clip, layer_config=self.layer_config, max_res=self.MAX_RES
+        )
+        try:
+            if self._cancelled:
+                log_debug(f"RenderTask [P{self.page_num}]: Cancelada antes da conversão do pixmap.")
+                return None
+            if raster.zoom != self.zoom:
+                log_debug(f"Render: Reduzindo zoom de segurança para {raster.zoom:.2f} (Original: {self.zoom})")
+            return self._detach_native(QImage(raster.buffer, raster.width, raster.height, raster.stride, QImage.Format.Format_RGB888))
+        finally:
+            raster.release()
+
+    def _rasterize(self, doc_handle, zoom, clip):
+        """
+        Renderiza via adaptador. Com render_pixmap, as amostras são lidas direto do
+        fitz.Pixmap (sem a cópia para bytes); o pixmap volta como 'owner' do buffer.
+        """
+        if hasattr(self._adapter, "render_pixmap"):
+            pix = self._adapter.render_pixmap(None, self.page_num, zoom, self.rotation, clip=clip, doc_handle=doc_handle)
+            return pix.samples_mv, pix.width, pix.height, pix.stride, pix
+        samples, width, height, stride = self._adapter.render_page(None, self.page_num, zoom, self.rotation, clip=clip, doc_handle=doc_handle)
+        return samples, width, height, stride, None
+
+    @classmethod
+    def _detach_native(cls, img: QImage) -> QImage:
+        """
+        Única cópia do quadro: da memória externa (MuPDF, memória compartilhada ou blob
+        do disco) para um buffer da própria QImage, já em RGB32. Na GUI,
+        QPixmap.fromImage apenas compartilha esse buffer.
+        """
+        if img.format() == cls.NATIVE_FORMAT:
+            return img.copy()
+        return img.convertToFormat(cls.NATIVE_FORMAT)
+
+class ColorModeTask(QRunnable):
+    """
+    Deriva um modo de cor a partir de um raster padrão já em cache (sem tocar no MuPDF).
+    Compartilha os sinais e o token de cancelamento da RenderTask.
+    """
+
+    def __init__(self, source: QImage, page_num, zoom, rotation, mode, clip=None):
+        super().__init__()
+        self.source = source
+        self.page_num = page_num
+        self.zoom = zoom
+        self.rotation = rotation
+        self.mode = mode
+        self.clip = clip
+        self.signals = RenderTask.Signals()
+        self._cancelled = False
+        self.timings = {"derived": True}
+
+    def cancel(self):
+        self._cancelled = True
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._cancelled
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            if self._cancelled:
+                return
+            started = time.perf_counter()
+            img = ColorModeFilter.apply(RenderTask._detach_native(self.source), self.mode)
+            self.timings["render_ms"] = (time.perf_counter() - started) * 1000
+            self.source = None
             if not img.isNull():
                 self.signals.finished.emit(self.page_num, img, self.zoom, self.rotation, self.mode, self.clip)
-                
         except Exception as e:
-            log_error(f"RenderTask Error [P{self.page_num}]: {e}")
+            log_error(f"ColorModeTask Error [P{self.page_num}]: {e}")
+        finally:
+            self.signals.done.emit()
+
+class LayerIndexTask(QRunnable):
+    """
+    Monta em segundo plano o índice {página: OCGs usados} de um documento
+    (ver PyMuPDFAdapter.get_page_layer_usage), usando um handle do pool da sessão.
+    """
+
+    class Signals(QObject):
+        finished = pyqtSignal(object) # dict {página: frozenset(xrefs)}
+        done = pyqtSignal()
+
+    def __init__(self, adapter: PDFOperationsPort, acquire_handle_cb, release_handle_cb, session_id):
+        super().__init__()
+        self._adapter = adapter
+        self.acquire_handle = acquire_handle_cb
+        self.release_handle = release_handle_cb
+        self.session_id = session_id
+        self.signals = self.Signals()
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._cancelled
+
+    @pyqtSlot()
+    def run(self):
+        doc_handle = None
+        try:
+            if self._cancelled:
+                return
+            doc_handle = self.acquire_handle(self.session_id)
+            if not doc_handle:
+                return
+            started = time.perf_counter()
+            usage = self._adapter.get_page_layer_usage(None, doc_handle=doc_handle)
+            if isinstance(usage, dict):
+                log_debug(f"LayerIndex [S{self.session_id}]: {len(usage)} páginas indexadas em {(time.perf_counter() - started) * 1000:.0f}ms.")
+                self.signals.finished.emit(usage)
+        except Exception as e:
+            log_error(f"LayerIndexTask Error [S{self.session_id}]: {e}")
+        finally:
+            if doc_handle:
+                self.release_handle(doc_handle, self.session_id)
+            self.signals.done.emit()
+
+class WordIndexTask(QRunnable):
+    """
+    Extrai em segundo plano as palavras de um bloco de páginas (PageWords com grade
+    espacial) usando um handle do pool da sessão, para a seleção de texto do viewer.
+    """
+
+    class Signals(QObject):
+        finished = pyqtSignal(object) # dict {página: PageWords}
+        done = pyqtSignal()
+
+    def __init__(self, adapter: PDFOperationsPort, acquire_handle_cb, release_handle_cb, session_id, pages):
+        super().__init__()
+        self._adapter = adapter
+        self.acquire_handle = acquire_handle_cb
+        self.release_handle = release_handle_cb
+        self.session_id = session_id
+        self.pages = pages
+        self.urgent = False # Página pedida pela seleção (ver RenderEngine.page_words)
+        self.signals = self.Signals()
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._cancelled
+
+    @pyqtSlot()
+    def run(self):
+        doc_handle = None
+        try:
+            if self._cancelled:
+                return
+            doc_handle = self.acquire_handle(self.session_id)
+            if not doc_handle:
+                return
+            words = self._adapter.get_page_words(None, self.pages, doc_handle=doc_handle)
+            self.signals.finished.emit({page: PageWords(page_words) for page, page_words in words.items()})
+        except Exception as e:
+            log_error(f"WordIndexTask Error [S{self.session_id}]: {e}")
         finally:
             if doc_handle:
                 self.release_handle(doc_handle, self.session_id)
+            self.signals.done.emit()
 
-    def _apply_sepia(self, img: QImage):
-        pass
+class _PendingRender:
+    """Registro de uma tarefa em voo: callbacks aguardando e origens que a solicitaram."""
+    __slots__ = ("task", "callbacks", "sources", "preview", "source", "requested_at")
+
+    def __init__(self, task, callback, source, preview=False):
+        self.task = task
+        self.callbacks = [callback]
+        self.sources = {source}
+        self.preview = preview # Prévia progressiva: vale enquanto a página estiver na janela
+        self.source = source # Origem que criou a tarefa (agregação das estatísticas)
+        self.requested_at = time.perf_counter()
 
 class RenderEngine(QObject):
     """Gerenciador central de renderização com Single-Open Architecture."""
     
     _instance = None
 
+    # Modo progressivo: prévia em 1/4 do zoom, apenas quando o render exato é caro
+    PREVIEW_FACTOR = 0.25
+    MIN_PROGRESSIVE_ZOOM = 0.5
+    # Buckets de zoom (potências de 2^(1/4)) usados durante gestos de zoom
+    ZOOM_STEPS_PER_OCTAVE = 4
+    # Intervalo mínimo entre reavaliações de CPU/RAM (feitas sob demanda em request_render)
+    POLICY_INTERVAL_S = 2.0
+    # Documentos com handles abertos ao mesmo tempo (os ociosos menos usados são fechados)
+    MAX_OPEN_DOCUMENTS = 4
+    # Registros de documentos (sessão, mtime) mantidos mesmo sem handles abertos
+    MAX_KNOWN_DOCUMENTS = 32
+    # Handles abertos em segundo plano ao ativar um documento (limitado a max_handles)
+    PREWARM_HANDLES = 2
+    # Intervalo do dump periódico de estatísticas (flag 'startup_render_stats')
+    STATS_DUMP_INTERVAL_MS = 60_000
+    # Páginas por WordIndexTask: o handle volta ao pool entre blocos
+    WORD_INDEX_CHUNK = 16
+
     @classmethod
     def instance(cls, adapter: PDFOperationsPort = None):
         if cls._instance is None:
@@ -123,25 +397,135 @@ class RenderEngine(QObject):
             self._adapter = adapter
             
         self.pool = QThreadPool()
-        # Limitar a 2 threads para máxima estabilidade e evitar contenção na GUI Thread
+        # Dimensionamento adaptativo (CPU, RAM e complexidade); 2 threads até a 1ª avaliação
         self.pool.setMaxThreadCount(2)
+        self._worker_policy = WorkerPolicy()
+        self._complexity = "STANDARD"
+        self._max_handles = 2
+        self._worker_stats = {}
+        self._policy_checked_at = 0.0
         
-        # Cache de Pixmaps (Key: (path, page, zoom, rotation, mode, clip))
-        self._cache = {}
-        self._cache_order = []
-        self._max_cache_size = 30 
+        # Cache de Pixmaps (Key: (path, page, zoom, rotation, mode, clip, layers))
+        # Orçamento em bytes com cotas separadas para páginas e miniaturas.
+        self._cache = PixmapCache()
+        # Tier persistente (~/.fotonPDF/raster_cache ou FOTON_RASTER_CACHE_DIR) consultado pelas threads de render
+        self._disk_cache = self._create_disk_cache()
+        
+        # Fila reordenável do motor: o pool só recebe tarefas quando há worker livre
+        self._scheduler = RenderScheduler()
+        self._running = 0
+        self._dispatch_posted = False
+        # Contadores e histogramas de latência (stats()); dump periódico opcional
+        self._stats = RenderStats()
+        self._stats_timer = None
+
+        # Requisições em voo (Key -> _PendingRender): duplicatas anexam callbacks à tarefa existente
+        self._inflight = {}
+        self._coalesced_count = 0
+        self._cancelled_count = 0
+        # Zooms em cache por página ((path, page, rotation, mode, layers) -> {zoom}) para prévias
+        self._zoom_index = {}
         
-        # Single-Open Management (Thread-Safe Pool)
+        # Pools de handles por documento (caminho resolvido -> DocumentHandlePool, ordem LRU).
+        # Documentos mesclados, miniaturas de outros arquivos e abas convivem sem reset.
         self._current_doc_path = None
         self._resolved_doc_path = None
-        self._handle_queue = queue.Queue()
-        self._created_handles_count = 0
+        self._doc_pools = OrderedDict()
+        self._sessions = {} # session_id -> DocumentHandlePool (tarefas localizam seu pool)
         self._creation_mutex = QMutex()
-        self._all_handles = [] # Keep track for closing
         self._current_session_id = 0
+        self._session_counter = 0
         self._path_resolver_cache = {} # Cache for Path.resolve()
+
+        # Backend multiprocesso opcional (feature flag na Configuração de Inicialização)
+        self._process_pool = None
+        self._apply_worker_policy()
+        if self._startup_flag("startup_render_processes"):
+            self.enable_process_backend()
+        if self._startup_flag("startup_render_stats"):
+            self.enable_stats_dump()
         self._initialized = True
         
+    @staticmethod
+    def _create_disk_cache():
+        """Instancia o cache em disco; falhas de I/O apenas desativam o tier."""
+        try:
+            from src.infrastructure.repositories.raster_cache_repository import RasterCacheRepository
+            return RasterCacheRepository()
+        except Exception as e:
+            log_error(f"RenderEngine: Cache em disco indisponível: {e}")
+            return None
+
+    @staticmethod
+    def _startup_flag(key: str) -> bool:
+        try:
+            from src.infrastructure.services.settings_service import SettingsService
+            return SettingsService.instance().get_bool(key, False)
+        except Exception:
+            return False
+
+    def enable_process_backend(self, workers: int = None):
+        """
+        Passa a rasterizar em processos worker (memória compartilhada como transporte).
+        As threads do QThreadPool viram despachantes: uma por processo, preservando fila,
+        prioridades, cancelamento e caches.
+        """
+        if self._process_pool is not None:
+            return
+        from src.infrastructure.adapters.pymupdf_process_pool import PyMuPDFProcessPool
+        self._process_pool = PyMuPDFProcessPool(workers)
+        self.pool.setMaxThreadCount(self._process_pool.workers)
+        log_debug(f"RenderEngine: Backend multiprocesso ativo ({self._process_pool.workers} processos).")
+
+    def disable_process_backend(self):
+        """Volta ao backend de threads (aguarda as tarefas em andamento)."""
+        if self._process_pool is None:
+            return
+        self.pool.waitForDone()
+        self._process_pool.shutdown()
+        self._process_pool = None
+        self._apply_worker_policy()
+
+    def set_complexity_hint(self, complexity: str):
+        """Informa a complexidade do documento ativo (hint do DocumentAnalyzer) e redimensiona o pool."""
+        if complexity and complexity != self._complexity:
+            self._complexity = complexity
+            self._apply_worker_policy()
+
+    def _apply_worker_policy(self):
+        """Reavalia workers/handles; sob pressão de memória o pool encolhe na hora."""
+        self._policy_checked_at = time.monotonic()
+        stats = self._worker_policy.compute(self._complexity)
+        self._worker_stats = stats
+
+        # No backend multiprocesso o número de despachantes acompanha o de processos
+        if self._process_pool is not None:
+            return
+
+        if stats["workers"] != self.pool.maxThreadCount():
+            log_debug(
+                f"RenderEngine: Pool ajustado para {stats['workers']} workers "
+                f"({stats['complexity']}, RAM livre {stats['available_mb']}MB, pressão={stats['memory_pressure']})."
+            )
+            self.pool.setMaxThreadCount(stats["workers"])
+            if len(self._scheduler):
+                self._schedule_dispatch() # Workers novos já podem esvaziar a fila
+        if stats["handles"] > self._max_handles:
+            for pool in self._doc_pools.values():
+                pool.set_limit(stats["handles"]) # Esperas podem abrir os handles novos
+        self._max_handles = stats["handles"]
+
+    def worker_stats(self) -> dict:
+        """Snapshot do dimensionamento atual do pool de renderização."""
+        stats = dict(self._worker_stats)
+        stats["backend"] = "process" if self._process_pool is not None else "thread"
+        stats["max_threads"] = self.pool.maxThreadCount()
+        stats["active_threads"] = self.pool.activeThreadCount()
+        stats["max_handles"] = self._max_handles
+        stats["open_handles"] = sum(pool.open_handles for pool in self._doc_pools.values())
+        stats["open_documents"] = sum(1 for pool in self._doc_pools.values() if pool.open_handles)
+        return stats
+
     @classmethod
     def reset_instance(cls):
         """Para uso em testes: força a criação de uma nova instância."""
@@ -150,190 +534,632 @@ class RenderEngine(QObject):
             except: pass
         cls._instance = None
 
-    def set_document(self, doc_path: Path, pre_opened_handle=None):
-        """Define o documento ativo e inicia uma nova sessão."""
+    def set_document(self, doc_path: Path, pre_opened_handle=None, complexity: str = None):
+        """
+        Define o documento ativo. Documentos já conhecidos mantêm cache e handles
+        quentes; uma nova sessão só é criada para documentos novos ou alterados em disco.
+        """
         if isinstance(doc_path, str):
             doc_path = Path(doc_path)
 
-        # 1. Comparação robusta ANTES de qualquer ação
-        if not pre_opened_handle and self._current_doc_path:
-            try:
-                # Otimização MM: Usar path resolvido em cache se disponível
-                doc_path_resolved = self._resolve_path(doc_path)
-                if self._resolved_doc_path and doc_path_resolved == self._resolved_doc_path:
-                    return # Mesmo arquivo, ignorar skip
-            except:
-                if doc_path == self._current_doc_path:
-                    return
+        if complexity:
+            self.set_complexity_hint(complexity)
 
-        # 2. Se chegamos aqui, é um NOVO documento ou um Reload forçado
-        log_debug(f"RenderEngine [S{self._current_session_id+1}]: Resetando motor para novo doc.")
-        self.clear_queue()
-        # REMOVIDO: self._close_all_handles() - Sessões agora cuidam do fechamento seguro
-        
-        # Incrementar Sessão
-        with QMutexLocker(self._creation_mutex):
-            self._current_session_id += 1
-            sid = self._current_session_id
-            
-        self._current_doc_path = doc_path
-        self._resolved_doc_path = self._resolve_path(doc_path)
-            
-        self._handle_queue = queue.Queue() # Fresh Queue
-        self._all_handles = []
-        self._created_handles_count = 0
-        
-        if pre_opened_handle:
-            pre_opened_handle._session_id = sid
-            self._handle_queue.put(pre_opened_handle)
-            self._all_handles.append(pre_opened_handle)
-            self._created_handles_count = 1
-            log_debug(f"RenderEngine [S{sid}]: [STEP 1] Handle pré-aberto injetado.")
-        
-        log_debug(f"RenderEngine [S{sid}]: [STEP 2] Sessão inicializada.")
+        resolved = self._resolve_path(doc_path)
+        pool = self._doc_pools.get(resolved)
+        if pool is not None and pool.is_stale():
+            # Arquivo reescrito (ex.: salvar): rasters e handles antigos não valem mais
+            log_debug(f"RenderEngine [S{pool.session_id}]: {doc_path.name} mudou em disco. Reiniciando sessão.")
+            self._retire_pool(pool)
+            self._purge_document(resolved)
+            pool = None
 
-    def _close_all_handles(self):
-        """Fecha todos os handles rastreados."""
-        for handle in self._all_handles:
-            try:
-                handle.close()
-            except: pass
-        self._all_handles.clear()
+        if pool is None:
+            pool = self._pool_for(doc_path)
+            if pre_opened_handle is not None and not pre_opened_handle.is_closed:
+                pool.inject(pre_opened_handle)
+                log_debug(f"RenderEngine [S{pool.session_id}]: [STEP 1] Handle pré-aberto injetado.")
 
-    def _acquire_handle(self, request_session_id):
-        """Adquire um handle da sessão solicitada. Descarta se for de sessão antiga."""
-        import fitz
-        
-        while True:
-            # 1. Tentar pegar da fila
-            try:
-                handle = self._handle_queue.get(timeout=0.1)
-                
-                # Validar Sessão
-                handle_sid = getattr(handle, "_session_id", -1)
-                if handle_sid != request_session_id or handle.is_closed:
-                    log_debug(f"RenderEngine: Descartando handle de sessão antiga/fechado (H:S{handle_sid} != R:S{request_session_id})")
-                    try: handle.close()
-                    except: pass
-                    with QMutexLocker(self._creation_mutex):
-                        self._created_handles_count = max(0, self._created_handles_count - 1)
-                    continue # Tentar próximo
-                    
-                return handle
-            except queue.Empty:
-                pass
-            
-            # 2. Se a sessão mudou enquanto esperávamos, falhar
-            if request_session_id != self._current_session_id:
-                return None
+        self._current_doc_path = doc_path
+        self._resolved_doc_path = resolved
+        self._current_session_id = pool.session_id
+        self._prewarm(pool)
+        log_debug(f"RenderEngine [S{pool.session_id}]: [STEP 2] Documento ativo: {doc_path.name}.")
 
-            # 3. Tentar criar novo se houver espaço
-            should_create = False
+    def _prewarm(self, pool: DocumentHandlePool):
+        """
+        Abre handles do documento ativo no QThreadPool global (sem ocupar workers de
+        render): o primeiro lote de páginas já encontra handles livres.
+        """
+        count = min(self.PREWARM_HANDLES, self._max_handles)
+        if self._process_pool is not None or pool.mtime is None or pool.open_handles >= count:
+            return
+        max_handles = self._max_handles
+        QThreadPool.globalInstance().start(lambda: pool.prewarm(count, max_handles))
+
+    def _pool_for(self, doc_path: Path) -> DocumentHandlePool:
+        """Pool do documento (criado sob demanda), promovido a mais recente no LRU."""
+        resolved = self._resolve_path(doc_path)
+        pool = self._doc_pools.get(resolved)
+        if pool is None:
             with QMutexLocker(self._creation_mutex):
-                if self._created_handles_count < self.pool.maxThreadCount() and self._current_doc_path:
-                    self._created_handles_count += 1
-                    should_create = True
-            
-            if should_create:
+                self._session_counter += 1
+                sid = self._session_counter
+            pool = DocumentHandlePool(resolved, sid, on_close=self._discard_handle_caches)
+            self._doc_pools[resolved] = pool
+            self._sessions[sid] = pool
+            self._close_idle_documents()
+        self._doc_pools.move_to_end(resolved)
+        return pool
+
+    def _discard_handle_caches(self, handle):
+        """Handle fechado pelo pool: DisplayLists do adaptador ligadas a ele saem do cache."""
+        if hasattr(self._adapter, "discard_display_lists"):
+            self._adapter.discard_display_lists(handle)
+
+    def _close_idle_documents(self):
+        """Fecha os handles dos documentos menos usados além de MAX_OPEN_DOCUMENTS (só os ociosos)."""
+        open_pools = [pool for pool in self._doc_pools.values() if pool.open_handles]
+        excess = len(open_pools) - self.MAX_OPEN_DOCUMENTS
+        for pool in open_pools: # Ordem LRU: menos recente primeiro
+            if excess <= 0:
+                break
+            if pool.is_idle and pool.path != self._resolved_doc_path:
+                log_debug(f"RenderEngine: Fechando handles ociosos de {pool.path.name} (LRU).")
+                pool.close_idle()
+                excess -= 1
+
+        # Registros sem handles são leves, mas não crescem sem limite
+        while len(self._doc_pools) > self.MAX_KNOWN_DOCUMENTS:
+            oldest = next(iter(self._doc_pools.values()))
+            if not oldest.is_idle:
+                break
+            self._retire_pool(oldest)
+
+    def _retire_pool(self, pool: DocumentHandlePool):
+        pool.retire()
+        self._doc_pools.pop(pool.path, None)
+        self._sessions.pop(pool.session_id, None)
+
+    def _purge_document(self, resolved: Path):
+        """Descarta rasters e tarefas em voo de um documento (cache em memória)."""
+        for key, pending in list(self._inflight.items()):
+            if self._resolve_path(key[0]) == resolved:
+                pending.task.cancel()
+                self._scheduler.remove(pending.task)
+                del self._inflight[key]
+        for key in self._cache.keys():
+            if isinstance(key, tuple) and self._resolve_path(key[0]) == resolved:
+                self._cache.discard(key)
+        for key in list(self._zoom_index):
+            if self._resolve_path(key[0]) == resolved:
+                del self._zoom_index[key]
+
+    def build_layer_index(self, doc_path):
+        """
+        Agenda (uma vez por sessão do documento) o índice de camadas usadas por página.
+        Até ele ficar pronto, chaves de cache e invalidações usam a configuração completa.
+        """
+        if isinstance(doc_path, str):
+            doc_path = Path(doc_path)
+        if not hasattr(self._adapter, "get_page_layer_usage"):
+            return
+        pool = self._pool_for(doc_path)
+        if pool.layer_index_requested:
+            return
+        pool.layer_index_requested = True
+
+        task = LayerIndexTask(self._adapter, self._acquire_handle, self._release_handle, pool.session_id)
+        task.pool = pool
+        task.stats_source = "layer_index"
+        task.enqueued_at = time.perf_counter()
+
+        def on_finished(usage):
+            pool.layer_usage = usage
+
+        def on_done():
+            self._running = max(0, self._running - 1)
+            self._dispatch()
+
+        task.signals.finished.connect(on_finished)
+        task.signals.done.connect(on_done)
+        # Faixa do viewer, atrás das páginas visíveis: pronto antes do primeiro toggle
+        self._scheduler.push(task, (doc_path, None), "viewer")
+        self._schedule_dispatch()
+
+    def _page_layers(self, doc_path, page_num, layer_config) -> tuple:
+        """
+        (chave, configuração) das camadas relevantes à página. Com o índice pronto,
+        só as camadas que a página usa entram na chave: alternar uma camada não
+        invalida as páginas que não a usam. Sem índice, a configuração completa.
+        """
+        if not layer_config:
+            return None, None
+        pool = self._doc_pools.get(self._resolve_path(doc_path))
+        usage = pool.layer_usage if pool is not None else None
+        if usage is not None:
+            used = usage.get(page_num, frozenset())
+            layer_config = {xref: visible for xref, visible in layer_config.items() if int(xref) in used}
+            if not layer_config:
+                return None, None
+        return frozenset(layer_config.items()), layer_config
+
+    def pages_using_layers(self, doc_path, layer_ids) -> set | None:
+        """Páginas do documento que usam alguma das camadas (None se o índice não está pronto)."""
+        if isinstance(doc_path, str):
+            doc_path = Path(doc_path)
+        pool = self._doc_pools.get(self._resolve_path(doc_path))
+        if pool is None or pool.layer_usage is None:
+            return None
+        layer_ids = {int(xref) for xref in layer_ids}
+        return {page for page, used in pool.layer_usage.items() if used & layer_ids}
+
+    def build_word_index(self, doc_path, page_count: int, first_pages=()):
+        """
+        Agenda (uma vez por sessão do documento) a extração das palavras de todas as
+        páginas para a seleção de texto, em blocos de WORD_INDEX_CHUNK na faixa de
+        prefetch, atrás de qualquer render. 'first_pages' (a janela visível) vão no
+        primeiro bloco.
+        """
+        if isinstance(doc_path, str):
+            doc_path = Path(doc_path)
+        if not hasattr(self._adapter, "get_page_words"):
+            return
+        pool = self._pool_for(doc_path)
+        if pool.word_index_requested:
+            return
+        pool.word_index_requested = True
+
+        def on_done():
+            self._running = max(0, self._running - 1)
+            self._dispatch()
+
+        first = [page for page in first_pages if 0 <= page < page_count]
+        order = pool.words.missing(dict.fromkeys(first + list(range(page_count))))
+        for start in range(0, len(order), self.WORD_INDEX_CHUNK):
+            task = WordIndexTask(self._adapter, self._acquire_handle, self._release_handle,
+                                 pool.session_id, order[start:start + self.WORD_INDEX_CHUNK])
+            task.pool = pool
+            task.stats_source = "word_index"
+            task.enqueued_at = time.perf_counter()
+            task.signals.finished.connect(lambda words: self._store_words(pool, words))
+            task.signals.done.connect(on_done)
+            # Prioridade negativa: atrás até dos renders de prefetch
+            self._scheduler.push(task, (doc_path, None), "prefetch", priority=-1)
+        self._schedule_dispatch()
+
+    def page_words(self, doc_path, page_num: int, on_ready=None):
+        """
+        Palavras da página (PageWords) para a seleção de texto. Se o índice em segundo
+        plano ainda não chegou nela, extrai agora com um handle livre do pool (sem
+        reabrir o PDF). A GUI nunca espera por handle: com o pool ocupado, a página
+        vai para a frente da fila, o retorno é None ("palavras pendentes") e
+        on_ready(PageWords) é chamado quando ela chegar.
+        """
+        if isinstance(doc_path, str):
+            doc_path = Path(doc_path)
+        pool = self._pool_for(doc_path)
+        words = pool.words.get(page_num)
+        if words is not None or not hasattr(self._adapter, "get_page_words"):
+            return words
+
+        handle = self._acquire_handle(pool.session_id, blocking=False)
+        if not handle:
+            self._request_page_words(doc_path, pool, page_num, on_ready)
+            return None
+        try:
+            extracted = self._adapter.get_page_words(None, [page_num], doc_handle=handle)
+        except Exception as e:
+            log_error(f"RenderEngine: Falha ao extrair palavras [P{page_num}]: {e}")
+            return None
+        finally:
+            self._release_handle(handle, pool.session_id)
+        if page_num not in extracted:
+            return None
+        words = PageWords(extracted[page_num])
+        self._store_words(pool, {page_num: words})
+        return words
+
+    def _request_page_words(self, doc_path, pool, page_num, on_ready):
+        """Extração urgente de uma página: faixa do viewer, à frente dos renders da mesma página."""
+        if not pool.words.wait(page_num, on_ready):
+            return # Já pedida: o callback só entra na lista de espera
+
+        task = WordIndexTask(self._adapter, self._acquire_handle, self._release_handle, pool.session_id, [page_num])
+        task.pool = pool
+        task.urgent = True
+        task.stats_source = "word_index"
+        task.enqueued_at = time.perf_counter()
+
+        def on_done():
+            pool.words.drop_waiters(page_num) # Sem efeito se a página chegou
+            self._running = max(0, self._running - 1)
+            self._dispatch()
+
+        task.signals.finished.connect(lambda words: self._store_words(pool, words))
+        task.signals.done.connect(on_done)
+        self._scheduler.push(task, (doc_path, page_num), "viewer", priority=1)
+        self._schedule_dispatch()
+
+    def _store_words(self, pool, words: dict):
+        """Guarda as páginas extraídas no índice do documento e avisa quem esperava por elas."""
+        for page, page_words in words.items():
+            for callback in pool.words.put(page, page_words):
                 try:
-                    log_debug(f"RenderEngine [S{request_session_id}]: Criando handle auxiliar ({self._created_handles_count})...")
-                    new_handle = fitz.open(str(self._current_doc_path))
-                    new_handle._session_id = request_session_id
-                    
-                    with QMutexLocker(self._creation_mutex):
-                        self._all_handles.append(new_handle)
-                    return new_handle
+                    callback(page_words)
                 except Exception as e:
-                    log_error(f"RenderEngine: Falha ao criar handle: {e}")
-                    with QMutexLocker(self._creation_mutex):
-                        self._created_handles_count -= 1
-                    return None
+                    log_exception(f"RenderEngine: Erro no callback de palavras [P{page}]: {e}")
+
+    def _close_all_handles(self):
+        """Aposenta todos os pools (handles emprestados fecham na devolução)."""
+        for pool in list(self._doc_pools.values()):
+            self._retire_pool(pool)
+
+    def _acquire_handle(self, request_session_id, blocking=True):
+        """
+        Adquire um handle do pool da sessão; None se a sessão foi aposentada ou,
+        sem 'blocking' (thread da GUI), se todos os handles estão ocupados.
+        """
+        pool = self._sessions.get(request_session_id)
+        if pool is None:
+            return None
+        return pool.acquire(self._max_handles, blocking)
 
     def _release_handle(self, handle, session_id):
-        """Devolve o handle ao pool ou fecha se for de sessão antiga."""
-        if handle and not handle.is_closed and session_id == self._current_session_id:
-            self._handle_queue.put(handle)
-        else:
-            log_debug(f"RenderEngine: Fechando handle de sessão expirada ou inválida (S{session_id})")
-            try: handle.close()
-            except: pass
-            with QMutexLocker(self._creation_mutex):
-                self._created_handles_count = max(0, self._created_handles_count - 1)
+        """Devolve o handle ao pool da sessão ou o fecha se a sessão expirou."""
+        if not handle:
+            return
+        pool = self._sessions.get(session_id)
+        if pool is not None:
+            pool.release(handle, self._max_handles)
+            return
+        log_debug(f"RenderEngine: Fechando handle de sessão expirada (S{session_id})")
+        try: handle.close()
+        except: pass
 
-    def request_render(self, doc_path, page_num, zoom, rotation, callback, mode="default", clip=None, priority=0, layer_config=None):
-        """Adiciona uma solicitação de renderização."""
+    def request_render(self, doc_path, page_num, zoom, rotation, callback, mode="default", clip=None, priority=0, layer_config=None, source="viewer", preview_callback=None):
+        """
+        Adiciona uma solicitação de renderização.
+        'source' identifica a origem (viewer, light_table, thumbnail) e define a cota de cache usada.
+        Com 'preview_callback' (modo progressivo), uma prévia de menor resolução é entregue
+        antes do render exato; o zoom informado a ela é o da prévia, não o solicitado.
+        """
         if isinstance(doc_path, str):
             doc_path = Path(doc_path)
             
-        # Comparação Robusta OTIMIZADA com cache de resolve()
-        is_new = False
+        # Primeiro documento vira o ativo; os demais ganham seu próprio pool sem resetar nada
         if not self._current_doc_path:
-            is_new = True
-        else:
-            try:
-                # Compara strings se forem iguais, senão resolve (Custo-benefício)
-                if doc_path != self._current_doc_path:
-                    if self._resolve_path(doc_path) != self._resolved_doc_path:
-                        is_new = True
-            except:
-                if doc_path != self._current_doc_path:
-                    is_new = True
-
-        if is_new:
-            log_debug(f"RenderEngine: Request para novo doc {doc_path.name}. Resetando.")
             self.set_document(doc_path)
+
+        if time.monotonic() - self._policy_checked_at > self.POLICY_INTERVAL_S:
+            self._apply_worker_policy()
             
-        # Layer Config Key (Frozen Set for hashability)
-        layer_key = frozenset(layer_config.items()) if layer_config else None
+        # Layer Config Key (Frozen Set for hashability): só as camadas que a página usa
+        layer_key, layer_config = self._page_layers(doc_path, page_num, layer_config)
 
         cache_key = (doc_path, page_num, round(zoom, 3), rotation, mode, clip, layer_key)
         
-        if cache_key in self._cache:
-            # Move to end (MRU)
-            self._cache_order.remove(cache_key)
-            self._cache_order.append(cache_key)
-            pixmap = self._cache[cache_key]
-            
+        pixmap = self._cache.get(cache_key)
+        self._stats.record_request(source, pixmap is not None)
+        if pixmap is not None:
             from PyQt6.QtCore import QTimer
             QTimer.singleShot(0, lambda: callback(page_num, pixmap, zoom, rotation, mode, clip))
             return
 
+        # Já existe tarefa idêntica na fila/rodando: apenas anexar o callback
+        pending = self._inflight.get(cache_key)
+        if pending is not None:
+            pending.callbacks.append(callback)
+            pending.sources.add(source)
+            self._scheduler.promote(pending.task, source) # Ex.: prefetch que entrou na tela
+            self._coalesced_count += 1
+            return
+
+        # Modo de cor com o raster padrão em cache: derivação vetorizada, sem re-rasterizar.
+        # A QImage guardada junto ao pixmap vai direto ao worker (nenhuma cópia na GUI)
+        if mode != "default":
+            base_key = (doc_path, page_num, round(zoom, 3), rotation, "default", clip, layer_key)
+            base = self._cache.attached(base_key) if self._cache.get(base_key) is not None else None
+            if base is not None:
+                task = ColorModeTask(base, page_num, zoom, rotation, mode, clip)
+                self._submit(cache_key, task, callback, source, priority)
+                return
+
+        # Modo progressivo: algo para exibir já, render exato logo em seguida
+        if preview_callback is not None and clip is None:
+            self._request_preview(doc_path, page_num, zoom, rotation, preview_callback, mode, priority, layer_config, source)
+
         # Not in cache, start task
+        self._start_task(cache_key, doc_path, page_num, zoom, rotation, callback, mode, clip, priority, layer_config, source)
+
+    def _start_task(self, cache_key, doc_path, page_num, zoom, rotation, callback, mode, clip, priority, layer_config, source, preview=False):
+        """Cria a RenderTask (rasterização do PDF) e a envia ao pool via _submit."""
+        pool = self._pool_for(doc_path)
+        category = self._cache_category(source)
         task = RenderTask(
             self._adapter, 
             self._acquire_handle, 
             self._release_handle, 
             page_num, zoom, rotation,
-            self._current_session_id,
+            pool.session_id,
             mode, clip, 
-            layer_config=layer_config
+            layer_config=layer_config,
+            disk_cache=self._disk_cache,
+            doc_path=pool.path,
+            process_pool=self._process_pool
         )
+        if mode != "default":
+            # O raster padrão produzido pela tarefa fica em cache para as próximas trocas de modo
+            base_key = cache_key[:4] + ("default",) + cache_key[5:]
+            task.signals.base_ready.connect(lambda img: self._cache_raster(base_key, img, category))
+        self._submit(cache_key, task, callback, source, priority, preview)
+
+    def _submit(self, cache_key, task, callback, source, priority, preview=False):
+        """Registra a tarefa (RenderTask ou ColorModeTask) como em voo e a envia ao pool."""
+        category = self._cache_category(source)
+        pending = _PendingRender(task, callback, source, preview)
+        self._inflight[cache_key] = pending
+        task.stats_source = source
+        task.enqueued_at = pending.requested_at
         
         def on_finished(p_idx, img, z, r, m, c):
             if img.width() > 3000 or img.height() > 3000:
                 log_debug(f"Render: Imagem pesada detectada ({img.width()}x{img.height()}).")
             
-            pixmap = QPixmap.fromImage(img)
-            self._update_cache(cache_key, pixmap)
-            callback(p_idx, pixmap, z, r, m, c)
+            pixmap = self._cache_raster(cache_key, img, category)
+            self._release_inflight(cache_key, pending)
+            self._stats.record_task(
+                pending.source, (cache_key[0], cache_key[1]), task.timings,
+                (time.perf_counter() - pending.requested_at) * 1000
+            )
+            for cb in pending.callbacks:
+                try:
+                    cb(p_idx, pixmap, z, r, m, c)
+                except Exception as e:
+                    log_exception(f"RenderEngine: Erro no callback de render [P{p_idx}]: {e}")
+            
+        def on_done():
+            self._release_inflight(cache_key, pending)
+            self._running = max(0, self._running - 1)
+            self._dispatch()
             
         task.signals.finished.connect(on_finished)
-        self.pool.start(task, priority)
+        task.signals.done.connect(on_done)
+        self._scheduler.push(task, (cache_key[0], cache_key[1]), source, priority)
+        self._stats.record_depth(len(self._scheduler))
+        self._schedule_dispatch()
+
+    def _schedule_dispatch(self):
+        """
+        Adia o despacho para o próximo ciclo do event loop: todas as requisições de uma
+        passada de visibilidade (e o reprioritize que a encerra) entram na fila antes
+        de qualquer escolha.
+        """
+        if self._dispatch_posted:
+            return
+        self._dispatch_posted = True
+        from PyQt6.QtCore import QTimer
+        QTimer.singleShot(0, self._dispatch)
+
+    def _dispatch(self):
+        """Entrega ao pool as tarefas mais urgentes enquanto houver worker livre."""
+        self._dispatch_posted = False
+        if self.pool is None:
+            return
+        while self._running < self.pool.maxThreadCount():
+            task = self._scheduler.pop()
+            if task is None:
+                return
+            if task.is_cancelled:
+                continue
+            self._stats.record_queue(task.stats_source, (time.perf_counter() - task.enqueued_at) * 1000)
+            self._running += 1
+            self.pool.start(task)
+
+    def reprioritize(self, distances: dict, source: str = "viewer"):
+        """
+        Atualiza a distância ao foco do viewport ({(doc_path, página): distância}) das
+        tarefas ainda na fila de 'source'. Chamado a cada rolagem pelo viewer.
+        """
+        self._scheduler.reprioritize(distances, source)
+
+    def _request_preview(self, doc_path, page_num, zoom, rotation, callback, mode, priority, layer_config, source):
+        """
+        Entrega uma prévia da página: o render em cache mais próximo (qualquer zoom,
+        escalado pelo widget) ou, na falta dele, um render barato em zoom reduzido
+        com prioridade acima do render exato.
+        """
+        cached = self.cached_nearest(doc_path, page_num, zoom, rotation, mode, layer_config)
+        if cached is not None:
+            pixmap, cached_zoom = cached
+            from PyQt6.QtCore import QTimer
+            QTimer.singleShot(0, lambda: callback(page_num, pixmap, cached_zoom, rotation, mode, None))
+            return
+
+        if zoom < self.MIN_PROGRESSIVE_ZOOM:
+            return # Página já é barata; a prévia só duplicaria trabalho
+
+        layer_key, layer_config = self._page_layers(doc_path, page_num, layer_config)
+        preview_zoom = round(zoom * self.PREVIEW_FACTOR, 3)
+        preview_key = (doc_path, page_num, preview_zoom, rotation, mode, None, layer_key)
+        pending = self._inflight.get(preview_key)
+        if pending is not None:
+            pending.callbacks.append(callback)
+            pending.sources.add(source)
+            return
+
+        self._start_task(preview_key, doc_path, page_num, preview_zoom, rotation, callback, mode, None, priority + 1, layer_config, source, preview=True)
+
+    @classmethod
+    def quantize_zoom(cls, zoom: float) -> float:
+        """Arredonda o zoom para o bucket mais próximo (2^(k/4)): 1.0, 1.189, 1.414, 1.682, 2.0..."""
+        if zoom <= 0:
+            return zoom
+        step = round(math.log2(zoom) * cls.ZOOM_STEPS_PER_OCTAVE)
+        return round(2.0 ** (step / cls.ZOOM_STEPS_PER_OCTAVE), 3)
+
+    def cached_nearest(self, doc_path, page_num, zoom, rotation, mode="default", layer_config=None):
+        """
+        Consulta (sem agendar tarefas) o render de página inteira em cache com zoom
+        mais próximo do solicitado. Retorna (pixmap, zoom) ou None.
+        """
+        if isinstance(doc_path, str):
+            doc_path = Path(doc_path)
+        layer_key, _ = self._page_layers(doc_path, page_num, layer_config)
+        base_key = (doc_path, page_num, rotation, mode, layer_key)
+
+        cached_zoom = self._nearest_cached_zoom(base_key, zoom)
+        if cached_zoom is None:
+            return None
+        return self._cache.get((doc_path, page_num, cached_zoom, rotation, mode, None, layer_key)), cached_zoom
+
+    def _nearest_cached_zoom(self, base_key, zoom):
+        """Zoom em cache (página inteira) mais próximo de 'zoom' em escala logarítmica."""
+        zooms = self._zoom_index.get(base_key)
+        if not zooms:
+            return None
+
+        doc_path, page_num, rotation, mode, layer_key = base_key
+        best = None
+        for z in list(zooms):
+            if (doc_path, page_num, z, rotation, mode, None, layer_key) not in self._cache:
+                zooms.discard(z) # Expulso do cache desde a inserção
+                continue
+            if best is None or abs(math.log(z / zoom)) < abs(math.log(best / zoom)):
+                best = z
+        return best
+
+    def _release_inflight(self, key, pending):
+        """Remove o registro em voo somente se ainda pertencer a esta tarefa."""
+        if self._inflight.get(key) is pending:
+            del self._inflight[key]
+
+    def cancel_stale(self, keep_pages, zooms=None, mode=None, source="viewer") -> int:
+        """
+        Cancela as tarefas em voo de 'source' cuja página está fora de 'keep_pages'
+        ({(doc_path, página)} da janela visível + buffer) ou cujo zoom/modo foi superado.
+        Páginas de outro documento (aba anterior, mesclagem) nunca casam com a janela.
+        Tarefas ainda na fila do motor são descartadas; as despachadas abortam no
+        próximo ponto de verificação. Tarefas compartilhadas com outras origens
+        (ver deduplicação) são preservadas, assim como prévias progressivas de
+        páginas ainda na janela. Retorna quantas foram canceladas.
+        """
+        keep_pages = {(self._resolve_path(Path(doc)), page) for doc, page in keep_pages}
+        zooms = {round(z, 3) for z in zooms} if zooms is not None else None
+        cancelled = 0
 
-    def _update_cache(self, key, pixmap):
+        for key, pending in list(self._inflight.items()):
+            if pending.sources != {source}:
+                continue
+            doc_path, page_num, zoom, _, task_mode, _, _ = key
+            stale = (
+                (self._resolve_path(Path(doc_path)), page_num) not in keep_pages
+                or (zooms is not None and zoom not in zooms and not pending.preview)
+                or (mode is not None and task_mode != mode)
+            )
+            if not stale:
+                continue
+
+            pending.task.cancel()
+            self._scheduler.remove(pending.task) # Ainda na fila do motor: nunca chega ao pool
+            del self._inflight[key]
+            cancelled += 1
+
+        if cancelled:
+            self._cancelled_count += cancelled
+            log_debug(f"RenderEngine: {cancelled} tarefa(s) obsoleta(s) cancelada(s).")
+        return cancelled
+
+    def _cache_raster(self, key, img: QImage, category="page") -> QPixmap:
+        """
+        Guarda o raster como pixmap; no modo padrão a QImage (mesmo buffer, por
+        compartilhamento implícito) fica associada à entrada como fonte das
+        derivações de modo de cor.
+        """
+        pixmap = QPixmap.fromImage(img)
+        self._update_cache(key, pixmap, category)
+        if key[4] == "default" and self._cache.attached(key) is None:
+            self._cache.attach(key, img)
+        return pixmap
+
+    def _update_cache(self, key, pixmap, category="page"):
         if key in self._cache: return
-            
-        if len(self._cache) >= self._max_cache_size:
-            del self._cache[self._cache_order.pop(0)]
-            
-        self._cache[key] = pixmap
-        self._cache_order.append(key)
-
-    def clear_queue(self):
-        """Limpa a fila de tarefas pendentes e o cache."""
-        self.pool.clear()
-        self._cache.clear()
-        self._cache_order.clear()
+        if self._cache.put(key, pixmap, category) and isinstance(key, tuple) and key[5] is None:
+            doc_path, page_num, zoom, rotation, mode, _, layer_key = key
+            self._zoom_index.setdefault((doc_path, page_num, rotation, mode, layer_key), set()).add(zoom)
+
+    @staticmethod
+    def _cache_category(source: str) -> str:
+        """Miniaturas têm cota própria; todo o resto compete pela cota de páginas."""
+        return "thumbnail" if source == "thumbnail" else "page"
+
+    def cache_stats(self) -> dict:
+        """Retorna contadores de hit/miss/expulsão e ocupação em bytes dos caches (memória e disco)."""
+        stats = self._cache.stats()
+        stats["disk"] = self._disk_cache.stats() if self._disk_cache else None
+        stats["inflight"] = len(self._inflight)
+        stats["queued"] = len(self._scheduler)
+        stats["coalesced"] = self._coalesced_count
+        stats["cancelled"] = self._cancelled_count
+        return stats
+
+    def stats(self) -> dict:
+        """
+        Snapshot completo para ajuste fino: profundidade da fila, cache (hit rate e
+        bytes em memória/disco), workers/handles e histogramas de latência
+        (fila, espera por handle, rasterização e total) por origem e por página.
+        """
+        snapshot = self._stats.snapshot()
+        snapshot["queue"] = {
+            "depth": len(self._scheduler),
+            "running": self._running,
+            "inflight": len(self._inflight),
+            "coalesced": self._coalesced_count,
+            "cancelled": self._cancelled_count,
+        }
+        snapshot["cache"] = self.cache_stats()
+        snapshot["workers"] = self.worker_stats()
+        return snapshot
+
+    def reset_stats(self):
+        """Zera contadores e histogramas (ex.: antes de um benchmark)."""
+        self._stats.reset()
+
+    def enable_stats_dump(self, interval_ms: int = None):
+        """Grava stats() periodicamente no histórico de performance (CSV + JSON Lines)."""
+        from PyQt6.QtCore import QTimer
+        if self._stats_timer is None:
+            self._stats_timer = QTimer(self)
+            self._stats_timer.timeout.connect(self.dump_stats)
+        self._stats_timer.start(interval_ms or self.STATS_DUMP_INTERVAL_MS)
+
+    def disable_stats_dump(self):
+        if self._stats_timer is not None:
+            self._stats_timer.stop()
+
+    def dump_stats(self):
+        from src.infrastructure.services.telemetry_service import TelemetryService
+        TelemetryService.log_render_stats(self.stats())
+
+    def clear_queue(self, keep_cache: bool = False):
+        """
+        Limpa a fila de tarefas pendentes e o cache. Com 'keep_cache', apenas a fila:
+        os rasters (indexados por documento) continuam valendo ao voltar para a aba.
+        """
+        for task in self._scheduler.clear():
+            if isinstance(task, LayerIndexTask):
+                task.pool.layer_index_requested = False # Reagendado no próximo build_layer_index
+            elif isinstance(task, WordIndexTask):
+                if task.urgent:
+                    task.pool.words.drop_waiters(task.pages[0]) # Novo pedido reagenda a página
+                else:
+                    task.pool.word_index_requested = False # Páginas faltantes voltam no próximo build_word_index
+        # Tarefas removidas da fila nunca emitirão 'done'; as já despachadas
+        # ainda entregam seus callbacks (a lista é capturada pela closure).
+        self._inflight.clear()
+        if not keep_cache:
+            self._cache.clear()
+            self._zoom_index.clear()
         # Não limpamos o _path_resolver_cache aqui para manter a performance 
         # entre trocas de abas rápidas.
 
@@ -356,8 +1182,13 @@ class RenderEngine(QObject):
         
         try:
             log_debug("RenderEngine: Encerrando motor de renderização...")
+            self._scheduler.clear()
+            self.disable_stats_dump()
             self.pool.waitForDone()
             self._close_all_handles()
+            if self._process_pool is not None:
+                self._process_pool.shutdown()
+                self._process_pool = None
             log_debug("RenderEngine: Motor encerrado com sucesso.")
         except:
              pass
@@ -0,0 +1,84 @@
+import heapq
+import itertools
+import math
+import time
+
+
+class RenderScheduler:
+    """
+    Fila de renderização reordenável mantida pelo motor (o QThreadPool só recebe
+    uma tarefa quando há worker livre, então nada fica preso a uma prioridade antiga).
+    Ordem: origem (viewer > light_table > thumbnail > prefetch), distância da página
+    ao foco do viewport, prioridade explícita (prévias primeiro) e prazo (idade).
+    """
+
+    SOURCE_RANK = {"viewer": 0, "light_table": 1, "thumbnail": 2, "prefetch": 3}
+    # Prazo de cada origem (s); desempata pela idade dentro da mesma faixa
+    DEADLINES = {"viewer": 0.1, "light_table": 0.25, "thumbnail": 1.0, "prefetch": 2.0}
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._heap = []
+        self._entries = {}  # task -> entrada [rank, seq, task, page_key, source, priority, deadline]
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _rank(self, source, distance, priority, deadline) -> tuple:
+        return (self.SOURCE_RANK.get(source, len(self.SOURCE_RANK)), distance, -priority, deadline)
+
+    def push(self, task, page_key, source="viewer", priority=0, distance=math.inf):
+        """Enfileira a tarefa; 'page_key' ((doc, página)) liga a entrada às distâncias do viewer."""
+        deadline = self._clock() + self.DEADLINES.get(source, self.DEADLINES["prefetch"])
+        entry = [self._rank(source, distance, priority, deadline), next(self._seq), task, page_key, source, priority, deadline]
+        self._entries[task] = entry
+        heapq.heappush(self._heap, (entry[0], entry[1], entry))
+
+    def pop(self):
+        """Remove e retorna a tarefa mais urgente (None se vazia)."""
+        while self._heap:
+            _, _, entry = heapq.heappop(self._heap)
+            task = entry[2]
+            if self._entries.get(task) is entry:
+                del self._entries[task]
+                return task
+        return None
+
+    def promote(self, task, source) -> bool:
+        """
+        Sobe a tarefa para a faixa de 'source' se ela for mais urgente (ex.: prefetch
+        que o viewer passou a pedir). A entrada antiga é descartada no pop.
+        """
+        entry = self._entries.get(task)
+        if entry is None or self.SOURCE_RANK.get(source, len(self.SOURCE_RANK)) >= entry[0][0]:
+            return False
+        _, _, task, page_key, _, priority, _ = entry
+        deadline = self._clock() + self.DEADLINES.get(source, self.DEADLINES["prefetch"])
+        new_entry = [self._rank(source, entry[0][1], priority, deadline), next(self._seq), task, page_key, source, priority, deadline]
+        self._entries[task] = new_entry
+        heapq.heappush(self._heap, (new_entry[0], new_entry[1], new_entry))
+        return True
+
+    def remove(self, task) -> bool:
+        """Retira uma tarefa ainda não despachada (a entrada no heap é descartada no pop)."""
+        return self._entries.pop(task, None) is not None
+
+    def reprioritize(self, distances: dict, source="viewer") -> None:
+        """
+        Recalcula a distância das tarefas de 'source' ({(doc, página): distância});
+        páginas fora do mapa vão para o fim da faixa. Reconstrói o heap em O(n).
+        """
+        for entry in self._entries.values():
+            if entry[4] == source:
+                distance = distances.get(entry[3], math.inf)
+                entry[0] = self._rank(source, distance, entry[5], entry[6])
+        self._heap = [(entry[0], entry[1], entry) for entry in self._entries.values()]
+        heapq.heapify(self._heap)
+
+    def clear(self) -> list:
+        """Esvazia a fila e retorna as tarefas que nunca foram despachadas."""
+        tasks = list(self._entries)
+        self._entries.clear()
+        self._heap.clear()
+        return tasks
@@ -0,0 +1,134 @@
+import bisect
+from collections import OrderedDict
+
+
+class LatencyHistogram:
+    """Histograma de latências (ms) em buckets fixos e logarítmicos; percentis aproximados pelo bucket."""
+
+    BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+    __slots__ = ("counts", "count", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms: float):
+        self.counts[bisect.bisect_left(self.BOUNDS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, p: float) -> float:
+        """Limite superior do bucket que contém o percentil p (0-100), limitado ao máximo observado."""
+        if not self.count:
+            return 0.0
+        target = p / 100.0 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target and n:
+                bound = self.BOUNDS_MS[i] if i < len(self.BOUNDS_MS) else self.max_ms
+                return round(min(bound, self.max_ms), 1)
+        return round(self.max_ms, 1)
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "max_ms": round(self.max_ms, 1),
+            "buckets": dict(zip([f"<={b}" for b in self.BOUNDS_MS] + ["inf"], self.counts)),
+        }
+
+
+class RenderStats:
+    """
+    Contadores e histogramas do RenderEngine (atualizados apenas na thread da GUI).
+    Fases de cada render: espera na fila do motor, espera por handle e rasterização,
+    além do tempo total até os pixels chegarem ao callback; agregados por origem
+    (viewer, light_table, thumbnail, prefetch) e, para a rasterização, por página.
+    """
+
+    PHASES = ("queue", "handle_wait", "render", "total")
+    MAX_PAGES = 512  # Histogramas por página mantidos (LRU)
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.requests = {}
+        self.memory_hits = {}
+        self.disk_hits = 0
+        self.derived = 0 # Modos de cor derivados do raster padrão
+        self.completed = 0
+        self.peak_queue = 0
+        self._by_source = {}
+        self._by_page = OrderedDict()
+
+    def _phases(self, source: str) -> dict:
+        phases = self._by_source.get(source)
+        if phases is None:
+            phases = self._by_source[source] = {name: LatencyHistogram() for name in self.PHASES}
+        return phases
+
+    def record_request(self, source: str, hit: bool):
+        self._phases(source)
+        self.requests[source] = self.requests.get(source, 0) + 1
+        if hit:
+            self.memory_hits[source] = self.memory_hits.get(source, 0) + 1
+
+    def record_depth(self, depth: int):
+        self.peak_queue = max(self.peak_queue, depth)
+
+    def record_queue(self, source: str, wait_ms: float):
+        self._phases(source)["queue"].add(wait_ms)
+
+    def record_task(self, source: str, page_key, timings: dict, total_ms: float):
+        """Registra um render concluído; 'timings' vem da tarefa (handle_wait_ms, render_ms, disk_hit)."""
+        self.completed += 1
+        phases = self._phases(source)
+        phases["total"].add(total_ms)
+        if timings.get("disk_hit"):
+            self.disk_hits += 1
+        if timings.get("derived"):
+            self.derived += 1
+        if "handle_wait_ms" in timings:
+            phases["handle_wait"].add(timings["handle_wait_ms"])
+        if "render_ms" in timings:
+            phases["render"].add(timings["render_ms"])
+            page = self._by_page.get(page_key)
+            if page is None:
+                page = self._by_page[page_key] = LatencyHistogram()
+                if len(self._by_page) > self.MAX_PAGES:
+                    self._by_page.popitem(last=False)
+            else:
+                self._by_page.move_to_end(page_key)
+            page.add(timings["render_ms"])
+
+    def snapshot(self) -> dict:
+        requests = sum(self.requests.values())
+        hits = sum(self.memory_hits.values())
+        return {
+            "requests": requests,
+            "memory_hit_rate": round(hits / requests, 4) if requests else 0.0,
+            "disk_hits": self.disk_hits,
+            "derived": self.derived,
+            "completed": self.completed,
+            "peak_queue": self.peak_queue,
+            "sources": {
+                source: {
+                    "requests": self.requests.get(source, 0),
+                    "memory_hits": self.memory_hits.get(source, 0),
+                    **{name: hist.snapshot() for name, hist in phases.items()},
+                }
+                for source, phases in self._by_source.items()
+            },
+            "pages": {
+                f"{doc.name if hasattr(doc, 'name') else doc}#{page}": hist.snapshot()
+                for (doc, page), hist in self._by_page.items()
+            },
+        }
@@ -0,0 +1,68 @@
+import time
+
+
+class ScrollPrefetcher:
+    """
+    Acompanha a velocidade/direção da rolagem vertical e decide a janela de render:
+    parado, o buffer é simétrico; lendo, o buffer fica todo à frente e uma faixa
+    extra (proporcional à velocidade) é pré-carregada; num arremesso rápido (fling)
+    só o que está na tela é pedido, pois as páginas intermediárias serão puladas.
+    """
+
+    HORIZON_S = 0.75          # Quanto tempo de rolagem à frente é pré-carregado
+    MAX_LOOKAHEAD_PX = 4000
+    MIN_SPEED_PX_S = 60       # Abaixo disso a rolagem é considerada parada
+    FLING_SPEED_PX_S = 6000   # Acima disso nada além do viewport é pedido
+    IDLE_S = 0.3              # Sem amostras por esse tempo = parado
+    SMOOTHING = 0.5           # Peso da amostra nova na média móvel exponencial
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._last_value = None
+        self._last_time = 0.0
+        self._velocity = 0.0
+
+    def reset(self):
+        self._last_value = None
+        self._velocity = 0.0
+
+    def sample(self, value: int):
+        """Registra a posição da barra de rolagem (chamado a cada valueChanged)."""
+        now = self._clock()
+        if self._last_value is not None:
+            dt = now - self._last_time
+            if dt > self.IDLE_S:
+                self._velocity = 0.0
+            elif dt > 0:
+                instant = (value - self._last_value) / dt
+                self._velocity = self.SMOOTHING * instant + (1 - self.SMOOTHING) * self._velocity
+        self._last_value = value
+        self._last_time = now
+
+    @property
+    def velocity(self) -> float:
+        """Velocidade suavizada em px/s (positiva = descendo); 0 se a rolagem parou."""
+        if self._last_value is None or self._clock() - self._last_time > self.IDLE_S:
+            return 0.0
+        return self._velocity
+
+    @property
+    def is_fling(self) -> bool:
+        return abs(self.velocity) > self.FLING_SPEED_PX_S
+
+    def plan(self, top: int, bottom: int, buffer: int):
+        """
+        Retorna (janela_topo, janela_base, faixa_de_prefetch) em px do container.
+        A faixa é (início, fim) à frente da janela, ou None quando não há prefetch.
+        """
+        velocity = self.velocity
+        if abs(velocity) < self.MIN_SPEED_PX_S:
+            return top - buffer, bottom + buffer, None
+        if abs(velocity) > self.FLING_SPEED_PX_S:
+            return top, bottom, None
+
+        lookahead = min(abs(velocity) * self.HORIZON_S, self.MAX_LOOKAHEAD_PX)
+        if velocity > 0:
+            # Nada atrás do leitor: a janela começa no topo do viewport
+            return top, bottom + buffer, (bottom + buffer, bottom + buffer + lookahead)
+        return top - buffer, bottom, (top - buffer - lookahead, top - buffer)
@@ -0,0 +1,65 @@
+import math
+
+
+class TileGrid:
+    """
+    Grade fixa de tiles (em pixels) com níveis mip em potências de 2.
+    O nível 'L' é rasterizado com zoom 2**L e exibido escalado para o zoom real,
+    de modo que qualquer zoom dentro do mesmo nível reutiliza os mesmos tiles.
+    Coordenadas de entrada/saída em pontos PDF (página sem rotação).
+    """
+
+    def __init__(self, tile_size: int = 512, min_level: int = -3, max_level: int = 4, coarse_offset: int = 2):
+        self.tile_size = tile_size
+        self.min_level = min_level
+        self.max_level = max_level
+        self.coarse_offset = coarse_offset
+
+    @staticmethod
+    def level_zoom(level: int) -> float:
+        return 2.0 ** level
+
+    def level_for_zoom(self, zoom: float) -> int:
+        """Menor nível cuja resolução é >= zoom (evita upscale/pixelização)."""
+        if zoom <= 0:
+            return self.min_level
+        level = math.ceil(math.log2(zoom) - 1e-9)
+        return max(self.min_level, min(self.max_level, level))
+
+    def coarse_level(self, level: int) -> int:
+        """Nível grosseiro exibido enquanto o nível fino carrega."""
+        return max(self.min_level, level - self.coarse_offset)
+
+    def tile_span_pt(self, level: int) -> float:
+        """Lado de um tile em pontos PDF para o nível informado."""
+        return self.tile_size / self.level_zoom(level)
+
+    def grid_size(self, level: int, page_w_pt: float, page_h_pt: float) -> tuple[int, int]:
+        span = self.tile_span_pt(level)
+        return max(1, math.ceil(page_w_pt / span)), max(1, math.ceil(page_h_pt / span))
+
+    def tiles_for_rect(self, level: int, page_w_pt: float, page_h_pt: float, rect_pt: tuple, margin: int = 0) -> list[tuple[int, int]]:
+        """Lista (col, row) dos tiles que interceptam rect_pt (x0, y0, x1, y1), com margem opcional em tiles."""
+        x0, y0, x1, y1 = rect_pt
+        if x1 <= x0 or y1 <= y0:
+            return []
+        span = self.tile_span_pt(level)
+        cols, rows = self.grid_size(level, page_w_pt, page_h_pt)
+
+        c0 = max(0, int(x0 // span) - margin)
+        r0 = max(0, int(y0 // span) - margin)
+        c1 = min(cols - 1, int(math.ceil(x1 / span)) - 1 + margin)
+        r1 = min(rows - 1, int(math.ceil(y1 / span)) - 1 + margin)
+        return [(c, r) for r in range(r0, r1 + 1) for c in range(c0, c1 + 1)]
+
+    def tile_clip(self, level: int, col: int, row: int, page_w_pt: float, page_h_pt: float) -> tuple:
+        """Retângulo (x0, y0, x1, y1) em pontos PDF do tile, recortado à página."""
+        span = self.tile_span_pt(level)
+        x0 = col * span
+        y0 = row * span
+        return (
+            round(x0, 3),
+            round(y0, 3),
+            round(min(x0 + span, page_w_pt), 3),
+            round(min(y0 + span, page_h_pt), 3),
+        )
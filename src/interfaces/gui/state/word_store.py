@@ -0,0 +1,126 @@
+import math
+
+try:
+    import numpy as np
+except ImportError:  # Sem NumPy: teste palavra a palavra (sem grade)
+    np = None
+
+
+class PageWords:
+    """
+    Palavras de uma página prontas para seleção por retângulo: caixas (N x 4, em pontos)
+    num array, textos numa lista e uma grade espacial de células CELL_PT x CELL_PT com os
+    índices das palavras que tocam cada célula. Um teste de seleção só olha as células
+    cobertas pelo retângulo e filtra as candidatas com máscaras vetorizadas.
+    """
+
+    CELL_PT = 64.0
+
+    __slots__ = ("rects", "texts", "_grid", "_bounds")
+
+    def __init__(self, words):
+        """'words': tuplas do PyMuPDF (x0, y0, x1, y1, texto, bloco, linha, palavra)."""
+        self.texts = [w[4] for w in words]
+        self._grid = {}
+        self._bounds = (0, 0, -1, -1)
+        if np is None:
+            self.rects = [tuple(w[:4]) for w in words]
+            return
+        self.rects = np.array([w[:4] for w in words], dtype=np.float64).reshape(-1, 4)
+        if len(self.texts):
+            self._build_grid()
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def _build_grid(self):
+        cells = np.floor(self.rects / self.CELL_PT).astype(np.int64)
+        grid = {}
+        for index, (cx0, cy0, cx1, cy1) in enumerate(cells.tolist()):
+            for cy in range(cy0, max(cy0, cy1) + 1):
+                for cx in range(cx0, max(cx0, cx1) + 1):
+                    grid.setdefault((cx, cy), []).append(index)
+        self._grid = {cell: np.array(ids, dtype=np.int64) for cell, ids in grid.items()}
+        self._bounds = (int(cells[:, 0].min()), int(cells[:, 1].min()), int(cells[:, 2].max()), int(cells[:, 3].max()))
+
+    def _candidates(self, x0: float, y0: float, x1: float, y1: float):
+        """Índices das palavras nas células cobertas pelo retângulo (superconjunto do resultado)."""
+        gx0, gy0, gx1, gy1 = self._bounds
+        cx0 = max(gx0, math.floor(x0 / self.CELL_PT))
+        cy0 = max(gy0, math.floor(y0 / self.CELL_PT))
+        cx1 = min(gx1, math.floor(x1 / self.CELL_PT))
+        cy1 = min(gy1, math.floor(y1 / self.CELL_PT))
+        if cx0 > cx1 or cy0 > cy1:
+            return np.empty(0, dtype=np.int64)
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) >= len(self._grid):
+            return np.arange(len(self.texts)) # Retângulo cobre a página: varrer tudo é mais barato
+        parts = [self._grid[cell] for cy in range(cy0, cy1 + 1) for cx in range(cx0, cx1 + 1)
+                 if (cell := (cx, cy)) in self._grid]
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(parts))
+
+    def hit(self, x0: float, y0: float, x1: float, y1: float, crossing: bool) -> list:
+        """
+        Palavras selecionadas pelo retângulo (pontos da página), em ordem de leitura:
+        [(índice, (x0, y0, x1, y1))]. 'crossing' seleciona o que toca o retângulo;
+        caso contrário (janela), só o que está inteiramente dentro dele.
+        """
+        if not self.texts:
+            return []
+        if np is None:
+            return [(i, r) for i, r in enumerate(self.rects) if self._selects(r, x0, y0, x1, y1, crossing)]
+
+        candidates = self._candidates(x0, y0, x1, y1)
+        r = self.rects[candidates]
+        if crossing:
+            mask = ~((r[:, 2] < x0) | (r[:, 0] > x1) | (r[:, 3] < y0) | (r[:, 1] > y1))
+        else:
+            mask = (r[:, 0] >= x0) & (r[:, 2] <= x1) & (r[:, 1] >= y0) & (r[:, 3] <= y1)
+        return list(zip(candidates[mask].tolist(), map(tuple, r[mask].tolist())))
+
+    @staticmethod
+    def _selects(rect, x0, y0, x1, y1, crossing) -> bool:
+        wx0, wy0, wx1, wy1 = rect
+        if crossing:
+            return not (wx1 < x0 or wx0 > x1 or wy1 < y0 or wy0 > y1)
+        return wx0 >= x0 and wx1 <= x1 and wy0 >= y0 and wy1 <= y1
+
+
+class WordStore:
+    """
+    Palavras de um documento, página a página, montadas em segundo plano pelo
+    RenderEngine (WordIndexTask) a partir de um handle do pool: a seleção de texto
+    não reabre o PDF nem reextrai palavras a cada arraste.
+    """
+
+    def __init__(self):
+        self._pages = {}
+        self._waiters = {}  # página -> callbacks aguardando a extração urgente
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def get(self, page_num: int) -> PageWords | None:
+        return self._pages.get(page_num)
+
+    def put(self, page_num: int, words: PageWords) -> list:
+        """Guarda as palavras da página e devolve (removendo) os callbacks que esperavam por ela."""
+        self._pages[page_num] = words
+        return self._waiters.pop(page_num, [])
+
+    def wait(self, page_num: int, callback=None) -> bool:
+        """Registra uma espera pela página; True se é o primeiro pedido urgente dela."""
+        first = page_num not in self._waiters
+        waiters = self._waiters.setdefault(page_num, [])
+        if callback is not None:
+            waiters.append(callback)
+        return first
+
+    def drop_waiters(self, page_num: int):
+        """Extração urgente terminou sem a página (falha ou sessão expirada)."""
+        self._waiters.pop(page_num, None)
+
+    def missing(self, page_nums) -> list:
+        """Páginas ainda não extraídas, na ordem pedida."""
+        return [page for page in page_nums if page not in self._pages]
@@ -0,0 +1,63 @@
+import os
+
+
+class WorkerPolicy:
+    """
+    Dimensiona o pool de renderização (workers e handles fitz abertos) a partir do
+    número de CPUs, da RAM disponível e da complexidade do documento (DocumentAnalyzer).
+    Documentos leves aceitam muitos workers (tempestades de miniaturas); pranchas
+    HEAVY/ULTRA_HEAVY ficam conservadoras, pois cada raster pode ocupar centenas de MB.
+    """
+
+    # complexidade -> (máximo de workers, RAM estimada por worker em MB)
+    PROFILES = {
+        "LIGHT": (8, 64),
+        "STANDARD": (4, 160),
+        "HEAVY": (3, 512),
+        "ULTRA_HEAVY": (2, 1024),
+    }
+    RAM_BUDGET_FRACTION = 0.5    # Fração da RAM disponível que os workers podem ocupar
+    PRESSURE_FRACTION = 0.10     # Abaixo disso (livre/total) o pool é reduzido à metade
+    PRESSURE_MIN_MB = 512
+
+    def __init__(self, cpu_count: int | None = None, memory_probe=None):
+        self.cpu_count = cpu_count or os.cpu_count() or 2
+        self._memory_probe = memory_probe or self._probe_memory
+
+    @staticmethod
+    def _probe_memory():
+        """Retorna (disponível, total) em bytes, ou None se psutil não estiver disponível."""
+        try:
+            import psutil
+            vm = psutil.virtual_memory()
+            return vm.available, vm.total
+        except Exception:
+            return None
+
+    def compute(self, complexity: str = "STANDARD") -> dict:
+        """Calcula workers/handles para a complexidade informada no estado atual da máquina."""
+        max_workers, per_worker_mb = self.PROFILES.get(complexity, self.PROFILES["STANDARD"])
+
+        # Um núcleo fica reservado para a GUI; o piso de 2 é o comportamento histórico do pool
+        workers = min(max_workers, max(2, self.cpu_count - 1))
+
+        available_mb = total_mb = None
+        pressure = False
+        memory = self._memory_probe()
+        if memory:
+            available_mb = memory[0] / (1024 * 1024)
+            total_mb = memory[1] / (1024 * 1024)
+            workers = min(workers, max(1, int(available_mb * self.RAM_BUDGET_FRACTION // per_worker_mb)))
+            pressure = available_mb < self.PRESSURE_MIN_MB or (total_mb and available_mb / total_mb < self.PRESSURE_FRACTION)
+            if pressure:
+                workers = max(1, workers // 2)
+
+        return {
+            "complexity": complexity if complexity in self.PROFILES else "STANDARD",
+            "workers": workers,
+            "handles": workers,  # Um handle por worker: nenhuma thread espera por handle
+            "cpu_count": self.cpu_count,
+            "available_mb": round(available_mb) if available_mb is not None else None,
+            "total_mb": round(total_mb) if total_mb is not None else None,
+            "memory_pressure": bool(pressure),
+        }
@@ -1,5 +1,5 @@
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QStackedWidget, QTextEdit
-from PyQt6.QtCore import Qt, QPropertyAnimation, QEasingCurve, QRect, pyqtSignal
+from PyQt6.QtCore import Qt, QPropertyAnimation, QEasingCurve, QRect, QTimer, pyqtSignal
 from src.interfaces.gui.utils.ui_error_boundary import safe_ui_callback
 
 class BottomPanelHeader(QWidget):
@@ -45,6 +45,13 @@ class BottomPanel(QWidget):
         self.telemetry = QLabel("W: 0.0mm | H: 0.0mm | X: 0.0mm | Y: 0.0mm")
         self.telemetry.setStyleSheet("color: #FFC107; font-family: 'JetBrains Mono'; font-size: 10px; background-color: transparent;")
         
+        # Estatísticas do RenderEngine ao vivo (fila, hit rate, p95, memória)
+        self.render_stats = QLabel("")
+        self.render_stats.setStyleSheet("color: #64748B; font-family: 'JetBrains Mono'; font-size: 10px; margin-right: 12px; background-color: transparent;")
+        self._stats_timer = QTimer(self)
+        self._stats_timer.timeout.connect(self._poll_render_stats)
+        self._stats_timer.start(1000)
+        
         self.btn_toggle = QPushButton("⌃")
         self.btn_toggle.setObjectName("ToggleBtn") # Usa estilo novo
         self.btn_toggle.clicked.connect(self.toggle_expand)
@@ -52,6 +59,7 @@ class BottomPanel(QWidget):
         header_layout.addWidget(self.title_label)
         header_layout.addWidget(self.summary_log)
         header_layout.addStretch()
+        header_layout.addWidget(self.render_stats)
         header_layout.addWidget(self.telemetry)
         header_layout.addWidget(self.btn_toggle)
         
@@ -96,6 +104,39 @@ class BottomPanel(QWidget):
             self.telemetry.setText(f"SEL: {w_mm:.1f}x{h_mm:.1f}mm | X: {x_mm:.1f} Y: {y_mm:.1f}")
             self.telemetry.setStyleSheet("color: #FFC107; font-family: 'JetBrains Mono'; font-size: 10px; background-color: transparent;")
 
+    def _poll_render_stats(self):
+        """Consulta o motor apenas se ele já existe e o painel está visível."""
+        if not self.isVisible():
+            return
+        from src.interfaces.gui.state.render_engine import RenderEngine
+        engine = RenderEngine._instance
+        if engine is None or not engine._initialized:
+            return
+        self.update_render_stats(engine.stats())
+
+    @safe_ui_callback("Render Stats")
+    def update_render_stats(self, stats: dict):
+        """Resumo compacto no cabeçalho; detalhes por origem no tooltip."""
+        queue = stats.get("queue", {})
+        cache = stats.get("cache", {})
+        viewer = stats.get("sources", {}).get("viewer", {})
+        self.render_stats.setText(
+            f"RENDER Q:{queue.get('depth', 0)} RUN:{queue.get('running', 0)} | "
+            f"HIT {stats.get('memory_hit_rate', 0.0):.0%} | "
+            f"p95 {viewer.get('total', {}).get('p95_ms', 0.0):.0f}ms | "
+            f"{cache.get('bytes', 0) / (1024 * 1024):.0f}MB"
+        )
+
+        lines = []
+        for source, data in stats.get("sources", {}).items():
+            lines.append(
+                f"{source}: {data['requests']} req, {data['memory_hits']} hits | "
+                f"fila p50 {data['queue']['p50_ms']:.0f}ms | handle p95 {data['handle_wait']['p95_ms']:.0f}ms | "
+                f"render p50 {data['render']['p50_ms']:.0f}ms p95 {data['render']['p95_ms']:.0f}ms"
+            )
+        lines.append(f"pico da fila: {stats.get('peak_queue', 0)} | disco: {stats.get('disk_hits', 0)} | modos derivados: {stats.get('derived', 0)}")
+        self.render_stats.setToolTip("\n".join(lines))
+
     @safe_ui_callback("Bottom Panel Animation")
     def toggle_expand(self, checked=None):
         """Toggle com animação suave e lógica de resumo."""
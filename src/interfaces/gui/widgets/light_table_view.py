@@ -46,7 +46,8 @@ class PageItem(QGraphicsPixmapItem):
         
         RenderEngine.instance().request_render(
             self.source_path, self.page_index, target_zoom, 0, 
-            lambda idx, pix, z, r, m, c: self._on_render_finished(pix)
+            lambda idx, pix, z, r, m, c: self._on_render_finished(pix),
+            source="light_table"
         )
 
 
@@ -1,14 +1,19 @@
 from PyQt6.QtWidgets import QLabel
 from PyQt6.QtGui import QPixmap, QPainter, QColor, QBrush
-from PyQt6.QtCore import Qt, QRectF
+from PyQt6.QtCore import Qt, QRectF, QSize
 from pathlib import Path
 from src.infrastructure.services.logger import log_debug, log_error, log_exception
 from src.interfaces.gui.state.render_engine import RenderEngine
+from src.interfaces.gui.state.tile_grid import TileGrid
+from src.interfaces.gui.state.color_modes import ColorModeFilter
 from src.infrastructure.services.telemetry_service import TelemetryService
 
 class PageWidget(QLabel):
     """Widget de página que conhece sua própria origem (Source Path/Index)."""
 
+    # Grade compartilhada por todas as páginas em modo tiles (HEAVY/ULTRA_HEAVY)
+    TILE_GRID = TileGrid(tile_size=512)
+
     def __init__(self, source_path: str, source_index: int, width_pt=0, height_pt=0, parent=None, viewer=None):
         super().__init__(parent)
         self.source_path = source_path
@@ -32,6 +37,50 @@ class PageWidget(QLabel):
         self._rendered = False
         self._highlights = [] # list[QRectF] em pontos PDF
         self._base_pixmap = None
+        self._preview = None # Prévia (outro zoom) pintada escalada até o render exato chegar
+        self._tiles = {} # {level: {(col, row): QPixmap}} - pirâmide de tiles (modo HEAVY)
+        self._binding = 0 # Incrementado a cada troca de página (widget reciclado pelo viewer)
+
+    def bind(self, source_path: str, source_index: int, width_pt, height_pt, rotation=0, zoom=1.0, mode="default"):
+        """
+        Reaproveita o widget para outra página (pool do viewer virtualizado). Callbacks
+        pendentes da página anterior passam a ser ignorados; um render em cache aparece na hora.
+        """
+        self._binding += 1
+        self.source_path = source_path
+        self.source_index = source_index
+        self.width_pt = width_pt
+        self.height_pt = height_pt
+        self.rotation = rotation
+        self.mode = mode
+        self._reset_content()
+        self.update_layout_size(zoom)
+
+        cached = RenderEngine.instance().cached_nearest(source_path, source_index, zoom, rotation, mode, self._current_layer_config())
+        if cached is not None and cached[0] is not None:
+            self._preview = cached[0]
+            self.setStyleSheet("background-color: white; border: 1px solid #111;")
+        else:
+            self.setStyleSheet("background-color: #2D2D2D; border: 1px solid #444;")
+
+    def unbind(self):
+        """Devolve o widget ao pool: descarta os rasters e invalida os callbacks pendentes."""
+        self._binding += 1
+        self._reset_content()
+        self.hide()
+
+    def _reset_content(self):
+        self._rendered = False
+        self._base_pixmap = None
+        self._preview = None
+        self._tiles = {}
+        self._highlights = []
+        self.clear()
+
+    def _bound(self, callback):
+        """Envolve um callback do motor para que só valha enquanto o widget exibe a mesma página."""
+        binding = self._binding
+        return lambda *args: callback(*args) if binding == self._binding else None
 
     def update_layout_size(self, zoom: float):
         """Define o tamanho físico do widget ANTES da renderização para estabilizar o scroll."""
@@ -47,16 +96,160 @@ class PageWidget(QLabel):
             new_w = int(w * zoom)
             new_h = int(h * zoom)
             
-            if self.size() != (new_w, new_h):
+            if self.size() != QSize(new_w, new_h):
                 self.setFixedSize(new_w, new_h)
-                # Se o zoom mudou, o cache antigo é inválido
+                # Se o zoom mudou, o cache antigo é inválido (mas serve de prévia escalada)
+                if self._base_pixmap is not None:
+                    self._preview = self._base_pixmap
                 self._base_pixmap = None
                 # CRÍTICO: Marcar como não renderizado para forçar nova requisição
                 self._rendered = False
 
 
-    def render_page(self, zoom=None, rotation=None, mode=None, force=False, clip=None, priority=0):
-        """Solicita renderização. Suporta 'clip' para Tiling em arquivos pesados."""
+    def _current_layer_config(self):
+        """Layer Config Access (Viewer -> MainWindow -> Config)"""
+        if self._viewer and hasattr(self._viewer, '_layer_config'):
+            return self._viewer._layer_config
+        return None
+
+    def supports_tiles(self) -> bool:
+        """Tiles exigem dimensões conhecidas e página sem rotação (clip em coordenadas da página)."""
+        return self.width_pt > 0 and self.height_pt > 0 and self.rotation % 360 == 0
+
+    def invalidate_tiles(self):
+        self._tiles = {}
+
+    def request_tiles(self, visible_rect: QRectF, zoom=None, mode=None, force=False, priority=0):
+        """
+        Solicita apenas os tiles ausentes que cobrem 'visible_rect' (coordenadas do widget).
+        O nível grosseiro é pedido com prioridade maior para preencher a tela enquanto o fino carrega.
+        """
+        try:
+            if zoom is not None and abs(self.zoom - zoom) > 0.001:
+                self.update_layout_size(zoom)
+            if mode is not None and self.mode != mode:
+                self.mode = mode
+                force = True
+            if force:
+                self.invalidate_tiles()
+
+            if not self.supports_tiles():
+                self.render_page(zoom=self.zoom, mode=self.mode, force=force, priority=priority)
+                return
+
+            grid = self.TILE_GRID
+            fine = grid.level_for_zoom(self.zoom)
+            coarse = grid.coarse_level(fine)
+
+            # Níveis que não servem mais ao zoom atual são descartados
+            for level in list(self._tiles):
+                if level not in (fine, coarse):
+                    del self._tiles[level]
+
+            rect_pt = (
+                max(0.0, visible_rect.left() / self.zoom),
+                max(0.0, visible_rect.top() / self.zoom),
+                min(self.width_pt, visible_rect.right() / self.zoom),
+                min(self.height_pt, visible_rect.bottom() / self.zoom),
+            )
+
+            if self._base_pixmap is None and not self._tiles:
+                self.setStyleSheet("background-color: #2D2D2D; border: 1px solid #444;")
+
+            layer_config = self._current_layer_config()
+            engine = RenderEngine.instance()
+            on_tile = self._bound(self.on_tile_finished)
+            levels = [(coarse, priority + 1)] if coarse == fine else [(coarse, priority + 1), (fine, priority)]
+
+            for level, level_priority in levels:
+                have = self._tiles.setdefault(level, {})
+                needed = grid.tiles_for_rect(level, self.width_pt, self.height_pt, rect_pt)
+
+                if level == fine and level != coarse:
+                    # Mantém só os tiles finos próximos da área visível (memória limitada)
+                    keep = set(grid.tiles_for_rect(level, self.width_pt, self.height_pt, rect_pt, margin=1))
+                    for tile in [t for t in have if t not in keep]:
+                        del have[tile]
+
+                for col, row in needed:
+                    if (col, row) in have:
+                        continue
+                    engine.request_render(
+                        self.source_path,
+                        self.source_index,
+                        grid.level_zoom(level),
+                        0,
+                        lambda p, pix, z, r, m, c, lv=level, cr=(col, row): on_tile(lv, cr, pix, m),
+                        mode=self.mode,
+                        clip=grid.tile_clip(level, col, row, self.width_pt, self.height_pt),
+                        priority=level_priority,
+                        layer_config=layer_config
+                    )
+        except Exception as e:
+            log_exception(f"PageWidget: Erro ao solicitar tiles: {e}")
+
+    def on_tile_finished(self, level, tile, pixmap, mode):
+        """Callback de tile: armazena no nível correspondente se ainda for útil."""
+        try:
+            if pixmap.isNull() or mode != self.mode or level not in self._tiles:
+                return
+            self._tiles[level][tile] = pixmap
+            if not self._rendered:
+                self._rendered = True
+                self.setStyleSheet("background-color: white; border: 1px solid #111;")
+            self.update()
+        except RuntimeError:
+            pass # Object destroyed
+
+    def paintEvent(self, event):
+        """Com tiles ativos, pinta nível grosseiro e depois o fino (escalados para o zoom atual)."""
+        if not any(self._tiles.values()):
+            if self._preview is not None and self._base_pixmap is None:
+                self._paint_preview(event)
+            else:
+                super().paintEvent(event)
+            return
+
+        painter = QPainter(self)
+        bg = QColor(*ColorModeFilter.paper_color(self.mode))
+        painter.fillRect(self.rect(), bg)
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+
+        grid = self.TILE_GRID
+        dirty = QRectF(event.rect())
+        for level in sorted(self._tiles):
+            scale = self.zoom / grid.level_zoom(level)
+            step = grid.tile_size * scale
+            for (col, row), pix in self._tiles[level].items():
+                target = QRectF(col * step, row * step, pix.width() * scale, pix.height() * scale)
+                if target.intersects(dirty):
+                    painter.drawPixmap(target, pix, QRectF(pix.rect()))
+        painter.setPen(QColor("#111"))
+        painter.drawRect(self.rect().adjusted(0, 0, -1, -1))
+        painter.end()
+
+    def _paint_preview(self, event):
+        """
+        Pinta a prévia esticada até o tamanho atual (apenas a região suja). Durante um
+        gesto de zoom a escala é a rápida (sem suavização); o viewer repinta ao assentar.
+        """
+        painter = QPainter(self)
+        if not (self._viewer is not None and getattr(self._viewer, "_zoom_gesture", False)):
+            painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+        sx = self._preview.width() / max(1, self.width())
+        sy = self._preview.height() / max(1, self.height())
+        dirty = QRectF(event.rect())
+        source = QRectF(dirty.x() * sx, dirty.y() * sy, dirty.width() * sx, dirty.height() * sy)
+        painter.drawPixmap(dirty, self._preview, source)
+        painter.setPen(QColor("#111"))
+        painter.drawRect(self.rect().adjusted(0, 0, -1, -1))
+        painter.end()
+
+    def render_page(self, zoom=None, rotation=None, mode=None, force=False, priority=0, source="viewer"):
+        """
+        Solicita renderização da página inteira (ver request_tiles para o modo em tiles).
+        Com source="prefetch" (página ainda fora da tela) não há prévia progressiva.
+        """
         try:
             should_render = force
             
@@ -67,23 +260,23 @@ class PageWidget(QLabel):
             if rotation is not None and self.rotation != rotation:
                 should_render = True
                 self.rotation = rotation
+                self._preview = None
+                self.invalidate_tiles()
                 self.update_layout_size(self.zoom)
 
             if mode is not None and self.mode != mode:
                 should_render = True
                 self.mode = mode
+                self._preview = None
             
-            if not should_render and self._rendered and clip is None:
+            if not should_render and self._rendered and self._base_pixmap is not None:
                 return
             
             # Feedback visual de carregamento
-            if not self._rendered and self._base_pixmap is None:
+            if not self._rendered and self._base_pixmap is None and self._preview is None:
                 self.setStyleSheet("background-color: #2D2D2D; border: 1px solid #444;")
 
-            # Layer Config Access (Viewer -> MainWindow -> Config)
-            layer_config = None
-            if self._viewer and hasattr(self._viewer, '_layer_config'):
-                layer_config = self._viewer._layer_config
+            layer_config = self._current_layer_config()
 
             # O RenderEngine gerencia a fila
             RenderEngine.instance().request_render(
@@ -91,43 +284,77 @@ class PageWidget(QLabel):
                 self.source_index, 
                 self.zoom, 
                 self.rotation, 
-                self.on_render_finished,
+                self._bound(self.on_render_finished),
                 mode=self.mode,
-                clip=clip,
                 priority=priority,
-                layer_config=layer_config
+                layer_config=layer_config,
+                source=source,
+                preview_callback=self._bound(self.on_preview_ready) if source != "prefetch" else None
             )
         except Exception as e:
             log_exception(f"PageWidget: Erro ao solicitar render: {e}")
 
+    def render_interim(self, zoom, bucket_zoom, priority=0):
+        """
+        Durante um gesto de zoom: ajusta o layout e exibe o render em cache mais próximo,
+        escalado. Sem nada para mostrar, pede só o bucket do zoom (reaproveitável entre gestos).
+        O render exato fica para quando o gesto terminar (ver PDFViewerWidget).
+        """
+        try:
+            if abs(self.zoom - zoom) > 0.001:
+                self.update_layout_size(zoom)
+            if self._base_pixmap is not None:
+                return
+
+            layer_config = self._current_layer_config()
+            engine = RenderEngine.instance()
+            cached = engine.cached_nearest(self.source_path, self.source_index, zoom, self.rotation, self.mode, layer_config)
+            if cached is not None:
+                pixmap, cached_zoom = cached
+                self.on_preview_ready(self.source_index, pixmap, cached_zoom, self.rotation, self.mode, None)
+                return
+
+            if self._preview is None:
+                engine.request_render(
+                    self.source_path,
+                    self.source_index,
+                    bucket_zoom,
+                    self.rotation,
+                    self._bound(self.on_preview_ready),
+                    mode=self.mode,
+                    priority=priority,
+                    layer_config=layer_config
+                )
+        except Exception as e:
+            log_exception(f"PageWidget: Erro ao exibir prévia de zoom: {e}")
+
+    def on_preview_ready(self, page_num, pixmap, zoom, rotation, mode, clip):
+        """Callback progressivo: exibe a prévia escalada enquanto o render exato não chega."""
+        if page_num != self.source_index or rotation != self.rotation or mode != self.mode: return
+
+        try:
+            if pixmap.isNull() or self._base_pixmap is not None: return
+            # Mantém a prévia de maior resolução já recebida
+            if self._preview is not None and self._preview.width() >= pixmap.width(): return
+
+            self._preview = pixmap
+            self.setStyleSheet("background-color: white; border: 1px solid #111;")
+            self.update()
+        except RuntimeError:
+            pass # Object destroyed
+
     def on_render_finished(self, page_num, pixmap, zoom, rotation, mode, clip):
-        """Callback do motor central. Gerencia se é um frame completo ou um tile."""
+        """Callback do motor central para renderizações de página inteira."""
         if page_num != self.source_index: return
         if abs(zoom - self.zoom) > 0.001 or rotation != self.rotation or mode != self.mode: return
 
         try:
             if pixmap.isNull(): return
                 
-            if clip is None:
-                # Renderização Completa
-                self._base_pixmap = pixmap
-                self.setPixmap(self._base_pixmap)
-            else:
-                # Renderização de Tile (Bloco)
-                # Se ainda não temos um pixmap base do tamanho certo, criamos um vazio
-                if self._base_pixmap is None or self._base_pixmap.size() != self.size():
-                    self._base_pixmap = QPixmap(self.size())
-                    bg = QColor(255, 255, 255) if mode == "default" else QColor(30, 30, 30)
-                    self._base_pixmap.fill(bg)
-                
-                # Compor o tile no pixmap base na posição correta
-                painter = QPainter(self._base_pixmap)
-                tx = int(clip[0] * zoom)
-                ty = int(clip[1] * zoom)
-                painter.drawPixmap(tx, ty, pixmap)
-                painter.end()
-                
-                self.setPixmap(self._base_pixmap)
+            self._tiles = {} # Frame completo substitui a pirâmide
+            self._preview = None
+            self._base_pixmap = pixmap
+            self.setPixmap(self._base_pixmap)
             
             # Se for a primeira página, registrar o TTU (Time to Usability)
             if self.source_index == 0:
@@ -20,6 +20,8 @@ class StartupConfigDialog(QDialog):
         "startup_async_loader": ("Carregamento Assíncrono", True),
         "startup_telemetry": ("Telemetria e Logs Detalhados", True),
         "startup_hardware_accel": ("Aceleração de Hardware (OpenGL)", False), # Default False para evitar black screen
+        "startup_render_processes": ("Renderização Multiprocesso (Experimental)", False),
+        "startup_render_stats": ("Estatísticas de Renderização (Histórico CSV/JSON)", False),
     }
 
     def __init__(self, parent=None):
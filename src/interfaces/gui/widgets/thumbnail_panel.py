@@ -232,7 +232,8 @@ class ThumbnailPanel(ResilientWidget):
                 try:
                     engine.request_render(
                         path, original_idx, 0.2, 0, 
-                        lambda p_idx, pix, z, r, m, c, w=widget, sid=session_id: self._on_thumb_ready(w, pix, sid)
+                        lambda p_idx, pix, z, r, m, c, w=widget, sid=session_id: self._on_thumb_ready(w, pix, sid),
+                        source="thumbnail"
                     )
                 except: pass
                 
@@ -1,10 +1,12 @@
 from pathlib import Path
-from PyQt6.QtWidgets import QScrollArea, QVBoxLayout, QWidget, QFrame, QMenu, QApplication, QRubberBand
-from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QPoint, QEvent, QRect, QRectF
-from PyQt6.QtGui import QPainter, QColor, QPalette, QPen, QBrush
+from PyQt6.QtWidgets import QScrollArea, QVBoxLayout, QWidget, QFrame, QMenu, QApplication, QRubberBand, QStyle, QStyleOption
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QPoint, QPointF, QEvent, QRect, QRectF
+from PyQt6.QtGui import QPainter, QColor, QPalette, QPen, QBrush, QCursor
 from src.interfaces.gui.widgets.page_widget import PageWidget
 from src.infrastructure.services.logger import log_debug, log_warning, log_error, log_exception
 from src.interfaces.gui.state.render_engine import RenderEngine
+from src.interfaces.gui.state.page_layout import PageLayout, PageSlot
+from src.interfaces.gui.state.scroll_prefetcher import ScrollPrefetcher
 from src.interfaces.gui.widgets.floating_navbar import FloatingNavBar
 from src.interfaces.gui.widgets.nav_hub import NavHub
 from src.interfaces.gui.widgets.marker_scrollbar import MarkerScrollBar
@@ -28,22 +30,42 @@ class SelectionOverlay(QWidget):
             painter.end()
 
 class SelectionContainer(QWidget):
-    """Container widget that handles layout and overlay resizing."""
+    """Container widget that handles overlay resizing and paints pages without a widget."""
     def __init__(self, parent=None):
         super().__init__(parent)
         self._overlay = SelectionOverlay(self)
+        self._viewer = None
         
     def set_viewer_ref(self, viewer):
+        self._viewer = viewer
         self._overlay.set_viewer_ref(viewer)
 
+    def paintEvent(self, event):
+        # Fundo do stylesheet (subclasses de QWidget não o pintam sozinhas)
+        painter = QPainter(self)
+        option = QStyleOption()
+        option.initFrom(self)
+        self.style().drawPrimitive(QStyle.PrimitiveElement.PE_Widget, option, painter, self)
+        if self._viewer:
+            self._viewer._paint_page_placeholders(painter, event.rect())
+        painter.end()
+
     def resizeEvent(self, event):
         super().resizeEvent(event)
         self._overlay.resize(self.size())
         self._overlay.raise_()
+        if self._viewer:
+            self._viewer._on_container_resized()
 
 
 class PDFViewerWidget(QScrollArea):
-    """Visualizador que suporta documentos virtuais (múltiplas fontes)."""
+    """
+    Visualizador que suporta documentos virtuais (múltiplas fontes).
+    Superfície virtualizada: a geometria das páginas vem dos metadados (PageLayout) e
+    só as páginas da janela visível recebem um PageWidget, reciclado de um pool pequeno;
+    as demais são pintadas pelo container como retângulos. Abrir e rolar não dependem
+    do número de páginas.
+    """
     pageChanged = pyqtSignal(int)
     selectionChanged = pyqtSignal(tuple)  # (pdf_x0, pdf_y0, pdf_x1, pdf_y1)
     textExtracted = pyqtSignal(str)  # Texto selecionado extraído
@@ -51,6 +73,18 @@ class PDFViewerWidget(QScrollArea):
     draftNoteRequested = pyqtSignal(str) # Solicitação para enviar texto para rascunho de nota
     highlightRequested = pyqtSignal(int, tuple, tuple) # page_idx, rect (x0,y0,x1,y1), color (r,g,b)
 
+    # Widgets livres mantidos para reciclagem (os vinculados acompanham a janela visível)
+    SPARE_PAGE_WIDGETS = 4
+    # Histerese da liberação: uma página só devolve o widget (e seus rasters) quando se
+    # afasta essa distância além da janela; ao voltar, o cache do motor repõe o raster
+    RELEASE_MARGIN_PX = 1200
+    # Gesto de zoom: layout aplicado no máximo uma vez por quadro; render exato só
+    # depois que a entrada fica ociosa por ZOOM_SETTLE_MS
+    ZOOM_FRAME_MS = 16
+    ZOOM_SETTLE_MS = 250
+    # Tamanho assumido quando os metadados não trazem as dimensões da página (A4)
+    DEFAULT_PAGE_SIZE_PT = (595, 842)
+
     def __init__(self):
         super().__init__()
         # We don't need event filter anymore with SelectionContainer
@@ -59,7 +93,6 @@ class PDFViewerWidget(QScrollArea):
         self.setWidgetResizable(True)
         # Use custom container for painting
         self.container = SelectionContainer() # Parent set via setWidget implicitly or invalid? better no parent first
-        self.container.set_viewer_ref(self)
         
         self.layout = QVBoxLayout(self.container)
         self.layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
@@ -82,17 +115,42 @@ class PDFViewerWidget(QScrollArea):
         self.nav_hub.toolChanged.connect(self._on_hub_tool_changed)
         self.nav_hub.hide()
         
-        self._pages: list[PageWidget] = []
-        self._page_sizes: list[tuple[float, float]] = [] 
+        self._pages: list[PageSlot] = []
+        self._geometry = PageLayout()
+        self._bound: dict[int, PageWidget] = {} # índice visual -> widget vinculado
+        self._spare_widgets: list[PageWidget] = []
+        self.container.set_viewer_ref(self)
         self._zoom = 1.0
         self._mode = "default"
         self._layout_mode = "single"
+        self._hints = {}
+        self._layer_config = {}
         self._last_emitted_page = -1
-        self._current_load_session = 0
         # Throttling de visibilidade para evitar flood de renderização
         self._visibility_timer = QTimer(self)
         self._visibility_timer.setSingleShot(True)
         self._visibility_timer.timeout.connect(self._do_check_visibility)
+        # Gesto de zoom: prévias escaladas até o zoom assentar, depois render exato
+        self._zoom_gesture = False
+        self._zoom_settle_timer = QTimer(self)
+        self._zoom_settle_timer.setSingleShot(True)
+        self._zoom_settle_timer.timeout.connect(self._on_zoom_settled)
+        # Passos de Ctrl+roda acumulados até o próximo quadro: (zoom alvo, ponto de foco)
+        self._pending_zoom = None
+        self._zoom_frame_timer = QTimer(self)
+        self._zoom_frame_timer.setSingleShot(True)
+        self._zoom_frame_timer.timeout.connect(self._apply_pending_zoom)
+        
+        # Prefetch preditivo: velocidade/direção da rolagem decidem a janela de render
+        self._prefetcher = ScrollPrefetcher()
+        self.verticalScrollBar().valueChanged.connect(self._prefetcher.sample)
+        # Rolagem parou (sem amostras por IDLE_S): nova passada com o buffer simétrico,
+        # senão o que ficou atrás do leitor (ou fora do viewport após um fling) não renderiza
+        self._scroll_settle_timer = QTimer(self)
+        self._scroll_settle_timer.setSingleShot(True)
+        self._scroll_settle_timer.setInterval(int(ScrollPrefetcher.IDLE_S * 1000) + 50)
+        self._scroll_settle_timer.timeout.connect(self.check_visibility)
+        self.verticalScrollBar().valueChanged.connect(lambda _: self._scroll_settle_timer.start())
         
         # Controle de renderização em lote
         self.verticalScrollBar().valueChanged.connect(self.check_visibility)
@@ -109,12 +167,13 @@ class PDFViewerWidget(QScrollArea):
         # Single unified selection model like Chrome PDF viewer
         self._selected_word_rects = []  # List of current DRAG highlights
         self._persistent_selection = {} # Cache of { (page_idx, word_idx): rect_data }
-        self._visible_pages_words = []  # Cache: list of {words: [...], page_pos: QPoint, page_index: int}
+        self._visible_pages_words = []  # Cache: list of {words: PageWords, page_pos: QPoint, page_index: int}
         self._selected_text = ""  # Text currently selected
         self._highlight_color = "#3399FF"  # Selection blue
         self._persistent_highlight_color = "#2196F3" # Solid blue for saved selection
         self._selection_is_crossing = False 
         self._current_selection_rect = None 
+        self._selection_pos = None # Last drag position (container coords)
         self._selection_modifier = Qt.KeyboardModifier.NoModifier
         
         # Tool Mode & Interaction
@@ -127,24 +186,38 @@ class PDFViewerWidget(QScrollArea):
 
 
     def clear(self):
-        """Limpa o visualizador e encerra processos pendentes."""
-        RenderEngine.instance().clear_queue()
+        """Limpa o visualizador e encerra processos pendentes (o cache por documento é mantido)."""
+        RenderEngine.instance().clear_queue(keep_cache=True)
         if hasattr(self, "_visibility_timer"):
             self._visibility_timer.stop()
+            self._scroll_settle_timer.stop()
+        if hasattr(self, "_zoom_settle_timer"):
+            self._zoom_settle_timer.stop()
+            self._zoom_gesture = False
+            self._zoom_frame_timer.stop()
+            self._pending_zoom = None
         while self.layout.count():
             child = self.layout.takeAt(0)
             if child.widget():
                 child.widget().deleteLater()
-        self._pages.clear()
-        self._page_sizes.clear()
+        for index in list(self._bound):
+            self._unbind_page(index)
+        self._pages = []
+        self._geometry.rebuild(self._pages, self._zoom, self._columns())
+        self._apply_geometry()
         self._hints = {}
         self._last_emitted_page = -1
         self._layer_config = {}
 
     def update_render_config(self, config: dict):
-        """Atualiza a configuração de renderização (ex: visibilidade de layers) e redesenha."""
+        """
+        Atualiza a configuração de renderização (ex: visibilidade de layers) e redesenha
+        apenas as páginas que usam as camadas alteradas (todas, se o índice não está pronto).
+        """
+        changed = {layer_id for layer_id, visible in config.items() if self._layer_config.get(layer_id) != visible}
         self._layer_config.update(config)
-        self.refresh_current_view()
+        if changed:
+            self.refresh_current_view(changed)
 
     def setPlaceholder(self, widget: QWidget):
         self.clear()
@@ -152,13 +225,12 @@ class PDFViewerWidget(QScrollArea):
 
     def load_document(self, path: Path, metadata: dict):
         """Inicializa o visualizador com um arquivo e seus metadados."""
-        self._current_load_session += 1
         self.clear()
         self._hints = metadata.get("hints", {"complexity": "STANDARD"})
-        self.add_pages(path, metadata, session_id=self._current_load_session)
+        self.add_pages(path, metadata)
 
-    def add_pages(self, path: Path, metadata: dict, session_id: int = 0):
-        """Adiciona páginas de um novo documento de forma progressiva."""
+    def add_pages(self, path: Path, metadata: dict):
+        """Adiciona as páginas de um novo documento (só geometria; widgets sob demanda)."""
         page_count = metadata.get("page_count", 0)
         page_info = metadata.get("pages", [])
         
@@ -178,129 +250,80 @@ class PDFViewerWidget(QScrollArea):
                 # Não há como exibir nada, mas não propagamos o erro
                 return
         
-        # Carregamento Progressivo: carregar as primeiras N páginas imediatamente
-        # e as demais em background para garantir abertura < 1s
-        initial_batch = 20
-        
-        def create_page_widgets(start_idx, count):
-            # Validação de sessão: se o visualizador já está carregando outro arquivo, abortar este lote
-            if not self.container or session_id != self._current_load_session: return
-            
-            self.container.setUpdatesEnabled(False)
-            
-            end_idx = min(start_idx + count, page_count)
-            log_debug(f"Viewer: Batch creation {start_idx} to {end_idx}...")
-            
-            try:
-                for i in range(start_idx, end_idx):
-                    try:
-                        w_pt, h_pt = 0, 0
-                        if i < len(page_info):
-                            page_meta = page_info[i]
-                            w_pt = page_meta.get("width_pt", 0)
-                            h_pt = page_meta.get("height_pt", 0)
-                            self._page_sizes.append(page_meta)
-                        else:
-                            self._page_sizes.append({"width_pt": 595, "height_pt": 842})
-                            
-                            
-                        page_widget = PageWidget(str(path), i, width_pt=w_pt, height_pt=h_pt, viewer=self)
-                        self.layout.addWidget(page_widget)
-                        self._pages.append(page_widget)
-                    except Exception as e:
-                        log_error(f"Viewer: Erro ao criar widget da página {i}: {e}")
-                
-                self.container.setUpdatesEnabled(True)
-                
-                # Trigger visibility check after first batch to start rendering immediately
-                if start_idx == 0 and end_idx > 0:
-                    QTimer.singleShot(10, self.check_visibility)
-                
-                if end_idx < page_count:
-                    # Pequeno delay para respirar a GUI
-                    QTimer.singleShot(20, lambda: create_page_widgets(end_idx, 20))
-                else:
-                    log_debug(f"Viewer: Carregamento de {page_count} páginas concluído com sucesso.")
-                    # Final visibility check to catch any remaining pages
-                    QTimer.singleShot(100, self.check_visibility)
-                    
-            except Exception as outer_e:
-                log_exception(f"Viewer: Erro crítico no lote {start_idx}: {outer_e}")
-                
-        # Garantir que timers anteriores parem
+        # Documento com camadas: índice de uso por página (toggles invalidam só o necessário)
+        if metadata.get("layers"):
+            RenderEngine.instance().build_layer_index(path)
+
+        # Geometria direto dos metadados: nenhum widget por página, custo independe do total
+        default_w, default_h = self.DEFAULT_PAGE_SIZE_PT
+        new_pages = []
+        for i in range(page_count):
+            page_meta = page_info[i] if i < len(page_info) else {}
+            new_pages.append(PageSlot(
+                str(path), i,
+                page_meta.get("width_pt") or default_w,
+                page_meta.get("height_pt") or default_h
+            ))
+        self._pages.extend(new_pages)
+        self._geometry.extend(new_pages)
+        self._apply_geometry()
+        if self._tool_mode == "selection":
+            RenderEngine.instance().build_word_index(path, page_count)
+        log_debug(f"Viewer: {page_count} páginas de {path.name} adicionadas ({len(self._pages)} no total).")
+
         if self._visibility_timer.isActive():
             self._visibility_timer.stop()
-
-        create_page_widgets(0, initial_batch)
+        QTimer.singleShot(0, self._do_check_visibility)
 
     def check_visibility(self):
-        """Garante que a verificação de visibilidade seja throttled."""
+        """
+        Garante que a verificação de visibilidade seja throttled: no máximo uma passada
+        a cada 100ms, inclusive durante uma rolagem contínua (sem esperar ela parar).
+        """
         #log_debug(f"Viewer: check_visibility chamado. Pages: {len(self._pages)}")
-        self._visibility_timer.start(100)
+        if not self._visibility_timer.isActive():
+            self._visibility_timer.start(100)
 
     def _do_check_visibility(self):
-        """Solicita renderização das páginas que entram no viewport (Execução real)."""
+        """Vincula widgets às páginas da janela visível e solicita seus renders (Execução real)."""
         if not self._pages:
-            #log_debug("Viewer: _do_check_visibility - Sem páginas!")
             return
         
-        #log_debug(f"Viewer: _do_check_visibility - {len(self._pages)} páginas disponíveis")
-        
         scroll_v = self.verticalScrollBar().value()
         viewport_h = self.viewport().height()
         viewport_top = scroll_v
         viewport_bottom = scroll_v + viewport_h
         
-        # Otimização: Achar índice inicial aproximado (Binary Search seria ideal, mas heurística linear local é ok)
-        # O self.get_current_page_index() já faz uma busca.
-        current_idx = self.get_current_page_index()
-        
-        # Margem de segurança (buffer) baseada na complexidade
-        complexity = self._hints.get("complexity", "STANDARD")
-        buffer = 800 if complexity in ("HEAVY", "ULTRA_HEAVY") else 400 
-        
-        # Throttling agressivo para HEAVY: se estiver rodando, pular este ciclo?
-        # Por enquanto, mantemos o logic padrão mas com buffers maiores.
+        # Margem de segurança (buffer) baseada na complexidade, deslocada para
+        # a direção da rolagem; em flings apenas o viewport é pedido
+        use_tiles = self._uses_tiles()
+        buffer = 800 if use_tiles else 400 
+        window_top, window_bottom, prefetch_band = self._prefetcher.plan(viewport_top, viewport_bottom, buffer)
+        window = self._geometry.pages_between(window_top, window_bottom)
+        self._bind_window(window, self._geometry.pages_between(
+            window_top - self.RELEASE_MARGIN_PX, window_bottom + self.RELEASE_MARGIN_PX
+        ))
+
+        window_pages = set() # (documento, página de origem) dentro de viewport + buffer
+        # Distância de cada página ao foco (cursor ou centro): ordena a fila do motor
+        focus = self._render_focus()
+        distances = {}
         
-        for i in range(current_idx, len(self._pages)):
-            page = self._pages[i]
-            pos_y = page.pos().y()
-            page_h = page.height()
-            
-            # Optimization: Early Exit (Downward)
-            if pos_y > viewport_bottom + buffer:
-                break
-                
-            # Se a página está visível (com buffer)
-            if pos_y < viewport_bottom + buffer and pos_y + page_h > viewport_top - buffer:
-                
-                # Inteligência Adaptativa: 
-                clip = None
-                if complexity in ("HEAVY", "ULTRA_HEAVY"):
-                    # Calcular interseção entre viewport e página
-                    y0_v = max(0, viewport_top - pos_y)
-                    y1_v = min(page_h, viewport_bottom - pos_y)
-                    
-                    if self._zoom > 0:
-                        clip = (0, y0_v / self._zoom, page.width() / self._zoom, y1_v / self._zoom)
-                
-                # Prioridade: 10 se estiver no viewport central, 0 se for buffer
-                priority = 10 if (pos_y < viewport_bottom and pos_y + page_h > viewport_top) else 0
-                #log_debug(f"Viewer: Requesting render for page {i} (zoom={self._zoom}, visible)")
-                page.render_page(zoom=self._zoom, mode=self._mode, clip=clip, priority=priority)
-
-        # Optimization: Check backward (Upward) for buffer items
-        for i in range(current_idx - 1, -1, -1):
-            page = self._pages[i]
-            pos_y = page.pos().y()
-            page_h = page.height()
-            
-            # Early Exit (Upward)
-            if pos_y + page_h < viewport_top - buffer:
-                break
-                
-            if pos_y < viewport_bottom + buffer and pos_y + page_h > viewport_top - buffer:
-                page.render_page(zoom=self._zoom, mode=self._mode, priority=0)
+        for i in window:
+            page = self._bound[i]
+            rect = page.geometry()
+            # Prioridade: 10 se estiver no viewport central, 0 se for buffer
+            priority = 10 if (rect.top() < viewport_bottom and rect.bottom() >= viewport_top) else 0
+            page_key = (Path(page.source_path), page.source_index)
+            window_pages.add(page_key)
+            distances[page_key] = self._focus_distance(rect, focus)
+            self._request_page_render(page, use_tiles, window_top, window_bottom, priority)
+
+        # Os workers devem servir o que está na tela: descartar o que ficou para trás
+        # e colocar a página sob o cursor à frente de tudo que ainda está na fila
+        self._cancel_stale_renders(window_pages, use_tiles)
+        RenderEngine.instance().reprioritize(distances)
+        self._prefetch_ahead(prefetch_band, use_tiles, focus)
 
         # Emitir mudança de página se necessário
         current_idx = self.get_current_page_index()
@@ -313,14 +336,164 @@ class PDFViewerWidget(QScrollArea):
                 # Posicionar a navbar no fundo central
                 self._update_nav_pos()
 
+    def _prefetch_ahead(self, band, use_tiles: bool, focus: QPoint):
+        """
+        Pede, com a menor prioridade do motor (origem 'prefetch'), as páginas inteiras da
+        faixa à frente da leitura. Sem faixa (parado, fling, gesto de zoom ou tiles),
+        o prefetch pendente é descartado. As páginas da faixa não têm widget: o resultado
+        só aquece o cache e aparece na hora quando a página entra na janela.
+        """
+        engine = RenderEngine.instance()
+        prefetch_pages = set()
+        distances = {}
+        if band is not None and not use_tiles and not self._zoom_gesture:
+            band_top, band_bottom = band
+            for i in self._geometry.pages_between(band_top, band_bottom):
+                slot = self._pages[i]
+                page_key = (Path(slot.source_path), slot.source_index)
+                prefetch_pages.add(page_key)
+                distances[page_key] = self._focus_distance(self._page_rect(i), focus)
+                engine.request_render(
+                    slot.source_path, slot.source_index, self._zoom, slot.rotation,
+                    lambda *args: None,
+                    mode=self._mode,
+                    layer_config=self._layer_config,
+                    source="prefetch"
+                )
+
+        engine.cancel_stale(prefetch_pages, zooms={self._zoom}, mode=self._mode, source="prefetch")
+        if distances:
+            engine.reprioritize(distances, source="prefetch")
+
+    def _page_rect(self, index: int) -> QRect:
+        """Retângulo da página (índice visual) em coordenadas do container, vinda dos metadados."""
+        return QRect(*self._geometry.rect(index))
+
+    def _columns(self) -> int:
+        return 2 if self._layout_mode == "dual" else 1
+
+    def _apply_geometry(self):
+        """Aplica o índice de geometria (já atualizado) ao container e aos widgets vinculados."""
+        width, height = self._geometry.content_size()
+        self.container.setMinimumSize(width, height)
+        # Redimensiona já (o scroll area só o faria no próximo layout): posições e scroll coerentes
+        self.container.resize(max(width, self.viewport().width()), max(height, self.viewport().height()))
+        self._place_widgets()
+        self.container.update()
+
+    def _on_container_resized(self):
+        """Largura do container mudou: recentraliza as páginas e revê a janela visível."""
+        self._place_widgets()
+        self.check_visibility()
+
+    def _place_widgets(self):
+        """Posiciona os widgets vinculados sobre a geometria atual."""
+        self._geometry.set_width(self.container.width())
+        for index, widget in self._bound.items():
+            widget.move(self._page_rect(index).topLeft())
+
+    def _bind_window(self, window: range, keep: range):
+        """
+        Vincula as páginas que entraram na janela; as que saíram só liberam o widget (e
+        os pixmaps) fora de 'keep', evitando descartar e refazer rasters na borda da janela.
+        """
+        for index in [i for i in self._bound if i not in keep]:
+            self._unbind_page(index)
+        for index in window:
+            if index not in self._bound:
+                self._bind_page(index)
+
+    def _bind_page(self, index: int):
+        slot = self._pages[index]
+        widget = self._spare_widgets.pop() if self._spare_widgets else self._new_page_widget()
+        widget.bind(slot.source_path, slot.source_index, slot.width_pt, slot.height_pt, slot.rotation, self._zoom, self._mode)
+        widget.move(self._page_rect(index).topLeft())
+        widget.show()
+        self._bound[index] = widget
+
+    def _unbind_page(self, index: int):
+        self._release_widget(self._bound.pop(index))
+
+    def _release_widget(self, widget: PageWidget):
+        widget.unbind()
+        if len(self._spare_widgets) < self.SPARE_PAGE_WIDGETS:
+            self._spare_widgets.append(widget)
+        else:
+            widget.deleteLater()
+
+    def _new_page_widget(self) -> PageWidget:
+        widget = PageWidget("", -1, viewer=self, parent=self.container)
+        widget.stackUnder(self.container._overlay)
+        return widget
+
+    def _paint_page_placeholders(self, painter: QPainter, dirty: QRect):
+        """Páginas sem widget (fora da janela) são só geometria: um retângulo de carregamento."""
+        painter.setPen(QColor("#444"))
+        painter.setBrush(QColor("#2D2D2D"))
+        for index in self._geometry.pages_between(dirty.top(), dirty.bottom() + 1):
+            if index not in self._bound:
+                painter.drawRect(self._page_rect(index).adjusted(0, 0, -1, -1))
+
+    def _render_focus(self) -> QPoint:
+        """Ponto de foco em coordenadas do container: o cursor, se estiver sobre o viewport, ou o centro."""
+        offset = QPoint(self.horizontalScrollBar().value(), self.verticalScrollBar().value())
+        cursor = self.viewport().mapFromGlobal(QCursor.pos())
+        if not self.viewport().rect().contains(cursor):
+            cursor = self.viewport().rect().center()
+        return cursor + offset
+
+    @staticmethod
+    def _focus_distance(rect: QRect, focus: QPoint) -> int:
+        """Distância (px) do foco ao retângulo da página; 0 para a página sob o foco."""
+        dx = max(rect.left() - focus.x(), 0, focus.x() - rect.right())
+        dy = max(rect.top() - focus.y(), 0, focus.y() - rect.bottom())
+        return dx + dy
+
+    def _cancel_stale_renders(self, window_pages: set, use_tiles: bool):
+        """Cancela renders do viewer fora da janela visível ou com zoom/modo superados."""
+        if use_tiles:
+            grid = PageWidget.TILE_GRID
+            fine = grid.level_for_zoom(self._zoom)
+            zooms = {grid.level_zoom(fine), grid.level_zoom(grid.coarse_level(fine))}
+        else:
+            zooms = {self._zoom}
+            if self._zoom_gesture:
+                zooms.add(RenderEngine.quantize_zoom(self._zoom))
+        RenderEngine.instance().cancel_stale(window_pages, zooms=zooms, mode=self._mode)
+
+    def _uses_tiles(self) -> bool:
+        """Documentos HEAVY/ULTRA_HEAVY são exibidos via pirâmide de tiles."""
+        return self._hints.get("complexity", "STANDARD") in ("HEAVY", "ULTRA_HEAVY")
+
+    def _request_page_render(self, page: PageWidget, use_tiles: bool, top: int, bottom: int, priority: int, force: bool = False):
+        """
+        Inteligência Adaptativa: documentos HEAVY usam a pirâmide de tiles (apenas a área
+        exposta é rasterizada); os demais renderizam a página inteira.
+        """
+        if not use_tiles:
+            if self._zoom_gesture and not force:
+                page.render_interim(self._zoom, RenderEngine.quantize_zoom(self._zoom), priority)
+                return
+            page.render_page(zoom=self._zoom, mode=self._mode, force=force, priority=priority)
+            return
+
+        # Interseção entre a janela (viewport + buffer) e a página, em coordenadas do widget
+        pos = page.pos()
+        left = self.horizontalScrollBar().value()
+        right = left + self.viewport().width()
+        visible = QRectF(
+            max(0, left - pos.x()),
+            max(0, top - pos.y()),
+            0, 0
+        )
+        visible.setRight(min(page.width(), right - pos.x()))
+        visible.setBottom(min(page.height(), bottom - pos.y()))
+        page.request_tiles(visible, zoom=self._zoom, mode=self._mode, force=force, priority=priority)
+
     def get_current_page_index(self) -> int:
         """Retorna o índice da página mais visível no topo do viewport."""
-        viewport_top = self.verticalScrollBar().value()
-        for i, page in enumerate(self._pages):
-            # Se o fundo da página estiver abaixo do topo do viewport, ela é a atual
-            if page.pos().y() + page.height() > viewport_top + 10:
-                return i
-        return 0
+        # A primeira página cujo fundo está abaixo do topo do viewport é a atual
+        return self._geometry.index_at(self.verticalScrollBar().value() + 10)
 
     def _setup_nav_bar_connections(self):
         self.nav_bar.zoomIn.connect(self.zoom_in)
@@ -356,22 +529,51 @@ class PDFViewerWidget(QScrollArea):
             rel_y = (focus_pos.y() + scroll_y) / old_zoom
             
             self._zoom = new_zoom
-            for page in self._pages:
-                page.update_layout_size(self._zoom)
-            
-            # Forçar atualização de layout do container para que o scrollArea saiba o novo tamanho
-            self.container.adjustSize()
+            self._apply_zoom_layout()
             
             # Recalcular scroll para manter o ponto rel_x, rel_y sob o focus_pos
             self.horizontalScrollBar().setValue(int(rel_x * self._zoom - focus_pos.x()))
             self.verticalScrollBar().setValue(int(rel_y * self._zoom - focus_pos.y()))
         else:
             self._zoom = new_zoom
-            for page in self._pages:
-                page.update_layout_size(self._zoom)
+            self._apply_zoom_layout()
+
+        # Tiles já são quantizados por oitava; no modo página inteira, adiar o render exato
+        if not self._uses_tiles():
+            self._zoom_gesture = True
+            self._zoom_settle_timer.start(self.ZOOM_SETTLE_MS)
                 
         self.check_visibility()
 
+    def _apply_zoom_layout(self):
+        """Novo zoom: geometria recalculada e só os widgets vinculados redimensionados."""
+        for page in self._bound.values():
+            page.update_layout_size(self._zoom)
+        self._geometry.set_zoom(self._zoom)
+        self._apply_geometry()
+
+    def _queue_zoom(self, factor: float, focus_pos):
+        """Gesto (Ctrl+roda): acumula os passos e aplica o zoom resultante uma vez por quadro."""
+        target = (self._pending_zoom[0] if self._pending_zoom else self._zoom) * factor
+        self._pending_zoom = (target, QPointF(focus_pos))
+        if not self._zoom_frame_timer.isActive():
+            self._zoom_frame_timer.start(self.ZOOM_FRAME_MS)
+
+    def _apply_pending_zoom(self):
+        if self._pending_zoom is None:
+            return
+        zoom, focus_pos = self._pending_zoom
+        self._pending_zoom = None
+        self.set_zoom(zoom, focus_pos=focus_pos)
+
+    def _on_zoom_settled(self):
+        """Gesto de zoom terminou: solicitar o render exato das páginas visíveis."""
+        self._zoom_gesture = False
+        # Prévias escaladas às pressas durante o gesto são repintadas com suavização
+        for page in self._bound.values():
+            page.update()
+        self._do_check_visibility()
+
     def zoom_in(self): self.set_zoom(self._zoom * 1.2)
     def zoom_out(self): self.set_zoom(self._zoom / 1.2)
     def reset_zoom(self): self.set_zoom(1.0)
@@ -387,37 +589,22 @@ class PDFViewerWidget(QScrollArea):
     def fit_width(self):
         """Ajusta o zoom para que a página ocupe toda a largura disponível."""
         if not self._pages: return
-        idx = self.get_current_page_index()
-        # Usar dimensões da página atual ou da primeira como fallback
-        if idx < len(self._page_sizes):
-            orig_w = self._page_sizes[idx].get("width_pt", 595.0)
-        else:
-            orig_w = 595.0
-            
+        # Dimensões da página atual (metadados ou o tamanho padrão)
+        orig_w = self._pages[self.get_current_page_index()].width_pt
         available_w = self.viewport().width() - 100
         self.set_zoom(available_w / orig_w)
 
     def fit_page(self):
         """Ajusta o zoom para que a página caiba inteira no viewport vertical."""
         if not self._pages: return
-        idx = self.get_current_page_index()
-        if idx < len(self._page_sizes):
-            orig_h = self._page_sizes[idx].get("height_pt", 842.0)
-        else:
-            orig_h = 842.0
-            
+        orig_h = self._pages[self.get_current_page_index()].height_pt
         available_h = self.viewport().height() - 100
         self.set_zoom(available_h / orig_h)
 
     def fit_height(self):
         """Ajusta o zoom para que a altura da página ocupe todo o viewport."""
         if not self._pages: return
-        idx = self.get_current_page_index()
-        if idx < len(self._page_sizes):
-            orig_h = self._page_sizes[idx].get("height_pt", 842.0)
-        else:
-            orig_h = 842.0
-        
+        orig_h = self._pages[self.get_current_page_index()].height_pt
         available_h = self.viewport().height() - 40
         self.set_zoom(available_h / orig_h)
 
@@ -470,7 +657,15 @@ class PDFViewerWidget(QScrollArea):
     def refresh_page(self, visual_idx: int, rotation: int = 0):
         """Força a renderização de uma página específica pela sua posição atual."""
         if 0 <= visual_idx < len(self._pages):
-            self._pages[visual_idx].render_page(zoom=self._zoom, rotation=rotation, mode=self._mode)
+            slot = self._pages[visual_idx]
+            rotated = slot.rotation != rotation
+            slot.rotation = rotation
+            page = self._bound.get(visual_idx)
+            if page is not None:
+                page.render_page(zoom=self._zoom, rotation=rotation, mode=self._mode)
+            if rotated:
+                self._geometry.update_page(visual_idx, slot)
+                self._apply_geometry()
 
     def set_reading_mode(self, mode: str):
         """Redetalha todas as páginas com o novo filtro de cor."""
@@ -483,11 +678,18 @@ class PDFViewerWidget(QScrollArea):
             "default": "#1e1e1e",
             "dark": "#0B0F19",
             "sepia": "#F4ECD8",
+            "high_contrast": "#000000",
             "night": "#050505"
         }
         self.container.setStyleSheet(f"background-color: {bg_colors.get(mode, '#1e1e1e')};")
         
-        for page in self._pages:
+        if self._uses_tiles():
+            # Tiles são trocados sob demanda: apenas a área visível é re-rasterizada
+            self._do_check_visibility()
+            return
+
+        # Páginas sem widget recebem o modo ao entrar na janela
+        for page in self._bound.values():
             page.render_page(mode=self._mode)
 
     def set_layout_mode(self, mode: str):
@@ -496,81 +698,60 @@ class PDFViewerWidget(QScrollArea):
         self._layout_mode = mode
         log_debug(f"Viewer: Alterando layout para {mode}")
         
-        # Desconectar para evitar loops durante re-layout
-        try:
-            self.verticalScrollBar().valueChanged.disconnect(self.check_visibility)
-        except Exception:
-            pass
-        
-        if mode == "dual":
-            # Grid layout com 2 colunas
-            from PyQt6.QtWidgets import QGridLayout
-            new_layout = QGridLayout(self.container)
-            new_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            new_layout.setSpacing(30)
-            new_layout.setContentsMargins(40, 40, 40, 40)
-            
-            for i, page in enumerate(self._pages):
-                new_layout.addWidget(page, i // 2, i % 2)
-        else:
-            # Vertical layout padrão
-            new_layout = QVBoxLayout(self.container)
-            new_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            new_layout.setSpacing(30)
-            new_layout.setContentsMargins(40, 40, 40, 40)
-            
-            for page in self._pages:
-                new_layout.addWidget(page)
-
-        # Trocar o layout antigo pelo novo
-        old_layout = self.layout
-        self.layout = new_layout
-        
-        # No PyQt6, para trocar o layout, precisamos deletar o antigo
-        import sip
-        if old_layout:
-            sip.delete(old_layout)
-        
-        self.container.setLayout(new_layout)
-        self.verticalScrollBar().valueChanged.connect(self.check_visibility)
+        self._geometry.set_columns(self._columns())
+        self._apply_geometry()
         self.check_visibility()
 
     def reorder_pages(self, new_order: list[int]):
-        """Reordena os widgets de página conforme a nova ordem de índices originais."""
-        if not self._pages or len(new_order) != len(self._pages):
-            return
-            
-        # 1. Mapear os widgets atuais para a nova ordem
-        # new_order contém a sequência de índices da lista self._pages que devem vir agora
-        reordered_pages = [self._pages[i] for i in new_order]
-        
-        # 2. Desabilitar updates do container para evitar flickering
-        self.container.setUpdatesEnabled(False)
-        
-        # 3. Remover todos os widgets do layout (sem deletá-los da memória)
-        # Em layouts do Qt, remover o item do layout não deleta o widget
-        while self.layout.count():
-            self.layout.takeAt(0)
-        
-        # 4. Atualizar a lista interna e readicionar ao layout
-        self._pages = reordered_pages
-        
-        if self._layout_mode == "dual":
-            for i, page in enumerate(self._pages):
-                self.layout.addWidget(page, i // 2, i % 2)
-        else:
-            for page in self._pages:
-                self.layout.addWidget(page)
-            
-        self.container.setUpdatesEnabled(True)
+        """
+        Reordena as páginas conforme a nova ordem (índices da lista atual de páginas).
+        Só o índice de geometria é permutado; os widgets vinculados acompanham suas páginas.
+        """
+        if not self._pages: return
+
+        new_position = {old: new for new, old in enumerate(new_order)}
+        self._pages = [self._pages[i] for i in new_order]
+
+        bound = self._bound
+        self._bound = {new_position[old]: page for old, page in bound.items() if old in new_position}
+        for old, page in bound.items():
+            if old not in new_position:
+                self._release_widget(page)
+
+        self._geometry.reorder(new_order)
+        self._apply_geometry()
         # Forçar recalculo de visibilidade e renderização das páginas no novo local
         self.check_visibility()
 
     selectionChanged = pyqtSignal(tuple) # (x0, y0, x1, y1) em pontos PDF
 
-    def refresh_current_view(self):
-        """Força a renderização das páginas no viewport (usado após mudar visibilidade de layers)."""
-        for page in self._pages:
+    def refresh_current_view(self, layer_ids=None):
+        """
+        Força a renderização das páginas no viewport (usado após mudar visibilidade de layers).
+        Com 'layer_ids', só as páginas que usam essas camadas segundo o índice do motor.
+        """
+        # Só as páginas com widget são redesenhadas; as demais pedem o render (com a nova
+        # configuração na chave do cache) quando entrarem na janela visível
+        pages = list(self._bound.values())
+        if layer_ids is not None:
+            engine = RenderEngine.instance()
+            affected = {}
+            for page in pages:
+                if page.source_path not in affected:
+                    affected[page.source_path] = engine.pages_using_layers(page.source_path, layer_ids)
+            pages = [
+                page for page in pages
+                if affected[page.source_path] is None or page.source_index in affected[page.source_path]
+            ]
+            log_debug(f"Viewer: Camadas {sorted(layer_ids)} alteradas -> {len(pages)}/{len(self._bound)} página(s) visível(is) a redesenhar.")
+
+        if self._uses_tiles():
+            for page in pages:
+                page.invalidate_tiles()
+            self._do_check_visibility()
+            return
+
+        for page in pages:
             page.render_page(zoom=self._zoom, mode=self._mode, force=True)
 
     def set_tool_mode(self, mode: str):
@@ -586,6 +767,7 @@ class PDFViewerWidget(QScrollArea):
         if mode == "selection":
             self.setCursor(Qt.CursorShape.IBeamCursor)
             self.statusMessageRequested.emit("Modo Seleção Ativo: Selecione texto para copiar.", 3000)
+            self._build_word_indexes()
         elif mode == "zoom_area":
             self.setCursor(Qt.CursorShape.CrossCursor)
             self.statusMessageRequested.emit("Modo Zoom: Selecione uma área para ampliar.", 3000)
@@ -596,6 +778,16 @@ class PDFViewerWidget(QScrollArea):
         self._clear_selection()
 
 
+    def _build_word_indexes(self):
+        """Palavras dos documentos exibidos extraídas em segundo plano (páginas visíveis primeiro)."""
+        page_counts = {}
+        for slot in self._pages:
+            page_counts[slot.source_path] = max(page_counts.get(slot.source_path, 0), slot.source_index + 1)
+        engine = RenderEngine.instance()
+        for path, page_count in page_counts.items():
+            visible = [self._pages[i].source_index for i in sorted(self._bound) if self._pages[i].source_path == path]
+            engine.build_word_index(path, page_count, visible)
+
     def set_highlight_color(self, color: str):
         """Sets the highlight color for annotations."""
         self._highlight_color = color
@@ -635,6 +827,7 @@ class PDFViewerWidget(QScrollArea):
         elif self._tool_mode == "selection":
             self._selecting = True
             self._selection_start = container_pos
+            self._selection_pos = None
             self._selected_word_rects = []
             self._selection_modifier = event.modifiers()
             
@@ -732,11 +925,10 @@ class PDFViewerWidget(QScrollArea):
              for page_idx, rects in self._temporary_highlights.items():
                  # We need to map page_idx to current page widgets to draw correct positions
                  if 0 <= page_idx < len(self._pages):
-                     page = self._pages[page_idx]
                      # Check if page is visible (optimization)
-                     if page.isVisible():
+                     if page_idx in self._bound:
                          # Translate PDF rects to Paint coordinates relative to Container
-                         page_pos = page.pos()
+                         page_pos = self._page_rect(page_idx).topLeft()
                          for r in rects:
                              # r is (x0, y0, x1, y1) in PDF points
                              rx = int(r[0] * self._zoom + page_pos.x())
@@ -800,22 +992,24 @@ class PDFViewerWidget(QScrollArea):
             return
             
         try:
-            from src.infrastructure.adapters.pymupdf_adapter import PyMuPDFAdapter
+            engine = RenderEngine.instance()
             all_text_fragments = []
             
-            # Group by page to minimize adapter calls
+            # Group by page (one word lookup per page)
             selection_by_page = {}
             for (p_idx, w_idx), rect in self._persistent_selection.items():
                 if p_idx not in selection_by_page: selection_by_page[p_idx] = []
                 selection_by_page[p_idx].append(w_idx)
             
             for p_idx in sorted(selection_by_page.keys()):
-                page_widget = self._pages[p_idx]
-                words = PyMuPDFAdapter.get_text(str(page_widget.source_path), page_widget.source_index, "words")
+                slot = self._pages[p_idx]
+                words = engine.page_words(slot.source_path, slot.source_index)
+                if words is None:
+                    continue
                 
                 # Sort indices for this page to maintain reading order
                 indices = sorted(selection_by_page[p_idx])
-                all_text_fragments.extend([words[i][4] for i in indices])
+                all_text_fragments.extend([words.texts[i] for i in indices])
             
             if all_text_fragments:
                 self._selected_text = " ".join(all_text_fragments)
@@ -955,6 +1149,7 @@ class PDFViewerWidget(QScrollArea):
         try:
             self._selected_word_rects = []
             self._current_drag_ids = [] # (page_idx, word_idx)
+            self._selection_pos = current_pos # Re-run when a pending page's words arrive
             
             if not self._visible_pages_words:
                 return
@@ -977,24 +1172,16 @@ class PDFViewerWidget(QScrollArea):
                 sel_x1 = (self._current_selection_rect.right() - page_pos.x()) / self._zoom
                 sel_y1 = (self._current_selection_rect.bottom() - page_pos.y()) / self._zoom
 
-                for i, word_data in enumerate(words):
-                    x0, y0, x1, y1 = word_data[:4]
-                    
-                    is_selected = False
-                    if self._selection_is_crossing:
-                        is_selected = not (x1 < sel_x0 or x0 > sel_x1 or y1 < sel_y0 or y0 > sel_y1)
-                    else:
-                        is_selected = (x0 >= sel_x0 and x1 <= sel_x1 and y0 >= sel_y0 and y1 <= sel_y1)
+                # Spatial index + vectorized test: only words near the rect are checked
+                for i, (x0, y0, x1, y1) in words.hit(sel_x0, sel_y0, sel_x1, sel_y1, self._selection_is_crossing):
+                    rect_x = int(x0 * self._zoom + page_pos.x())
+                    rect_y = int(y0 * self._zoom + page_pos.y())
+                    rect_w = int((x1 - x0) * self._zoom)
+                    rect_h = int((y1 - y0) * self._zoom)
                     
-                    if is_selected:
-                        rect_x = int(x0 * self._zoom + page_pos.x())
-                        rect_y = int(y0 * self._zoom + page_pos.y())
-                        rect_w = int((x1 - x0) * self._zoom)
-                        rect_h = int((y1 - y0) * self._zoom)
-                        
-                        self._selected_word_rects.append((rect_x, rect_y, rect_w, rect_h))
-                        self._current_drag_ids.append((page_idx, i, (rect_x, rect_y, rect_w, rect_h), (x0, y0, x1, y1)))
-                        total_words_selected += 1
+                    self._selected_word_rects.append((rect_x, rect_y, rect_w, rect_h))
+                    self._current_drag_ids.append((page_idx, i, (rect_x, rect_y, rect_w, rect_h), (x0, y0, x1, y1)))
+                    total_words_selected += 1
                     
             mode_text = "Crossing (L->R)" if self._selection_is_crossing else "Window (R->L)"
             mod_text = " [+]" if self._selection_modifier & Qt.KeyboardModifier.ShiftModifier else \
@@ -1028,10 +1215,9 @@ class PDFViewerWidget(QScrollArea):
         self._current_selection_rect = None
 
     def _cache_visible_pages_words(self):
-        """Identifies ALL pages intersecting viewport and caches words."""
+        """Identifies ALL pages intersecting viewport and caches their words (from the engine's word store)."""
         try:
-            from src.infrastructure.adapters.pymupdf_adapter import PyMuPDFAdapter
-            
+            engine = RenderEngine.instance()
             self._visible_pages_words = []
             
             # Simple heuristic: Identify pages effectively visible + buffer
@@ -1043,26 +1229,37 @@ class PDFViewerWidget(QScrollArea):
             top_y = scroll_v - 100
             bottom_y = scroll_v + view_h + 100
             
-            for i, page in enumerate(self._pages):
-                # Check vertical intersection first (optimization)
-                py = page.pos().y()
-                ph = page.height()
-                
-                if py + ph > top_y and py < bottom_y:
-                    # It's visible (or close to)
-                    words = PyMuPDFAdapter.get_text(str(page.source_path), page.source_index, "words")
-                    if words:
-                        self._visible_pages_words.append({
-                            "words": words,
-                            "page_pos": page.pos(), # Container pos
-                            "page_index": i
-                        })
+            for i in self._geometry.pages_between(top_y, bottom_y):
+                page = self._pages[i]
+                # Never blocks: with every handle busy the words arrive later via the callback
+                words = engine.page_words(page.source_path, page.source_index,
+                                          on_ready=lambda words, i=i: self._on_page_words_ready(i, words))
+                if words:
+                    self._add_selection_page(i, words)
             
             log_debug(f"Cached words for {len(self._visible_pages_words)} visible pages")
             
         except Exception as e:
             log_error(f"Failed to cache words: {e}")
 
+    def _add_selection_page(self, index: int, words):
+        self._visible_pages_words.append({
+            "words": words,
+            "page_pos": self._page_rect(index).topLeft(), # Container pos
+            "page_index": index
+        })
+
+    def _on_page_words_ready(self, index: int, words):
+        """Words of a page that was still pending when the drag started."""
+        if not self._selecting or self._tool_mode != "selection" or not words:
+            return
+        if any(page["page_index"] == index for page in self._visible_pages_words):
+            return
+        self._add_selection_page(index, words)
+        if self._selection_pos is not None: # Drag already moved: refresh it with the new page
+            self._update_selection_rects(self._selection_pos)
+            self.container._overlay.update()
+
 
 
 
@@ -1072,34 +1269,14 @@ class PDFViewerWidget(QScrollArea):
 
         if event.modifiers() == Qt.KeyboardModifier.ControlModifier:
             factor = 1.2 if event.angleDelta().y() > 0 else 1.0 / 1.2
-            self.set_zoom(self._zoom * factor, focus_pos=event.position())
+            self._queue_zoom(factor, event.position())
             event.accept()
         else:
             super().wheelEvent(event)
 
-    def reorder_pages(self, new_order_of_current_widgets: list[int]):
-        """Reordena os widgets físicos baseando-se na nova ordem desejada."""
-        if not self._pages: return
-        
-        # Importante: new_order_of_current_widgets contém os índices da lista self._pages
-        current_pages = list(self._pages)
-        
-        for i in reversed(range(self.layout.count())):
-            item = self.layout.takeAt(i)
-            if item.widget(): item.widget().setParent(None)
-        
-        self._pages = []
-        for idx in new_order_of_current_widgets:
-            widget = current_pages[idx]
-            self.layout.addWidget(widget)
-            self._pages.append(widget)
-        
-        self.check_visibility()
-
     def scroll_to_page(self, visual_index: int, highlights: list = None):
         if 0 <= visual_index < len(self._pages):
-            self.container.adjustSize()
-            y = self._pages[visual_index].pos().y()
+            y = self._page_rect(visual_index).y()
             # Garante que o scrollbar reconhece o limite antes de pular (Crucial para testes headless)
             self.verticalScrollBar().setRange(0, self.container.height())
             self.verticalScrollBar().setValue(y)
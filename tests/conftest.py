@@ -2,6 +2,7 @@ import pytest
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 from src.domain.entities.pdf import PDFDocument
+from src.infrastructure.repositories.raster_cache_repository import RasterCacheRepository
 
 @pytest.fixture
 def mock_settings():
@@ -44,6 +45,13 @@ def mock_ai_provider():
     )
     return provider
 
+@pytest.fixture(autouse=True)
+def isolated_raster_cache(tmp_path_factory, monkeypatch):
+    """Cache em disco do RenderEngine num diretório temporário por teste (nunca em ~/.fotonPDF)."""
+    cache_dir = tmp_path_factory.mktemp("raster_cache")
+    monkeypatch.setenv(RasterCacheRepository.STORAGE_DIR_ENV, str(cache_dir))
+    return cache_dir
+
 @pytest.fixture(autouse=True)
 def qt_teardown():
     """
@@ -128,6 +128,116 @@ class TestLightTableHiRes:
         lt._quality_timer.start.assert_called()
 
 
+# ============================================================================
+# Testes da Superfície Virtualizada do Viewer
+# ============================================================================
+
+class TestViewerVirtualization:
+    """Só as páginas perto da janela visível têm widget (e raster) no viewer."""
+
+    @pytest.fixture
+    def viewer(self, qtbot, mock_render_engine):
+        from src.interfaces.gui.widgets.viewer_widget import PDFViewerWidget
+
+        mock_render_engine.cached_nearest.return_value = None
+        with patch('src.interfaces.gui.widgets.viewer_widget.RenderEngine') as mock_vw:
+            mock_vw.instance.return_value = mock_render_engine
+            viewer = PDFViewerWidget()
+            qtbot.addWidget(viewer)
+            viewer.resize(800, 600)
+            viewer.show()
+            metadata = {"page_count": 500, "pages": [{"width_pt": 595, "height_pt": 842}] * 500}
+            viewer.load_document(Path("dummy.pdf"), metadata)
+            viewer._do_check_visibility()
+            yield viewer
+
+    def test_only_the_visible_window_gets_page_widgets(self, viewer):
+        from src.interfaces.gui.widgets.page_widget import PageWidget
+
+        assert len(viewer._pages) == 500
+        assert 0 < len(viewer.container.findChildren(PageWidget)) <= 6
+
+        viewer.scroll_to_page(250)
+        viewer._do_check_visibility()
+        assert viewer.get_current_page_index() == 250
+        assert viewer._bound[250].source_index == 250
+        assert len(viewer.container.findChildren(PageWidget)) <= 6
+
+    def test_buffer_behind_is_requested_once_scrolling_settles(self, viewer, qtbot, mock_render_engine):
+        def window():
+            # Janela da última passada: o que o viewer mandou manter no motor
+            viewer_calls = [c for c in mock_render_engine.cancel_stale.call_args_list if "source" not in c.kwargs]
+            return {page for _, page in viewer_calls[-1].args[0]}
+
+        # Lendo para baixo: a janela começa no topo do viewport (nada atrás)
+        bar = viewer.verticalScrollBar()
+        for value in range(20000, 21000, 50):
+            bar.setValue(value)
+            qtbot.wait(10)
+        viewer._do_check_visibility()
+        reading = window()
+
+        # Sem novas amostras a passada de assentamento inclui o buffer atrás
+        qtbot.waitUntil(lambda: min(window()) < min(reading), timeout=2000)
+
+    def test_far_pages_release_pixmaps_with_hysteresis(self, viewer):
+        page = viewer._bound[1]
+        page.on_render_finished(1, QPixmap(595, 842), 1.0, 0, "default", None)
+        assert page._base_pixmap is not None
+
+        # Logo além da janela o raster é mantido (sem descartar/refazer na borda)
+        viewer.verticalScrollBar().setValue(2600)
+        viewer._do_check_visibility()
+        assert viewer._bound.get(1) is page and page._base_pixmap is not None
+
+        # Longe da janela: widget volta ao pool sem nenhum pixmap
+        viewer.scroll_to_page(100)
+        viewer._do_check_visibility()
+        assert 1 not in viewer._bound
+        assert page._base_pixmap is None and page.pixmap().isNull()
+
+    def test_wheel_steps_coalesce_and_exact_render_waits_for_idle(self, viewer, mock_render_engine):
+        from PyQt6.QtCore import QPointF
+
+        def exact_requests():
+            zooms = [c[0][2] for c in mock_render_engine.request_render.call_args_list]
+            return [z for z in zooms if isinstance(z, float) and abs(z - viewer._zoom) < 1e-3]
+
+        for _ in range(3):
+            viewer._queue_zoom(1.2, QPointF(100, 100))
+        assert viewer._zoom == 1.0  # Nada é aplicado antes do próximo quadro
+
+        mock_render_engine.request_render.reset_mock()
+        viewer._apply_pending_zoom()
+        assert abs(viewer._zoom - 1.2 ** 3) < 1e-9 and viewer._zoom_gesture
+        viewer._do_check_visibility()
+        assert not exact_requests()
+
+        viewer._on_zoom_settled()
+        assert not viewer._zoom_gesture and exact_requests()
+
+    def test_selection_does_not_wait_for_pending_page_words(self, viewer, mock_render_engine):
+        from PyQt6.QtCore import QPoint
+        from src.interfaces.gui.state.word_store import PageWords
+
+        pending = {}
+        def page_words(path, page, on_ready=None):
+            pending[page] = on_ready
+            return None  # Pool ocupado: palavras chegam depois
+        mock_render_engine.page_words.side_effect = page_words
+
+        viewer.set_tool_mode("selection")
+        origin = viewer._page_rect(0).topLeft()
+        viewer._selecting = True
+        viewer._selection_start = origin + QPoint(40, 40)
+        viewer._cache_visible_pages_words()
+        viewer._update_selection_rects(origin + QPoint(120, 70))
+        assert 0 in pending and viewer._selected_word_rects == []
+
+        pending[0](PageWords([(50, 50, 100, 60, "alfa", 0, 0, 0), (300, 300, 340, 310, "beta", 0, 0, 1)]))
+        assert [drag[:2] for drag in viewer._current_drag_ids] == [(0, 0)]
+
+
 # ============================================================================
 # Testes de Seleção de Texto
 # ============================================================================
@@ -97,3 +97,150 @@ def test_pymupdf_adapter_export_markdown(tmp_path):
     content = result.read_text(encoding="utf-8")
     assert "# Página 1" in content
     assert "Markdown Test Content" in content
+
+def test_pymupdf_adapter_render_reuses_display_list(tmp_path):
+    pdf_path = tmp_path / "layers.pdf"
+    doc = fitz.open()
+    page = doc.new_page()
+    ocg = doc.add_ocg("Red")
+    page.draw_rect(fitz.Rect(50, 50, 200, 200), color=(1, 0, 0), fill=(1, 0, 0), oc=ocg)
+    doc.save(str(pdf_path))
+    doc.close()
+
+    adapter = PyMuPDFAdapter()
+    handle = fitz.open(str(pdf_path))
+
+    # Zooms, clips e rotações diferentes saem da mesma DisplayList, idênticos ao render direto
+    for zoom, rotation, clip in [(1.0, 0, None), (2.5, 90, None), (2.0, 0, (40, 40, 120, 120))]:
+        samples, *_ = adapter.render_page(None, 0, zoom, rotation, clip=clip, doc_handle=handle)
+        assert samples == adapter.render_page(pdf_path, 0, zoom, rotation, clip=clip)[0]
+    assert len(adapter._display_lists) == 1
+
+    # Mudança de camadas invalida a lista do handle
+    visible, *_ = adapter.render_page(None, 0, 1.0, 0, doc_handle=handle)
+    adapter.apply_layer_config_to_handle(handle, {ocg: False})
+    hidden, *_ = adapter.render_page(None, 0, 1.0, 0, doc_handle=handle)
+    assert hidden != visible
+
+    handle.close()
+
+def test_pymupdf_adapter_display_list_cost_counts_xobjects(tmp_path):
+    # Prancha "CAD": a página só executa um formulário que contém o desenho inteiro
+    source = fitz.open()
+    drawing = source.new_page()
+    for i in range(400):
+        drawing.draw_line(fitz.Point(10, i), fitz.Point(500, i + 300))
+    pdf_path = tmp_path / "form.pdf"
+    doc = fitz.open()
+    for _ in range(3):
+        doc.new_page().show_pdf_page(fitz.Rect(0, 0, 595, 842), source, 0)
+    doc.save(str(pdf_path))
+    doc.close()
+
+    adapter = PyMuPDFAdapter()
+    handle = fitz.open(str(pdf_path))
+    page = handle[0]
+    assert adapter._display_list_cost(handle, page) > 10 * len(page.read_contents())
+
+    # Teto de entradas e descarte das listas do handle fechado pelo pool
+    adapter.DISPLAY_LIST_MAX_ENTRIES = 2
+    for index in range(3):
+        adapter.render_page(None, index, 1.0, 0, doc_handle=handle)
+    assert [k[1] for k in adapter._display_lists] == [1, 2]
+    adapter.discard_display_lists(handle)
+    assert not adapter._display_lists and adapter._display_list_bytes == 0
+    handle.close()
+
+def test_pymupdf_adapter_layer_config_applies_only_changes(tmp_path):
+    pdf_path = tmp_path / "many_layers.pdf"
+    doc = fitz.open()
+    page = doc.new_page()
+    ocgs = [doc.add_ocg(f"L{i}") for i in range(40)]
+    for i, ocg in enumerate(ocgs):
+        page.draw_rect(fitz.Rect(10 + i * 10, 10, 18 + i * 10, 60), color=(0, 0, 1), fill=(0, 0, 1), oc=ocg)
+    doc.save(str(pdf_path))
+    doc.close()
+
+    adapter = PyMuPDFAdapter()
+    handle = fitz.open(str(pdf_path))
+    calls = []
+    original = handle.set_layer_ui_config
+    handle.set_layer_ui_config = lambda number, action=0: (calls.append((number, action)), original(number, action))
+
+    # Estado padrão (tudo visível): nada a aplicar, DisplayLists preservadas
+    config = {ocg: True for ocg in ocgs}
+    adapter.apply_layer_config_to_handle(handle, config)
+    assert calls == [] and getattr(handle, "_layer_version", 0) == 0
+    visible, *_ = adapter.render_page(None, 0, 1.0, 0, doc_handle=handle)
+
+    # Um toggle = uma chamada; repetir a mesma config (cada tile/render) não custa nada
+    config[ocgs[5]] = False
+    for _ in range(3):
+        adapter.apply_layer_config_to_handle(handle, config)
+    assert len(calls) == 1 and handle._layer_version == 1
+    hidden, *_ = adapter.render_page(None, 0, 1.0, 0, doc_handle=handle)
+    assert hidden != visible
+
+    # Reativar volta exatamente ao render original
+    config[ocgs[5]] = True
+    adapter.apply_layer_config_to_handle(handle, config)
+    assert adapter.render_page(None, 0, 1.0, 0, doc_handle=handle)[0] == visible
+
+    handle.close()
+
+def test_pymupdf_adapter_page_layer_usage(tmp_path):
+    pdf_path = tmp_path / "usage.pdf"
+    doc = fitz.open()
+    for _ in range(4):
+        doc.new_page()
+    a, b, c = doc.add_ocg("A"), doc.add_ocg("B"), doc.add_ocg("C")
+    doc[0].draw_rect(fitz.Rect(10, 10, 50, 50), fill=(1, 0, 0), oc=a)
+    # OCMD: a página depende de todos os OCGs membros
+    doc[1].draw_rect(fitz.Rect(10, 10, 50, 50), fill=(1, 0, 0), oc=doc.set_ocmd(ocgs=[b, c], policy="AnyOn"))
+    # XObject de imagem com /OC
+    doc[2].insert_image(fitz.Rect(0, 0, 20, 20), pixmap=fitz.Pixmap(fitz.csRGB, (0, 0, 10, 10), False), oc=c)
+    doc.save(str(pdf_path))
+    doc.close()
+
+    usage = PyMuPDFAdapter().get_page_layer_usage(pdf_path)
+    assert usage == {0: {a}, 1: {b, c}, 2: {c}, 3: frozenset()}
+
+def test_pymupdf_adapter_page_layer_usage_direct_dicts(tmp_path):
+    pdf_path = tmp_path / "usage_direct.pdf"
+    doc = fitz.open()
+    for _ in range(3):
+        doc.new_page().insert_text((50, 50), "x")
+    a, b, c = doc.add_ocg("A"), doc.add_ocg("B"), doc.add_ocg("C")
+
+    def mark(page, tag, properties=None):
+        if properties:
+            resources = int(doc.xref_get_key(page.xref, "Resources")[1].split()[0])
+            doc.xref_set_key(resources, "Properties", properties)
+        contents = page.get_contents()[0]
+        doc.update_stream(contents, doc.xref_stream(contents) + f"\n/OC /{tag} BDC 0 0 m 9 9 l S EMC\n".encode())
+
+    # OCMD direto em /Properties
+    mark(doc[0], "MC0", f"<</MC0<</Type/OCMD/OCGs[{a} 0 R {b} 0 R]>>>>")
+    # /OC direto na anotação
+    annot = doc[1].add_rect_annot(fitz.Rect(10, 10, 40, 40))
+    doc.xref_set_key(annot.xref, "OC", f"<</Type/OCMD/OCGs[{c} 0 R]>>")
+    # Propriedade citada que não existe: página depende de todas as camadas
+    mark(doc[2], "Missing")
+    doc.save(str(pdf_path))
+    doc.close()
+
+    usage = PyMuPDFAdapter().get_page_layer_usage(pdf_path)
+    assert usage == {0: {a, b}, 1: {c}, 2: {a, b, c}}
+
+def test_pymupdf_adapter_page_words(tmp_path):
+    pdf_path = tmp_path / "words.pdf"
+    doc = fitz.open()
+    for text in ("alfa beta", "gama"):
+        doc.new_page().insert_text((72, 72), text)
+    doc.save(str(pdf_path))
+    doc.close()
+
+    words = PyMuPDFAdapter().get_page_words(pdf_path, [1, 0, 7])
+    assert sorted(words) == [0, 1] # Página inexistente ignorada
+    assert [w[4] for w in words[0]] == ["alfa", "beta"]
+    assert words[1][0][4] == "gama" and words[1][0][0] >= 72
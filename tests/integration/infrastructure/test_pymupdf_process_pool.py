@@ -0,0 +1,73 @@
+import fitz
+import pytest
+from multiprocessing import shared_memory
+from src.infrastructure.adapters import pymupdf_process_pool as process_pool
+from src.infrastructure.adapters.pymupdf_process_pool import PyMuPDFProcessPool, SharedRaster
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    path = tmp_path / "raster.pdf"
+    doc = fitz.open()
+    for page in range(2):
+        doc.new_page().insert_text((72, 72), f"pagina {page}")
+    doc.save(str(path))
+    doc.close()
+    return path
+
+
+@pytest.fixture
+def in_process_worker():
+    """Executa o lado do worker neste processo (mesmo código, sem spawn)."""
+    process_pool._worker_init()
+    yield process_pool
+    for shm, _ in process_pool._worker_segments.values():
+        shm.close()
+        shm.unlink()
+    process_pool._worker_segments.clear()
+    for _, doc in process_pool._worker_docs.values():
+        doc.close()
+    process_pool._worker_docs.clear()
+
+
+def _expected_samples(pdf_path, page, zoom):
+    with fitz.open(str(pdf_path)) as doc:
+        return doc[page].get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False).samples
+
+
+def test_worker_keeps_segment_until_gui_attaches(in_process_worker, pdf_path):
+    result = in_process_worker._worker_render(str(pdf_path), 0, 1.0, 0, None, None, 5120)
+    name = result[0]
+
+    # Sem confirmação o worker mantém o handle (no Windows o segmento sumiria com ele)
+    in_process_worker._worker_sweep()
+    assert name in in_process_worker._worker_segments
+
+    raster = SharedRaster(*result)  # Attach depois que o worker "retornou"
+    in_process_worker._worker_sweep()
+    assert name not in in_process_worker._worker_segments
+    assert bytes(raster.buffer) == _expected_samples(pdf_path, 0, 1.0)
+    raster.release()
+
+
+def test_unclaimed_segment_expires(in_process_worker, pdf_path, monkeypatch):
+    name = in_process_worker._worker_render(str(pdf_path), 1, 1.0, 0, None, None, 5120)[0]
+    monkeypatch.setattr(in_process_worker, "_UNCLAIMED_TTL_S", 0.0)
+    in_process_worker._worker_sweep()
+
+    assert name not in in_process_worker._worker_segments
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
+
+
+def test_process_pool_rasters_survive_later_renders(pdf_path):
+    pool = PyMuPDFProcessPool(workers=1)
+    try:
+        first = pool.render(pdf_path, 0, 1.0, 0)
+        second = pool.render(pdf_path, 1, 1.5, 0)  # O worker já varreu o primeiro segmento
+        assert bytes(first.buffer) == _expected_samples(pdf_path, 0, 1.0)
+        assert bytes(second.buffer) == _expected_samples(pdf_path, 1, 1.5)
+        first.release()
+        second.release()
+    finally:
+        pool.shutdown()
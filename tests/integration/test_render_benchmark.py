@@ -0,0 +1,27 @@
+import importlib.util
+import json
+from pathlib import Path
+
+import pytest
+
+SCRIPT = Path(__file__).parents[2] / "scripts" / "render_benchmark.py"
+
+
+@pytest.fixture
+def benchmark():
+    spec = importlib.util.spec_from_file_location("render_benchmark", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_quick_benchmark_runs_every_scenario(qtbot, tmp_path, benchmark):
+    """Smoke do harness: corpus reduzido gerado no tmp e todos os cenários com estatísticas."""
+    output = tmp_path / "render_benchmark.json"
+    benchmark.main(["--quick", "--corpus-dir", str(tmp_path / "corpus"), "--output", str(output)])
+
+    report = json.loads(output.read_text(encoding="utf-8"))
+    assert report["quick"] and set(report["scenarios"]) == set(benchmark.SCENARIOS)
+    for name, stats in report["scenarios"].items():
+        assert stats["requests"] > 0 and stats["completed"] > 0, name
+        assert {"ttp_ms", "throughput_pages_s", "peak_rss_mb", "engine"} <= set(stats), name
@@ -1,8 +1,12 @@
 import pytest
+import os
+import math
 import time
 from pathlib import Path
+from PyQt6.QtGui import QImage
 from src.interfaces.gui.state.render_engine import RenderEngine
 from src.infrastructure.adapters.pymupdf_adapter import PyMuPDFAdapter
+from src.interfaces.gui.state.worker_policy import WorkerPolicy
 
 class MockCallback:
     def __init__(self):
@@ -14,10 +18,26 @@ class MockCallback:
         self.results.append((page_index, pixmap.width(), pixmap.height()))
 
 @pytest.fixture
-def engine():
-    adapter = PyMuPDFAdapter()
-    engine = RenderEngine.instance(adapter=adapter)
-    return engine
+def test_pdf():
+    path = Path("test_files/test_multi_page_text.pdf")
+    if not path.exists():
+        pytest.skip("Test PDF not found")
+    return path
+
+@pytest.fixture
+def make_engine():
+    """Instância nova do RenderEngine com o adapter dado, sem cache em disco; encerrada no teardown."""
+    def make(adapter=None):
+        RenderEngine.reset_instance()
+        engine = RenderEngine.instance(adapter=adapter or PyMuPDFAdapter())
+        engine._disk_cache = None  # Isolar do cache persistente
+        return engine
+    yield make
+    RenderEngine.reset_instance()
+
+@pytest.fixture
+def engine(make_engine):
+    return make_engine()
 
 def test_render_concurrency_stress(engine):
     """Teste de estresse: solicita múltiplas renderizações rápidas para garantir que não há deadlock."""
@@ -56,3 +76,341 @@ def test_path_resolution_caching(engine):
     duration = end_time - start_time
     print(f"Path resolution duration for 100 calls: {duration:.6f}s")
     assert duration < 0.1 # 100ms é muito para cache, mas seguro para CI lento
+
+class CountingAdapter(PyMuPDFAdapter):
+    """Adapter real que conta quantas vezes o MuPDF rasterizou."""
+    def __init__(self):
+        super().__init__()
+        self.render_calls = 0
+
+    def render_pixmap(self, *args, **kwargs):
+        self.render_calls += 1
+        return super().render_pixmap(*args, **kwargs)
+
+def test_duplicate_requests_are_coalesced(qtbot, make_engine, test_pdf):
+    """Requisições idênticas em voo devem compartilhar uma única renderização."""
+    adapter = CountingAdapter()
+    engine = make_engine(adapter)
+
+    callback = MockCallback()
+    for _ in range(10):
+        engine.request_render(test_pdf, 0, 1.0, 0, callback)
+        engine.request_render(test_pdf, 0, 1.0, 0, callback, source="thumbnail")
+
+    qtbot.waitUntil(lambda: len(callback.results) == 20, timeout=10000)
+    assert adapter.render_calls == 1
+    assert engine.cache_stats()["coalesced"] == 19
+    assert engine.cache_stats()["inflight"] == 0
+
+class SlowAdapter(CountingAdapter):
+    """Adapter lento para manter tarefas na fila do pool."""
+    def render_pixmap(self, *args, **kwargs):
+        time.sleep(0.05)
+        return super().render_pixmap(*args, **kwargs)
+
+def test_cancelled_task_skips_handle_acquisition(qtbot):
+    """Uma tarefa cancelada não adquire handle nem emite resultado."""
+    from src.interfaces.gui.state.render_engine import RenderTask
+
+    acquired = []
+    task = RenderTask(PyMuPDFAdapter(), lambda sid: acquired.append(sid), lambda h, sid: None, 0, 1.0, 0, 1)
+    finished, done = [], []
+    task.signals.finished.connect(lambda *args: finished.append(args))
+    task.signals.done.connect(lambda: done.append(True))
+
+    task.cancel()
+    task.run()
+
+    assert task.is_cancelled
+    assert acquired == []
+    assert finished == []
+    assert done == [True]
+
+def test_cancel_stale_drops_pages_outside_window(qtbot, make_engine, test_pdf):
+    """Páginas que saíram da janela visível não devem ocupar os workers."""
+    adapter = SlowAdapter()
+    engine = make_engine(adapter)
+
+    viewer_cb, thumb_cb = MockCallback(), MockCallback()
+    for page in range(10):
+        engine.request_render(test_pdf, page, 1.0, 0, viewer_cb)
+    engine.request_render(test_pdf, 9, 0.2, 0, thumb_cb, source="thumbnail")
+
+    cancelled = engine.cancel_stale({(test_pdf, 0), (test_pdf, 1)}, zooms={1.0})
+    assert cancelled >= 6  # No máximo 2 tarefas já estavam rodando
+
+    qtbot.waitUntil(lambda: len(thumb_cb.results) == 1, timeout=10000)
+    engine.pool.waitForDone(10000)
+    qtbot.wait(50)
+
+    rendered = {page for page, _, _ in viewer_cb.results}
+    assert {0, 1} <= rendered
+    assert adapter.render_calls < 11
+    assert engine.cache_stats()["cancelled"] == cancelled
+    assert engine.cache_stats()["inflight"] == 0
+
+def test_cancel_stale_matches_document_and_page(qtbot, tmp_path, make_engine, test_pdf):
+    """Mesmo número de página em outro documento (aba anterior) não é 'da janela'."""
+    other_pdf = tmp_path / "other.pdf"
+    other_pdf.write_bytes(test_pdf.read_bytes())
+
+    engine = make_engine(SlowAdapter())
+
+    callback = MockCallback()
+    for doc in (test_pdf, other_pdf):
+        for page in range(4):
+            engine.request_render(doc, page, 1.0, 0, callback)
+
+    engine.cancel_stale({(test_pdf.resolve(), 2), (test_pdf.resolve(), 3)}, zooms={1.0})
+    remaining = {(key[0], key[1]) for key in engine._inflight}
+    assert {(test_pdf, 2), (test_pdf, 3)} <= remaining
+    assert not any(doc == other_pdf for doc, _ in remaining)
+
+    engine.pool.waitForDone(10000)
+    qtbot.wait(50)
+
+def test_progressive_render_delivers_preview_first(qtbot, engine, test_pdf):
+    """Modo progressivo: prévia em zoom reduzido antes do render exato; depois reusa o cache."""
+    events = []
+    exact = lambda p, pix, z, r, m, c: events.append(("exact", z))
+    preview = lambda p, pix, z, r, m, c: events.append(("preview", z))
+
+    engine.request_render(test_pdf, 0, 2.0, 0, exact, preview_callback=preview)
+    qtbot.waitUntil(lambda: ("exact", 2.0) in events, timeout=10000)
+    assert events[0] == ("preview", 0.5)
+
+    # Zoom novo: a prévia vem do render em cache mais próximo (2.0), sem nova tarefa
+    events.clear()
+    engine.request_render(test_pdf, 0, 3.0, 0, exact, preview_callback=preview)
+    qtbot.waitUntil(lambda: ("exact", 3.0) in events, timeout=10000)
+    assert events[0] == ("preview", 2.0)
+
+def test_zoom_buckets_and_cached_nearest(qtbot, engine, test_pdf):
+    """Buckets de 2^(1/4) e consulta do render em cache mais próximo (sem agendar tarefas)."""
+    assert RenderEngine.quantize_zoom(1.0) == 1.0
+    assert RenderEngine.quantize_zoom(1.2) == 1.189
+    assert RenderEngine.quantize_zoom(1.44) == 1.414
+    assert RenderEngine.quantize_zoom(2.1) == 2.0
+
+    assert engine.cached_nearest(test_pdf, 0, 1.5, 0) is None
+
+    callback = MockCallback()
+    for zoom in (1.0, 2.0):
+        engine.request_render(test_pdf, 0, zoom, 0, callback)
+    qtbot.waitUntil(lambda: len(callback.results) == 2, timeout=10000)
+
+    pixmap, zoom = engine.cached_nearest(str(test_pdf), 0, 1.5, 0)
+    assert zoom == 2.0 and not pixmap.isNull()
+    assert engine.cached_nearest(test_pdf, 0, 1.1, 0)[1] == 1.0
+    assert engine.cached_nearest(test_pdf, 0, 1.1, 90) is None
+
+def test_process_backend_matches_thread_backend(qtbot, make_engine, test_pdf):
+    """O backend multiprocesso entrega o mesmo raster e libera a memória compartilhada."""
+    images = {}
+    for backend in ("thread", "process"):
+        engine = make_engine()
+        if backend == "process":
+            engine.enable_process_backend(workers=2)
+            assert engine.pool.maxThreadCount() == 2
+
+        engine.request_render(test_pdf, 1, 1.5, 0, lambda p, pix, *args, b=backend: images.__setitem__(b, pix.toImage()))
+        qtbot.waitUntil(lambda: backend in images, timeout=30000)
+
+    assert engine._process_pool is not None
+    RenderEngine.reset_instance()
+    assert engine._process_pool is None
+    assert images["process"] == images["thread"]
+
+def test_complexity_hint_resizes_pool(qtbot, engine):
+    """O hint de complexidade redimensiona workers e handles do pool."""
+    engine._worker_policy = WorkerPolicy(cpu_count=16, memory_probe=lambda: (24 * 1024**3, 32 * 1024**3))
+
+    engine.set_complexity_hint("LIGHT")
+    stats = engine.worker_stats()
+    assert stats["max_threads"] == 8 and stats["max_handles"] == 8
+    assert stats["backend"] == "thread"
+
+    engine.set_complexity_hint("ULTRA_HEAVY")
+    assert engine.worker_stats()["max_threads"] == 2
+
+def test_color_mode_switch_reuses_default_raster(qtbot, make_engine, test_pdf):
+    """Trocar o modo de leitura deriva do raster padrão em cache, sem nova rasterização."""
+    adapter = CountingAdapter()
+    engine = make_engine(adapter)
+
+    images = {}
+    callback = lambda p, pix, z, r, mode, c: images.__setitem__(mode, pix.toImage())
+    engine.request_render(test_pdf, 0, 1.0, 0, callback, mode="sepia")
+    qtbot.waitUntil(lambda: len(images) == 1, timeout=10000)
+    assert adapter.render_calls == 1
+    # Raster padrão guardado também como QImage: a derivação não converte o pixmap na GUI
+    assert isinstance(engine._cache.attached((test_pdf, 0, 1.0, 0, "default", None, None)), QImage)
+
+    for mode in ("dark", "high_contrast", "default"):
+        engine.request_render(test_pdf, 0, 1.0, 0, callback, mode=mode)
+    qtbot.waitUntil(lambda: len(images) == 4, timeout=10000)
+    assert adapter.render_calls == 1
+
+    inverted = images["default"].copy()
+    inverted.invertPixels()
+    assert images["dark"] == inverted
+    assert images["sepia"] != images["default"]
+
+def test_documents_keep_cache_and_handles_across_switches(qtbot, tmp_path, make_engine, test_pdf):
+    """Alternar entre documentos mantém cache e handles; arquivo alterado ganha nova sessão."""
+    doc_a, doc_b = tmp_path / "a.pdf", tmp_path / "b.pdf"
+    doc_a.write_bytes(test_pdf.read_bytes())
+    doc_b.write_bytes(test_pdf.read_bytes())
+
+    adapter = CountingAdapter()
+    engine = make_engine(adapter)
+
+    callback = MockCallback()
+    engine.set_document(doc_a)
+    for doc in (doc_a, doc_b):
+        engine.request_render(doc, 0, 1.0, 0, callback)
+    qtbot.waitUntil(lambda: len(callback.results) == 2, timeout=10000)
+
+    engine.set_document(doc_b)
+    engine.set_document(doc_a)
+    engine.request_render(doc_a, 0, 1.0, 0, callback)
+    qtbot.waitUntil(lambda: len(callback.results) == 3, timeout=10000)
+    assert adapter.render_calls == 2
+    assert engine.worker_stats()["open_documents"] == 2
+
+    # Reescrita em disco: sessão nova e rasters antigos descartados
+    session = engine._current_session_id
+    os.utime(doc_a, ns=(time.time_ns(), time.time_ns() + 10**9))
+    engine.set_document(doc_a)
+    assert engine._current_session_id != session
+    assert engine.cached_nearest(doc_a, 0, 1.0, 0) is None
+    assert engine.cached_nearest(doc_b, 0, 1.0, 0) is not None
+
+def test_scheduler_serves_viewer_before_thumbnail_backlog(qtbot, make_engine, test_pdf):
+    """A página do viewer passa à frente de centenas de miniaturas pendentes."""
+    engine = make_engine(SlowAdapter())
+    engine.pool.setMaxThreadCount(1)
+
+    order = []
+    for page in range(40):
+        engine.request_render(test_pdf, page, 0.2, 0, lambda p, *args: order.append(("thumbnail", p)), source="thumbnail")
+    for page in (10, 12, 11):
+        engine.request_render(test_pdf, page, 1.0, 0, lambda p, *args: order.append(("viewer", p)))
+    engine.reprioritize({(test_pdf, 11): 0, (test_pdf, 12): 50, (test_pdf, 10): 300})
+
+    qtbot.waitUntil(lambda: len(order) >= 3, timeout=10000)
+    assert order[:3] == [("viewer", 11), ("viewer", 12), ("viewer", 10)]
+    assert engine.cache_stats()["queued"] > 0
+    engine.clear_queue()
+
+def test_stats_report_queue_cache_and_latencies(qtbot, engine, test_pdf):
+    """stats() expõe fila, cache e histogramas por origem/página."""
+    callback = MockCallback()
+    for page in range(3):
+        engine.request_render(test_pdf, page, 1.0, 0, callback)
+    qtbot.waitUntil(lambda: len(callback.results) == 3, timeout=10000)
+    engine.request_render(test_pdf, 0, 1.0, 0, callback)
+    qtbot.waitUntil(lambda: len(callback.results) == 4, timeout=10000)
+
+    stats = engine.stats()
+    viewer = stats["sources"]["viewer"]
+    assert viewer["requests"] == 4 and viewer["memory_hits"] == 1
+    assert viewer["render"]["count"] == 3 and viewer["queue"]["count"] == 3
+    assert viewer["handle_wait"]["count"] == 3
+    assert stats["peak_queue"] >= 1 and stats["queue"]["depth"] == 0
+    assert stats["cache"]["bytes"] > 0
+    assert "test_multi_page_text.pdf#2" in stats["pages"]
+
+def test_layer_toggle_invalidates_only_pages_using_it(qtbot, tmp_path, make_engine):
+    """Com o índice de camadas pronto, alternar uma camada só re-renderiza as páginas que a usam."""
+    import fitz
+    pdf_path = tmp_path / "layers.pdf"
+    doc = fitz.open()
+    for _ in range(3):
+        doc.new_page()
+    red, blue = doc.add_ocg("Red"), doc.add_ocg("Blue")
+    doc[0].draw_rect(fitz.Rect(50, 50, 200, 200), color=(1, 0, 0), fill=(1, 0, 0), oc=red)
+    doc[1].draw_rect(fitz.Rect(50, 50, 200, 200), color=(0, 0, 1), fill=(0, 0, 1), oc=blue)
+    doc.save(str(pdf_path))
+    doc.close()
+
+    adapter = CountingAdapter()
+    engine = make_engine(adapter)
+
+    assert engine.pages_using_layers(pdf_path, [red]) is None
+    engine.build_layer_index(pdf_path)
+    qtbot.waitUntil(lambda: engine.pages_using_layers(pdf_path, [red]) is not None, timeout=10000)
+    assert engine.pages_using_layers(pdf_path, [red]) == {0}
+    assert engine.pages_using_layers(pdf_path, [red, blue]) == {0, 1}
+
+    images = {}
+    def render_all(config):
+        images.clear()
+        for page in range(3):
+            engine.request_render(pdf_path, page, 1.0, 0, lambda p, pix, *a: images.__setitem__(p, pix.toImage()), layer_config=config)
+        qtbot.waitUntil(lambda: len(images) == 3, timeout=10000)
+        return dict(images)
+
+    before = render_all({red: True, blue: True})
+    assert adapter.render_calls == 3
+
+    after = render_all({red: False, blue: True})
+    assert adapter.render_calls == 4 # Só a página 0 (Red) foi rasterizada de novo
+    assert after[0] != before[0]
+    assert after[1] == before[1] and after[2] == before[2]
+
+def test_word_index_is_built_in_background_from_pooled_handles(qtbot, tmp_path, make_engine):
+    """As palavras saem do pool em blocos; a seleção consulta o índice sem reabrir o PDF."""
+    import fitz
+    pdf_path = tmp_path / "words.pdf"
+    doc = fitz.open()
+    for page in range(40):
+        doc.new_page().insert_text((72, 72), f"pagina {page}")
+    doc.save(str(pdf_path))
+    doc.close()
+
+    adapter = PyMuPDFAdapter()
+    calls = []
+    get_page_words = adapter.get_page_words
+    adapter.get_page_words = lambda path, pages, doc_handle=None: calls.append((list(pages), doc_handle)) or get_page_words(path, pages, doc_handle=doc_handle)
+    engine = make_engine(adapter)
+
+    # Antes do índice: extração sob demanda com handle do pool
+    assert engine.page_words(pdf_path, 5).texts == ["pagina", "5"]
+    engine.build_word_index(pdf_path, 40, first_pages=[30, 31])
+    engine.build_word_index(pdf_path, 40) # Uma vez por sessão
+    store = engine._pool_for(pdf_path).words
+    qtbot.waitUntil(lambda: len(store) == 40, timeout=10000)
+
+    chunks = [pages for pages, _ in calls[1:]]
+    assert [30, 31] in [pages[:2] for pages in chunks] # Janela visível no primeiro bloco
+    assert not any(5 in pages for pages in chunks)
+    assert len(calls) == 1 + math.ceil(39 / RenderEngine.WORD_INDEX_CHUNK)
+    assert all(handle is not None for _, handle in calls)
+    assert engine.page_words(pdf_path, 39).texts == ["pagina", "39"]
+    assert len(calls) == 1 + math.ceil(39 / RenderEngine.WORD_INDEX_CHUNK)
+
+def test_page_words_never_blocks_the_gui_on_a_busy_pool(qtbot, tmp_path, engine):
+    """Com todos os handles ocupados, page_words retorna na hora e entrega a página depois."""
+    import fitz
+    pdf_path = tmp_path / "busy.pdf"
+    doc = fitz.open()
+    for page in range(3):
+        doc.new_page().insert_text((72, 72), f"pagina {page}")
+    doc.save(str(pdf_path))
+    doc.close()
+
+    pool = engine._pool_for(pdf_path)
+    held = [pool.acquire(engine._max_handles) for _ in range(engine._max_handles)]
+
+    ready = []
+    started = time.perf_counter()
+    assert engine.page_words(pdf_path, 2, on_ready=ready.append) is None
+    assert engine.page_words(pdf_path, 2, on_ready=ready.append) is None # Pedido único na fila
+    assert time.perf_counter() - started < 0.5
+
+    for handle in held:
+        pool.release(handle, engine._max_handles)
+    qtbot.waitUntil(lambda: len(ready) == 2, timeout=10000)
+    assert ready[0] is ready[1] and ready[0].texts == ["pagina", "2"]
+    assert engine.page_words(pdf_path, 2) is ready[0]
@@ -0,0 +1,64 @@
+import os
+from src.infrastructure.repositories.raster_cache_repository import RasterCacheRepository
+
+
+def _make_doc(tmp_path, content=b"%PDF-1.4 fake"):
+    doc = tmp_path / "plan.pdf"
+    doc.write_bytes(content)
+    return doc
+
+
+def test_roundtrip_and_persistence_between_instances(tmp_path):
+    doc = _make_doc(tmp_path)
+    repo = RasterCacheRepository(storage_dir=tmp_path / "cache", max_bytes=10 * 1024 * 1024)
+    key = repo.make_key(doc, 0, 1.0, 0, "default", None, {12: True})
+    data = bytes(range(256)) * 12  # 3072 bytes = 32 x 32 RGB888
+
+    repo.put(key, data, 32, 32, 96, 13)
+
+    # Nova instância (reabertura do app) deve encontrar a entrada
+    reopened = RasterCacheRepository(storage_dir=tmp_path / "cache")
+    hit = reopened.get(key)
+    assert hit is not None
+    assert hit[0] == data
+    assert hit[1:] == (32, 32, 96, 13)
+
+
+def test_key_changes_with_content_and_parameters(tmp_path):
+    doc = _make_doc(tmp_path)
+    repo = RasterCacheRepository(storage_dir=tmp_path / "cache")
+    base = repo.make_key(doc, 0, 1.0, 0)
+
+    assert base != repo.make_key(doc, 1, 1.0, 0)
+    assert base != repo.make_key(doc, 0, 2.0, 0)
+    assert base != repo.make_key(doc, 0, 1.0, 0, "dark")
+    assert base != repo.make_key(doc, 0, 1.0, 0, clip=(0, 0, 10, 10))
+    assert repo.make_key(doc, 0, 1.0, 0, layer_config={1: True, 2: False}) == \
+        repo.make_key(doc, 0, 1.0, 0, layer_config={2: False, 1: True})
+
+    doc.write_bytes(b"%PDF-1.4 edited content")
+    os.utime(doc, ns=(1, 1))
+    assert base != repo.make_key(doc, 0, 1.0, 0)
+
+
+def test_prunes_least_recently_used_when_over_cap(tmp_path):
+    doc = _make_doc(tmp_path)
+    repo = RasterCacheRepository(storage_dir=tmp_path / "cache", max_bytes=4000)
+    keys = [repo.make_key(doc, i, 1.0, 0) for i in range(3)]
+    payload = os.urandom(1500)  # incompressível
+
+    repo.put(keys[0], payload, 10, 50, 30, 13)
+    repo.put(keys[1], payload, 10, 50, 30, 13)
+    assert repo.get(keys[0]) is not None  # keys[0] vira MRU
+    repo.put(keys[2], payload, 10, 50, 30, 13)
+
+    assert repo.get(keys[1]) is None
+    assert repo.get(keys[0]) is not None
+    assert repo.get(keys[2]) is not None
+    assert repo.stats()["bytes"] <= 4000
+
+
+def test_storage_dir_can_be_overridden_by_env(tmp_path, monkeypatch):
+    monkeypatch.setenv(RasterCacheRepository.STORAGE_DIR_ENV, str(tmp_path / "portable"))
+    assert RasterCacheRepository().storage_dir == tmp_path / "portable"
+    assert RasterCacheRepository(storage_dir=tmp_path / "explicit").storage_dir == tmp_path / "explicit"
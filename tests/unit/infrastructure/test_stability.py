@@ -96,7 +96,7 @@ class TestPerformance(unittest.TestCase):
             self.assertTrue(callback_called[0], "O callback deveria ter sido chamado via cache")
 
     def test_cache_eviction(self):
-        """Valida a expulsão LRU quando o cache atinge o limite."""
+        """Valida a expulsão LRU quando o cache atinge o orçamento em bytes."""
         if 'src.interfaces.gui.state.render_engine' in sys.modules:
             del sys.modules['src.interfaces.gui.state.render_engine']
 
@@ -108,10 +108,15 @@ class TestPerformance(unittest.TestCase):
             from src.interfaces.gui.state.render_engine import RenderEngine
             RenderEngine._instance = None
             
+            from src.interfaces.gui.state.render_cache import PixmapCache
             engine = RenderEngine.instance()
-            engine._max_cache_size = 2
+            # 10x10 @ 8bpp = 100 bytes por pixmap; cabem 2 na cota de páginas
+            engine._cache = PixmapCache({"page": 250, "thumbnail": 100})
             
             pix = MagicMock()
+            pix.width.return_value = 10
+            pix.height.return_value = 10
+            pix.depth.return_value = 8
             engine._update_cache("key1", pix)
             engine._update_cache("key2", pix)
             engine._update_cache("key3", pix) # Deve expulsar key1
@@ -119,6 +124,7 @@ class TestPerformance(unittest.TestCase):
             self.assertNotIn("key1", engine._cache)
             self.assertIn("key2", engine._cache)
             self.assertIn("key3", engine._cache)
+            self.assertEqual(engine.cache_stats()["evictions"], 1)
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,37 @@
+from PyQt6.QtGui import QImage, QColor
+from src.interfaces.gui.state.color_modes import ColorModeFilter
+
+
+def _image(color: QColor) -> QImage:
+    img = QImage(4, 3, QImage.Format.Format_RGB32)
+    img.fill(color)
+    return img
+
+
+def test_dark_mode_inverts_like_qt():
+    img = ColorModeFilter.apply(_image(QColor(10, 100, 200)), "dark")
+    expected = _image(QColor(10, 100, 200))
+    expected.invertPixels()
+    assert img == expected
+    assert img.pixelColor(3, 2).getRgb()[:3] == (245, 155, 55)
+
+
+def test_sepia_maps_white_to_paper_and_black_to_ink():
+    white = ColorModeFilter.apply(_image(QColor(255, 255, 255)), "sepia")
+    black = ColorModeFilter.apply(_image(QColor(0, 0, 0)), "sepia")
+    assert white.pixelColor(0, 0).getRgb()[:3] == ColorModeFilter.SEPIA_PAPER
+    assert black.pixelColor(0, 0).getRgb()[:3] == ColorModeFilter.SEPIA_INK
+    assert ColorModeFilter.paper_color("sepia") == ColorModeFilter.SEPIA_PAPER
+
+
+def test_high_contrast_stretches_midtones():
+    img = ColorModeFilter.apply(_image(QColor(40, 128, 220)), "high_contrast")
+    r, g, b, _ = img.pixelColor(1, 1).getRgb()
+    assert (r, b) == (0, 255)
+    assert g == 128
+
+
+def test_default_mode_is_untouched():
+    img = _image(QColor(1, 2, 3))
+    assert ColorModeFilter.apply(img, "default") is img
+    assert img.pixelColor(0, 0).getRgb()[:3] == (1, 2, 3)
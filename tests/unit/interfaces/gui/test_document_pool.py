@@ -0,0 +1,100 @@
+import threading
+import fitz
+import pytest
+from src.interfaces.gui.state.document_pool import DocumentHandlePool
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    path = tmp_path / "pool.pdf"
+    doc = fitz.open()
+    doc.new_page()
+    doc.save(str(path))
+    doc.close()
+    return path
+
+
+def _acquire_in_thread(pool, max_handles):
+    result = {}
+    acquired = threading.Event()
+
+    def worker():
+        result["handle"] = pool.acquire(max_handles)
+        acquired.set()
+
+    threading.Thread(target=worker, daemon=True).start()
+    return result, acquired
+
+
+def test_waiter_is_woken_by_release(pdf_path):
+    pool = DocumentHandlePool(pdf_path, 1)
+    handle = pool.acquire(1)
+
+    result, acquired = _acquire_in_thread(pool, 1)
+    assert not acquired.wait(0.2) # Pool cheio: espera sem abrir outro handle
+
+    pool.release(handle, 1)
+    assert acquired.wait(2)
+    assert result["handle"] is handle and pool.open_handles == 1
+    pool.retire()
+
+
+def test_retire_wakes_waiters_and_closes_borrowed_handles(pdf_path):
+    pool = DocumentHandlePool(pdf_path, 1)
+    handle = pool.acquire(1)
+    result, acquired = _acquire_in_thread(pool, 1)
+    assert not acquired.wait(0.1)
+
+    pool.retire()
+    assert acquired.wait(2) and result["handle"] is None
+    pool.release(handle, 1)
+    assert handle.is_closed and pool.open_handles == 0
+    assert pool.acquire(1) is None
+
+
+def test_prewarm_opens_free_handles_up_to_limit(pdf_path):
+    pool = DocumentHandlePool(pdf_path, 1)
+    assert pool.prewarm(3, 2) == 2
+    assert pool.open_handles == 2 and pool.is_idle
+
+    first, second = pool.acquire(2), pool.acquire(2)
+    assert first is not second and pool.open_handles == 2
+    pool.release(first, 2)
+    pool.release(second, 2)
+    assert pool.prewarm(2, 2) == 0
+    pool.retire()
+    assert pool.open_handles == 0
+
+
+def test_raising_the_limit_lets_waiters_open_a_handle(pdf_path):
+    pool = DocumentHandlePool(pdf_path, 1)
+    held = pool.acquire(1)
+    result, acquired = _acquire_in_thread(pool, 1)
+    assert not acquired.wait(0.1)
+
+    pool.set_limit(2)
+    assert acquired.wait(2)
+    assert result["handle"] is not held and pool.open_handles == 2
+    pool.retire()
+
+
+def test_non_blocking_acquire_returns_none_when_full(pdf_path):
+    pool = DocumentHandlePool(pdf_path, 1)
+    handle = pool.acquire(1)
+    assert pool.acquire(1, blocking=False) is None # Thread da GUI não dorme na espera
+
+    pool.release(handle, 1)
+    assert pool.acquire(1, blocking=False) is handle
+    pool.retire()
+
+
+def test_closed_handles_are_reported_to_on_close(pdf_path):
+    closed = []
+    pool = DocumentHandlePool(pdf_path, 1, on_close=closed.append)
+    idle, borrowed = pool.acquire(2), pool.acquire(2)
+    pool.release(idle, 2)
+
+    pool.retire()
+    assert closed == [idle]
+    pool.release(borrowed, 2)
+    assert closed == [idle, borrowed]
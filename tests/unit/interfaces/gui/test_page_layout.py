@@ -0,0 +1,70 @@
+from src.interfaces.gui.state.page_layout import PageLayout, PageSlot
+
+
+def _slots(count, width_pt=100, height_pt=200):
+    return [PageSlot("doc.pdf", i, width_pt, height_pt) for i in range(count)]
+
+
+def test_single_column_geometry_comes_from_metadata():
+    layout = PageLayout()
+    layout.rebuild(_slots(3), zoom=2.0)
+    layout.set_width(1000)
+
+    assert layout.content_size() == (40 + 200 + 40, 40 + 3 * 400 + 2 * 30 + 40)
+    assert layout.rect(0) == (400, 40, 200, 400)
+    assert layout.rect(2) == (400, 40 + 2 * 430, 200, 400)
+
+
+def test_range_queries_only_touch_the_window():
+    layout = PageLayout()
+    layout.rebuild(_slots(10_000), zoom=1.0)
+
+    # Página i ocupa [40 + 230*i, 240 + 230*i)
+    assert list(layout.pages_between(0, 300)) == [0, 1]
+    assert list(layout.pages_between(230 * 5000 + 45, 230 * 5000 + 100)) == [5000]
+    assert list(layout.pages_between(-500, 0)) == []
+    assert layout.index_at(230 * 42 + 50) == 42
+    assert layout.index_at(10**9) == 9_999
+
+
+def test_rotation_and_dual_columns():
+    slots = _slots(3)
+    slots[1].rotation = 90
+    layout = PageLayout()
+    layout.rebuild(slots, zoom=1.0, columns=2)
+    layout.set_width(600)
+
+    # Linha 0: retrato (100x200) ao lado da página girada (200x100), centralizada na célula
+    assert layout.rect(0) == (135, 40, 100, 200)
+    assert layout.rect(1) == (265, 90, 200, 100)
+    assert layout.rect(2)[1] == 40 + 200 + 30
+    assert list(layout.pages_between(250, 260)) == [] # Espaçamento entre linhas
+    assert list(layout.pages_between(250, 300)) == [2]
+
+
+def _rects(layout):
+    return [layout.rect(i) for i in range(len(layout))]
+
+
+def test_incremental_updates_match_a_full_rebuild():
+    slots = [PageSlot("doc.pdf", i, 100 + 7 * (i % 5), 150 + 11 * (i % 3)) for i in range(41)]
+    layout = PageLayout()
+    layout.rebuild(slots, zoom=1.0, columns=2)
+    layout.set_width(900)
+
+    layout.set_zoom(1.37)
+    slots[3].rotation = 90
+    layout.update_page(3, slots[3])
+    slots[3].rotation = 0  # Volta: a largura máxima da coluna precisa encolher de novo
+    layout.update_page(3, slots[3])
+    slots[20].rotation = 270
+    layout.update_page(20, slots[20])
+    order = list(reversed(range(41)))
+    layout.reorder(order)
+    layout.set_columns(1)
+
+    expected = PageLayout()
+    expected.rebuild([slots[i] for i in order], zoom=1.37, columns=1)
+    expected.set_width(900)
+    assert _rects(layout) == _rects(expected)
+    assert layout.content_size() == expected.content_size()
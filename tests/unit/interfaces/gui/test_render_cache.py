@@ -0,0 +1,75 @@
+from src.interfaces.gui.state.render_cache import PixmapCache
+
+
+class FakePixmap:
+    def __init__(self, w, h, depth=32):
+        self._w, self._h, self._d = w, h, depth
+    def width(self): return self._w
+    def height(self): return self._h
+    def depth(self): return self._d
+
+
+def test_lru_evicts_by_bytes_not_count():
+    """Uma página grande deve expulsar várias pequenas; a cota é em bytes."""
+    cache = PixmapCache({"page": 1000, "thumbnail": 1000})
+    for i in range(4):
+        cache.put(i, FakePixmap(10, 10, 16))  # 200 bytes cada
+
+    assert cache.get(0) is not None  # 0 vira MRU
+    cache.put("big", FakePixmap(20, 20, 16))  # 800 bytes
+
+    assert "big" in cache
+    assert 0 in cache
+    assert 1 not in cache and 2 not in cache and 3 not in cache
+    assert cache.stats()["bytes"] <= 1000
+    assert cache.evictions == 3
+
+
+def test_thumbnails_do_not_evict_pages():
+    cache = PixmapCache({"page": 400, "thumbnail": 400})
+    cache.put("page", FakePixmap(10, 10), "page")
+    for i in range(10):
+        cache.put(("thumb", i), FakePixmap(10, 10), "thumbnail")
+
+    assert "page" in cache
+    assert cache.stats()["categories"]["thumbnail"]["bytes"] <= 400
+
+
+def test_counters_and_oversized_items():
+    cache = PixmapCache({"page": 100, "thumbnail": 100})
+    assert cache.get("missing") is None
+    assert cache.put("huge", FakePixmap(100, 100)) is False
+    cache.put("ok", FakePixmap(5, 5))
+    assert cache.get("ok") is not None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+    assert "huge" not in cache
+
+
+def test_set_quota_shrinks_immediately():
+    cache = PixmapCache({"page": 1000, "thumbnail": 100})
+    for i in range(5):
+        cache.put(i, FakePixmap(10, 10, 16))
+    cache.set_quota("page", 400)
+
+    assert len(cache) == 2
+    assert 3 in cache and 4 in cache
+
+
+def test_attached_objects_leave_with_their_item():
+    cache = PixmapCache({"page": 400, "thumbnail": 100})
+    cache.attach("absent", "ignored")
+    assert cache.attached("absent") is None
+
+    for i in range(2):
+        cache.put(i, FakePixmap(10, 10))
+        cache.attach(i, f"image {i}")
+    assert cache.attached(1) == "image 1"
+
+    cache.put(2, FakePixmap(10, 10))  # Expulsa o item 0
+    assert cache.attached(0) is None
+    cache.discard(1)
+    assert cache.attached(1) is None
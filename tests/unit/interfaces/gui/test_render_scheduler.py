@@ -0,0 +1,58 @@
+from src.interfaces.gui.state.render_scheduler import RenderScheduler
+
+
+def test_viewer_page_jumps_ahead_of_pending_thumbnails():
+    scheduler = RenderScheduler(clock=lambda: 0.0)
+    for page in range(300):
+        scheduler.push(f"thumb-{page}", ("doc.pdf", page), source="thumbnail")
+    scheduler.push("prefetch", ("doc.pdf", 7), source="prefetch")
+    scheduler.push("viewer", ("doc.pdf", 42), source="viewer")
+    scheduler.push("light", ("doc.pdf", 3), source="light_table")
+
+    assert [scheduler.pop() for _ in range(3)] == ["viewer", "light", "thumb-0"]
+    assert len(scheduler) == 300
+
+
+def test_reprioritize_orders_by_distance_to_focus():
+    scheduler = RenderScheduler(clock=lambda: 0.0)
+    for page in range(5):
+        scheduler.push(page, ("doc.pdf", page))
+
+    # Rolagem: o foco agora está na página 3
+    scheduler.reprioritize({("doc.pdf", 3): 0, ("doc.pdf", 2): 120, ("doc.pdf", 4): 80})
+    assert [scheduler.pop() for _ in range(5)] == [3, 4, 2, 0, 1]
+    assert scheduler.pop() is None
+
+
+def test_priority_breaks_ties_and_age_orders_the_rest():
+    now = [0.0]
+    scheduler = RenderScheduler(clock=lambda: now[0])
+    scheduler.push("exact", ("doc.pdf", 0), distance=0)
+    now[0] = 1.0
+    scheduler.push("preview", ("doc.pdf", 0), priority=1, distance=0)
+    scheduler.push("newer", ("doc.pdf", 1), distance=0)
+
+    assert [scheduler.pop() for _ in range(3)] == ["preview", "exact", "newer"]
+
+
+def test_removed_and_cleared_tasks_are_never_popped():
+    scheduler = RenderScheduler()
+    scheduler.push("a", ("doc.pdf", 0))
+    scheduler.push("b", ("doc.pdf", 1))
+    assert scheduler.remove("a")
+    assert not scheduler.remove("a")
+    assert scheduler.pop() == "b"
+
+    scheduler.push("c", ("doc.pdf", 2))
+    assert scheduler.clear() == ["c"]
+    assert scheduler.pop() is None
+
+
+def test_promote_moves_prefetch_into_viewer_tier():
+    scheduler = RenderScheduler(clock=lambda: 0.0)
+    scheduler.push("thumb", ("doc.pdf", 0), source="thumbnail")
+    scheduler.push("ahead", ("doc.pdf", 9), source="prefetch")
+
+    assert scheduler.promote("ahead", "viewer")
+    assert not scheduler.promote("ahead", "thumbnail")
+    assert [scheduler.pop(), scheduler.pop(), scheduler.pop()] == ["ahead", "thumb", None]
@@ -0,0 +1,38 @@
+from pathlib import Path
+from src.interfaces.gui.state.render_stats import LatencyHistogram, RenderStats
+
+
+def test_histogram_percentiles_follow_buckets():
+    hist = LatencyHistogram()
+    for ms in [3] * 90 + [150] * 9 + [7000]:
+        hist.add(ms)
+
+    assert hist.percentile(50) == 5
+    assert hist.percentile(95) == 200
+    assert hist.percentile(100) == 7000
+    snap = hist.snapshot()
+    assert snap["count"] == 100 and snap["buckets"]["inf"] == 1
+    assert LatencyHistogram().percentile(95) == 0.0
+
+
+def test_stats_aggregate_by_source_and_page():
+    stats = RenderStats()
+    stats.record_request("viewer", hit=True)
+    stats.record_request("viewer", hit=False)
+    stats.record_request("thumbnail", hit=False)
+    stats.record_depth(12)
+    stats.record_queue("viewer", 4.0)
+    stats.record_task("viewer", (Path("a.pdf"), 3), {"handle_wait_ms": 0.5, "render_ms": 40.0}, 46.0)
+    stats.record_task("thumbnail", (Path("a.pdf"), 3), {"disk_hit": True}, 2.0)
+
+    snap = stats.snapshot()
+    assert snap["requests"] == 3 and snap["memory_hit_rate"] == round(1 / 3, 4)
+    assert snap["peak_queue"] == 12 and snap["disk_hits"] == 1
+    viewer = snap["sources"]["viewer"]
+    assert viewer["memory_hits"] == 1
+    assert viewer["render"]["count"] == 1 and viewer["total"]["p50_ms"] == 46.0
+    assert snap["sources"]["thumbnail"]["render"]["count"] == 0
+    assert snap["pages"]["a.pdf#3"]["count"] == 1
+
+    stats.reset()
+    assert stats.snapshot()["requests"] == 0
@@ -0,0 +1,46 @@
+from src.interfaces.gui.state.scroll_prefetcher import ScrollPrefetcher
+
+
+def _scroll(prefetcher, clock, start, step_px, steps, dt=0.016):
+    value = start
+    for _ in range(steps):
+        clock[0] += dt
+        value += step_px
+        prefetcher.sample(value)
+    return value
+
+
+def test_idle_keeps_symmetric_buffer_without_prefetch():
+    clock = [0.0]
+    prefetcher = ScrollPrefetcher(clock=lambda: clock[0])
+    assert prefetcher.plan(1000, 1800, 400) == (600, 2200, None)
+
+    _scroll(prefetcher, clock, 0, 16, 10)
+    clock[0] += 1.0 # Leitor parou
+    assert prefetcher.velocity == 0.0
+    assert prefetcher.plan(1000, 1800, 400)[2] is None
+
+
+def test_steady_reading_prefetches_ahead_and_nothing_behind():
+    clock = [0.0]
+    prefetcher = ScrollPrefetcher(clock=lambda: clock[0])
+    _scroll(prefetcher, clock, 0, 16, 20) # ~1000 px/s para baixo
+
+    assert 900 < prefetcher.velocity < 1100
+    top, bottom, band = prefetcher.plan(1000, 1800, 400)
+    assert (top, bottom) == (1000, 2200)
+    assert band[0] == 2200 and 2900 < band[1] < 3100
+
+    _scroll(prefetcher, clock, 5000, -16, 20) # Inverteu a direção
+    top, bottom, band = prefetcher.plan(1000, 1800, 400)
+    assert (top, bottom) == (600, 1800)
+    assert band[1] == 600 and band[0] < 600
+
+
+def test_fling_requests_only_the_viewport():
+    clock = [0.0]
+    prefetcher = ScrollPrefetcher(clock=lambda: clock[0])
+    _scroll(prefetcher, clock, 0, 400, 10) # ~25000 px/s
+
+    assert prefetcher.is_fling
+    assert prefetcher.plan(1000, 1800, 400) == (1000, 1800, None)
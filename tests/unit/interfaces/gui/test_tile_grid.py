@@ -0,0 +1,32 @@
+from src.interfaces.gui.state.tile_grid import TileGrid
+
+
+def test_level_for_zoom_never_upscales():
+    grid = TileGrid(tile_size=512)
+    assert grid.level_for_zoom(1.0) == 0
+    assert grid.level_for_zoom(1.2) == 1
+    assert grid.level_for_zoom(4.0) == 2
+    assert grid.level_for_zoom(0.2) == -2
+    assert grid.level_for_zoom(100.0) == grid.max_level
+    assert grid.coarse_level(2) == 0
+    assert grid.coarse_level(grid.min_level) == grid.min_level
+
+
+def test_only_tiles_intersecting_rect_are_listed():
+    grid = TileGrid(tile_size=512)
+    # Nível 2 (zoom 4x): cada tile cobre 128pt
+    tiles = grid.tiles_for_rect(2, 2384, 3370, (0, 0, 300, 200))
+    assert tiles == [(0, 0), (1, 0), (2, 0), (0, 1), (1, 1), (2, 1)]
+
+    # Deslocar o viewport expõe apenas a nova faixa
+    moved = set(grid.tiles_for_rect(2, 2384, 3370, (0, 130, 300, 330)))
+    assert moved - set(tiles) == {(0, 2), (1, 2), (2, 2)}
+
+    assert grid.tiles_for_rect(2, 2384, 3370, (10, 10, 10, 50)) == []
+
+
+def test_tile_clip_is_clamped_to_page():
+    grid = TileGrid(tile_size=512)
+    cols, rows = grid.grid_size(0, 600, 842)
+    assert (cols, rows) == (2, 2)
+    assert grid.tile_clip(0, 1, 1, 600, 842) == (512.0, 512.0, 600.0, 842.0)
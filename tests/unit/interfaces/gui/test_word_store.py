@@ -0,0 +1,68 @@
+import random
+from src.interfaces.gui.state.word_store import PageWords, WordStore
+
+
+def _words(count, seed=7):
+    rng = random.Random(seed)
+    words = []
+    for i in range(count):
+        x0, y0 = rng.uniform(0, 560), rng.uniform(0, 820)
+        words.append((x0, y0, x0 + rng.uniform(5, 120), y0 + rng.uniform(6, 14), f"w{i}", 0, 0, i))
+    return words
+
+
+def _brute_force(words, x0, y0, x1, y1, crossing):
+    hits = []
+    for i, (wx0, wy0, wx1, wy1, *_) in enumerate(words):
+        if crossing:
+            selected = not (wx1 < x0 or wx0 > x1 or wy1 < y0 or wy0 > y1)
+        else:
+            selected = wx0 >= x0 and wx1 <= x1 and wy0 >= y0 and wy1 <= y1
+        if selected:
+            hits.append(i)
+    return hits
+
+
+def test_hit_matches_brute_force_in_both_modes():
+    words = _words(3000)
+    page = PageWords(words)
+    rng = random.Random(3)
+    rects = [(-50, -50, 2000, 2000), (300, 400, 300, 400), (-500, 900, -10, 1200)]
+    for _ in range(200):
+        x0, y0 = rng.uniform(-100, 600), rng.uniform(-100, 900)
+        rects.append((x0, y0, x0 + rng.uniform(0, 400), y0 + rng.uniform(0, 300)))
+
+    for rect in rects:
+        for crossing in (True, False):
+            hits = page.hit(*rect, crossing)
+            assert [i for i, _ in hits] == _brute_force(words, *rect, crossing)
+            assert all(r == words[i][:4] for i, r in hits)
+
+
+def test_empty_page_and_texts():
+    assert PageWords([]).hit(0, 0, 1000, 1000, True) == []
+    page = PageWords([(10, 10, 40, 20, "alfa", 0, 0, 0), (50, 10, 80, 20, "beta", 0, 0, 1)])
+    assert len(page) == 2 and page.texts == ["alfa", "beta"]
+    assert page.hit(0, 0, 45, 30, False) == [(0, (10.0, 10.0, 40.0, 20.0))]
+    assert [i for i, _ in page.hit(0, 0, 45, 30, True)] == [0]
+
+
+def test_store_reports_missing_pages_in_request_order():
+    store = WordStore()
+    store.put(3, PageWords([]))
+    assert store.missing([5, 3, 1]) == [5, 1]
+    assert store.get(3) is not None and store.get(5) is None and len(store) == 1
+
+
+def test_waiters_are_handed_over_once_by_put():
+    store = WordStore()
+    received = []
+    assert store.wait(2, received.append) is True
+    assert store.wait(2, received.append) is False # Mesmo pedido urgente
+    words = PageWords([])
+    callbacks = store.put(2, words)
+    assert len(callbacks) == 2 and store.put(2, words) == []
+
+    store.wait(4)
+    store.drop_waiters(4)
+    assert store.wait(4) is True # Falhou: próximo pedido reagenda
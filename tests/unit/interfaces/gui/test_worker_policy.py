@@ -0,0 +1,32 @@
+from src.interfaces.gui.state.worker_policy import WorkerPolicy
+
+GB = 1024 * 1024 * 1024
+
+
+def test_light_documents_scale_with_cores():
+    policy = WorkerPolicy(cpu_count=16, memory_probe=lambda: (24 * GB, 32 * GB))
+    assert policy.compute("LIGHT")["workers"] == 8
+    assert policy.compute("STANDARD")["workers"] == 4
+    assert policy.compute("ULTRA_HEAVY")["workers"] == 2
+    assert policy.compute("DESCONHECIDO")["complexity"] == "STANDARD"
+
+
+def test_workers_limited_by_cpu_and_available_ram():
+    assert WorkerPolicy(cpu_count=2, memory_probe=lambda: (24 * GB, 32 * GB)).compute("LIGHT")["workers"] == 2
+    assert WorkerPolicy(cpu_count=6, memory_probe=lambda: (24 * GB, 32 * GB)).compute("LIGHT")["workers"] == 5
+    # 2GB livres * 0.5 / 512MB por worker HEAVY = 2
+    stats = WorkerPolicy(cpu_count=16, memory_probe=lambda: (2 * GB, 8 * GB)).compute("HEAVY")
+    assert stats["workers"] == 2
+    assert stats["handles"] == stats["workers"]
+
+
+def test_memory_pressure_halves_the_pool():
+    stats = WorkerPolicy(cpu_count=16, memory_probe=lambda: (1.5 * GB, 32 * GB)).compute("LIGHT")
+    assert stats["memory_pressure"] is True
+    assert stats["workers"] == 4
+
+
+def test_missing_memory_probe_falls_back_to_cpu_only():
+    stats = WorkerPolicy(cpu_count=4, memory_probe=lambda: None).compute("LIGHT")
+    assert stats["workers"] == 3
+    assert stats["available_mb"] is None